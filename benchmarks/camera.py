@@ -0,0 +1,77 @@
+"""
+カメラ無しでの撮影・前処理・録画のスループット.
+
+`SyntheticCamera(realtime=False)` で待たずに画像を作り,
+前処理(`BatchPreprocessor`)と JPEG の圧縮(`FrameEncoder`)が
+1秒に何枚処理できるかを計測する.
+`realtime=True` の場合は, 30FPS のカメラ2台で制御ループが画像を
+取りこぼさないかを表示する.
+
+```bash
+python benchmarks/camera.py
+```
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from robopy.encoder import FrameEncoder
+from robopy.preprocess import BatchPreprocessor, FramePreprocessor
+from robopy.virtual_camera import SyntheticCamera
+
+WIDTH = 640
+HEIGHT = 480
+SECONDS = 2.0
+
+
+def bench(name: str, step: Callable[[], object]) -> None:
+    """
+    `SECONDS` 秒の間 `step` を繰り返し, 1秒あたりの回数を表示する.
+
+    Parameters
+    ----------
+    name : str
+        表示する名前.
+    step : Callable[[], object]
+        計測する処理.
+
+    """
+    count = 0
+    start = time.monotonic()
+    while time.monotonic() - start < SECONDS:
+        step()
+        count += 1
+    print(f"{name:40s} {count / (time.monotonic() - start):8.1f} /s")
+
+
+def main() -> None:
+    """640x480 の画像で各処理のスループットを計測する."""
+    camera = SyntheticCamera(WIDTH, HEIGHT, realtime=False)
+    bench("SyntheticCamera.get_frame", camera.get_frame)
+
+    cameras = [SyntheticCamera(WIDTH, HEIGHT, realtime=False) for _ in "ab"]
+    batch = BatchPreprocessor(cameras, FramePreprocessor(size=(224, 224)))
+    bench("BatchPreprocessor (2 cameras, 224x224)", batch.get_batch)
+
+    encoder = FrameEncoder(".jpg", quality=90, block=True)
+    writer = threading.Thread(target=lambda: sum(1 for _ in encoder))
+    writer.start()
+    bench(
+        "FrameEncoder (.jpg, quality=90)",
+        lambda: encoder.submit(camera.get_frame(), time.monotonic()),
+    )
+    encoder.close()
+    writer.join()
+
+    realtime = [SyntheticCamera(WIDTH, HEIGHT, fps=30) for _ in "ab"]
+    batch = BatchPreprocessor(realtime, FramePreprocessor(size=(224, 224)))
+    bench("BatchPreprocessor (2 cameras, 30 FPS)", batch.get_batch)
+    dropped = [camera.dropped_frames for camera in realtime]
+    print(f"{'':40s} dropped frames {dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+`ConfigProfile.apply` と, サーボ・項目ごとの `write`・`read` の比較.
+
+20軸のロボットに `OPERATING_MODE`・ゲイン・`*_LIMIT`・`PROFILE_*` を設定する.
+`SimulatedPort` 上で計測するので, ホスト側の処理時間にシリアル通信の
+待ち時間は含まない. 代わりにパケット数と送受信したバイト数, 1Mbps で
+送受信する場合の時間を表示する. 実機ではこれに加えて,
+ステータスパケットごとにサーボの応答遅延がかかる.
+
+```bash
+python benchmarks/config.py
+```
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from robopy import ControlTable, OperatingMode, RobotDriver
+from robopy.config import ConfigProfile
+from robopy.sim import SimulatedPort, SimulatedServo
+
+SERVO_IDS = list(range(1, 21))
+BAUDRATE = 1_000_000
+SETTINGS = {
+    ControlTable.DRIVE_MODE: 4,
+    ControlTable.OPERATING_MODE: OperatingMode.POSITION_CONTROL_MODE.value,
+    ControlTable.CURRENT_LIMIT: 1193,
+    ControlTable.VELOCITY_LIMIT: 200,
+    ControlTable.MAX_POSITION_LIMIT: 4095,
+    ControlTable.MIN_POSITION_LIMIT: 0,
+    ControlTable.POSITION_D_GAIN: 0,
+    ControlTable.POSITION_I_GAIN: 0,
+    ControlTable.POSITION_P_GAIN: 800,
+    ControlTable.PROFILE_ACCELERATION: 20,
+    ControlTable.PROFILE_VELOCITY: 100,
+}
+
+
+def sequential(robot: RobotDriver) -> None:
+    """
+    トルクを切り, サーボ・項目ごとに書き込んで読み戻し, トルクを入れる.
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        設定するロボット.
+
+    """
+    robot.write(ControlTable.TORQUE_ENABLE, [0] * len(robot.servos))
+    for servo in robot.servos:
+        for item, value in SETTINGS.items():
+            servo.write(item, value)
+            servo.read(item)
+    robot.write(ControlTable.TORQUE_ENABLE, [1] * len(robot.servos))
+
+
+def bench(name: str, apply: Callable[[RobotDriver], object]) -> None:
+    """
+    設定にかかる時間とパケット数を表示する.
+
+    Parameters
+    ----------
+    name : str
+        表示する名前.
+    apply : Callable[[RobotDriver], object]
+        設定する関数.
+
+    """
+    for state in ["fresh", "configured"]:
+        port = SimulatedPort([SimulatedServo(i) for i in SERVO_IDS])
+        robot = RobotDriver("sim", BAUDRATE, SERVO_IDS, port_handler=port)
+        robot.write(ControlTable.TORQUE_ENABLE, [1] * len(SERVO_IDS))
+        if state == "configured":
+            ConfigProfile(SETTINGS).apply(robot)
+        packets, tx, rx = port.num_packets, port.tx_bytes, port.rx_bytes
+        start = time.perf_counter()
+        apply(robot)
+        seconds = time.perf_counter() - start
+        num_bytes = port.tx_bytes - tx + port.rx_bytes - rx
+        print(
+            f"{name:20s} {state:10s} host {seconds * 1e3:6.1f} ms"
+            f"  packets {port.num_packets - packets:4d}"
+            f"  bytes {num_bytes:6d}"
+            f"  wire {num_bytes * 10 / BAUDRATE * 1e3:6.1f} ms",
+        )
+
+
+def main() -> None:
+    """20軸のロボットで設定にかかる時間を比較する."""
+    print(f"{len(SERVO_IDS)} servos, {len(SETTINGS)} items")
+    bench("write/read per item", sequential)
+    bench("ConfigProfile.apply", ConfigProfile(SETTINGS).apply)
+
+
+if __name__ == "__main__":
+    main()
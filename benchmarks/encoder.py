@@ -0,0 +1,78 @@
+"""
+`FrameEncoder` のスループットがスレッド数(コア数)でどれだけ伸びるか.
+
+640x480 の画像を `NUM_FRAMES` 枚 `block=True` で投入し, 全てを取り出すまでの
+1秒あたりの枚数を `max_workers` ごとに計測する.
+`cv2.imencode` は GIL を解放するので, コア数までは概ね比例して伸びる.
+OpenCV 自身のスレッドと競合しないように `cv2.setNumThreads(1)` にする.
+
+```bash
+python benchmarks/encoder.py
+```
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import cv2
+
+from robopy.encoder import FrameEncoder
+from robopy.virtual_camera import SyntheticCamera
+
+WIDTH = 640
+HEIGHT = 480
+NUM_FRAMES = 300
+
+
+def bench(codec: str, max_workers: int) -> float:
+    """
+    `NUM_FRAMES` 枚をエンコードし, 1秒あたりの枚数を返す.
+
+    Parameters
+    ----------
+    codec : str
+        拡張子.
+    max_workers : int
+        エンコードするスレッド数.
+
+    Returns
+    -------
+    float
+        1秒あたりにエンコードした枚数.
+
+    """
+    camera = SyntheticCamera(WIDTH, HEIGHT, realtime=False)
+    frames = [camera.get_frame() for _ in range(8)]
+    encoder = FrameEncoder(codec, max_workers=max_workers, block=True)
+    writer = threading.Thread(target=lambda: sum(1 for _ in encoder))
+    start = time.perf_counter()
+    writer.start()
+    for i in range(NUM_FRAMES):
+        encoder.submit(frames[i % len(frames)])
+    encoder.close()
+    writer.join()
+    return NUM_FRAMES / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """スレッド数ごとのスループットと, 1スレッドに対する倍率を表示する."""
+    cv2.setNumThreads(1)
+    num_cores = os.cpu_count() or 1
+    workers = sorted({1, num_cores, *(w for w in (2, 4, 8) if w < num_cores)})
+    print(f"{WIDTH}x{HEIGHT}, {NUM_FRAMES} frames, {num_cores} cores")
+    for codec in (".jpg", ".png"):
+        baseline = 0.0
+        for max_workers in workers:
+            throughput = bench(codec, max_workers)
+            baseline = baseline or throughput
+            print(
+                f"{codec:5s} max_workers={max_workers:<3d}"
+                f" {throughput:8.1f} /s  x{throughput / baseline:.2f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+`ReadPlan`・`WritePlan` と `RobotDriver.read`・`write` の比較.
+
+`SimulatedPort` 上で計測するので, シリアル通信の待ち時間は含まない.
+シミュレーション側の応答の生成時間はどちらにも同じだけ含まれる.
+
+```bash
+python benchmarks/plan.py
+```
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from robopy import ControlTable, RobotDriver
+from robopy.plan import ReadPlan, WritePlan
+from robopy.sim import SimulatedPort, SimulatedServo
+
+SERVO_IDS = [1, 2, 3, 4, 5, 6]
+NUMBER = 2000
+
+
+def bench(name: str, stmt: str, namespace: dict[str, object]) -> float:
+    """
+    `stmt` の1回あたりの時間を計測して表示する.
+
+    Parameters
+    ----------
+    name : str
+        表示する名前.
+    stmt : str
+        計測する文.
+    namespace : dict[str, object]
+        `stmt` から参照する変数.
+
+    Returns
+    -------
+    float
+        1回あたりの時間 [s].
+
+    """
+    seconds = min(
+        timeit.repeat(stmt, globals=namespace, number=NUMBER, repeat=3),
+    )
+    per_call = seconds / NUMBER
+    print(f"{name:40s} {per_call * 1e6:8.1f} us")
+    return per_call
+
+
+def main() -> None:
+    """6軸のロボットで読み書きの時間を比較する."""
+    port = SimulatedPort([SimulatedServo(i) for i in SERVO_IDS])
+    robot = RobotDriver("sim", 1_000_000, SERVO_IDS, port_handler=port)
+    position = ControlTable.PRESENT_POSITION
+    velocity = ControlTable.PRESENT_VELOCITY
+    goal = ControlTable.GOAL_POSITION
+    values = [2048] * len(SERVO_IDS)
+    namespace: dict[str, object] = {
+        "robot": robot,
+        "position": position,
+        "velocity": velocity,
+        "goal": goal,
+        "values": values,
+        "read_plan": ReadPlan(robot, position),
+        "read_both": ReadPlan(robot, [velocity, position]),
+        "write_plan": WritePlan(robot, goal),
+    }
+
+    print(f"{len(SERVO_IDS)} servos, SimulatedPort")
+    read = bench(
+        "RobotDriver.read(POSITION)",
+        "robot.read(position)",
+        namespace,
+    )
+    plan = bench(
+        "ReadPlan(POSITION).execute()",
+        "read_plan.execute()",
+        namespace,
+    )
+    print(f"{'':40s} x{read / plan:.2f}")
+    read = bench(
+        "RobotDriver.read(VELOCITY, POSITION)",
+        "robot.read(velocity); robot.read(position)",
+        namespace,
+    )
+    plan = bench(
+        "ReadPlan([VELOCITY, POSITION]).execute()",
+        "read_both.execute()",
+        namespace,
+    )
+    print(f"{'':40s} x{read / plan:.2f}")
+    write = bench(
+        "RobotDriver.write(GOAL_POSITION)",
+        "robot.write(goal, values)",
+        namespace,
+    )
+    plan = bench(
+        "WritePlan(GOAL_POSITION).execute()",
+        "write_plan.execute(values)",
+        namespace,
+    )
+    print(f"{'':40s} x{write / plan:.2f}")
+
+
+if __name__ == "__main__":
+    main()
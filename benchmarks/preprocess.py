@@ -0,0 +1,116 @@
+"""
+カメラ画像の前処理(リサイズ・正規化)が 60FPS の周期に収まるかの確認.
+
+640x480 の BGR 画像を 224x224 の正規化した `(3, H, W)` の float32 にする
+時間を, 1枚ずつ配列を確保する素朴な実装と比較する.
+どれも 60FPS の1周期 (16.7 ms) に対する割合を表示し,
+`FramePreprocessor`・`BatchPreprocessor` が周期を超えた場合は
+終了コード1で終わる.
+
+```bash
+python benchmarks/preprocess.py
+```
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from typing import TYPE_CHECKING, Callable
+
+import cv2
+import numpy as np
+
+from robopy.preprocess import BatchPreprocessor, FramePreprocessor
+from robopy.virtual_camera import SyntheticCamera
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+WIDTH = 640
+HEIGHT = 480
+SIZE = (224, 224)
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+BUDGET = 1 / 60
+NUMBER = 200
+
+
+def bench(name: str, step: Callable[[], object]) -> float:
+    """
+    `step` の1回あたりの時間を計測し, `BUDGET` に対する割合を表示する.
+
+    Parameters
+    ----------
+    name : str
+        表示する名前.
+    step : Callable[[], object]
+        計測する処理.
+
+    Returns
+    -------
+    float
+        1回あたりの時間 [s].
+
+    """
+    seconds = min(timeit.repeat(step, number=NUMBER, repeat=3)) / NUMBER
+    print(f"{name:40s} {seconds * 1e3:7.2f} ms {seconds / BUDGET:7.1%}")
+    return seconds
+
+
+def naive(frame: npt.NDArray[np.uint8]) -> npt.NDArray[np.float32]:
+    """
+    画像ごとに中間の配列を確保する素朴な前処理.
+
+    Parameters
+    ----------
+    frame : npt.NDArray[np.uint8]
+        BGR の画像.
+
+    Returns
+    -------
+    npt.NDArray[np.float32]
+        `(3, H, W)` の正規化した画像.
+
+    """
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    resized = cv2.resize(rgb, SIZE, interpolation=cv2.INTER_AREA)
+    normalized = (resized.astype(np.float32) / 255 - MEAN) / STD
+    chw: npt.NDArray[np.float32] = normalized.transpose(2, 0, 1)
+    return chw.astype(np.float32)
+
+
+def main() -> int:
+    """
+    前処理の時間を計測する.
+
+    Returns
+    -------
+    int
+        全ての前処理が `BUDGET` に収まった場合は0.
+
+    """
+    frame = SyntheticCamera(WIDTH, HEIGHT, realtime=False).get_frame()
+    print(f"{WIDTH}x{HEIGHT} -> {SIZE[0]}x{SIZE[1]}, budget 16.7 ms (60 FPS)")
+    bench("naive (cvtColor, resize, astype)", lambda: naive(frame))
+
+    area = FramePreprocessor(size=SIZE, mean=MEAN, std=STD)
+    linear = FramePreprocessor(
+        size=SIZE,
+        mean=MEAN,
+        std=STD,
+        interpolation=cv2.INTER_LINEAR,
+    )
+    cameras = [SyntheticCamera(WIDTH, HEIGHT, realtime=False) for _ in "ab"]
+    batch = BatchPreprocessor(cameras, area)
+    results = [
+        bench("FramePreprocessor (INTER_AREA)", lambda: area(frame)),
+        bench("FramePreprocessor (INTER_LINEAR)", lambda: linear(frame)),
+        # 取得元からの画像のコピーも含む
+        bench("BatchPreprocessor (2 cameras)", batch.get_batch),
+    ]
+    return int(max(results) > BUDGET)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
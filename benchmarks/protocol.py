@@ -0,0 +1,148 @@
+"""
+`FastPacketHandler` と `dynamixel_sdk.Protocol2PacketHandler` の比較.
+
+`SimulatedPort` 上で計測するので, シリアル通信の待ち時間は含まない.
+シミュレーション側の応答の生成時間はどちらにも同じだけ含まれるため,
+その時間も別に計測して表示する.
+
+```bash
+python benchmarks/protocol.py
+```
+"""
+
+from __future__ import annotations
+
+import timeit
+
+import dynamixel_sdk
+
+from robopy import ControlTable, RobotDriver
+from robopy.plan import ReadPlan
+from robopy.protocol import FastPacketHandler, crc16
+from robopy.sim import SimulatedPort, SimulatedServo
+
+SERVO_IDS = [1, 2, 3, 4, 5, 6]
+NUMBER = 2000
+
+
+def bench(name: str, stmt: str, namespace: dict[str, object]) -> float:
+    """
+    `stmt` の1回あたりの時間を計測して表示する.
+
+    Parameters
+    ----------
+    name : str
+        表示する名前.
+    stmt : str
+        計測する文.
+    namespace : dict[str, object]
+        `stmt` から参照する変数.
+
+    Returns
+    -------
+    float
+        1回あたりの時間 [s].
+
+    """
+    seconds = min(
+        timeit.repeat(stmt, globals=namespace, number=NUMBER, repeat=3),
+    )
+    per_call = seconds / NUMBER
+    print(f"{name:40s} {per_call * 1e6:8.1f} us")
+    return per_call
+
+
+def namespace(
+    packet_handler: dynamixel_sdk.Protocol2PacketHandler,
+) -> dict[str, object]:
+    """
+    `packet_handler` を使うロボットと計測に使う変数を作る.
+
+    Parameters
+    ----------
+    packet_handler : dynamixel_sdk.Protocol2PacketHandler
+        使用するパケットハンドラ.
+
+    Returns
+    -------
+    dict[str, object]
+        `bench` に渡す変数.
+
+    """
+    port = SimulatedPort([SimulatedServo(i) for i in SERVO_IDS])
+    robot = RobotDriver(
+        "sim",
+        1_000_000,
+        SERVO_IDS,
+        port_handler=port,
+        packet_handler=packet_handler,
+    )
+    position = ControlTable.PRESENT_POSITION
+    sync_read = dynamixel_sdk.GroupSyncRead(
+        port,
+        packet_handler,
+        position.address,
+        position.num_bytes,
+    )
+    for servo_id in SERVO_IDS:
+        sync_read.addParam(servo_id)
+    return {
+        "robot": robot,
+        "port": port,
+        "position": position,
+        "goal": ControlTable.GOAL_POSITION,
+        "values": [2048] * len(SERVO_IDS),
+        "sync_read": sync_read,
+        "read_plan": ReadPlan(robot, position),
+    }
+
+
+def main() -> None:
+    """6軸のロボットで SDK と `FastPacketHandler` の時間を比較する."""
+    sdk = namespace(dynamixel_sdk.Protocol2PacketHandler())
+    fast = namespace(FastPacketHandler())
+    print(f"{len(SERVO_IDS)} servos, SimulatedPort")
+
+    data = bytes(range(64))
+    before = bench(
+        "SDK  updateCRC (64 bytes)",
+        "update_crc(0, data, 64)",
+        {
+            "update_crc": dynamixel_sdk.Protocol2PacketHandler().updateCRC,
+            "data": list(data),
+        },
+    )
+    after = bench(
+        "fast crc16 (64 bytes)",
+        "crc16(data)",
+        {
+            "crc16": crc16,
+            "data": data,
+        },
+    )
+    print(f"{'':45s} x{before / after:.2f}")
+
+    cases = [
+        ("RobotDriver.read(POSITION)", "robot.read(position)"),
+        ("RobotDriver.write(GOAL_POSITION)", "robot.write(goal, values)"),
+        ("GroupSyncRead(POSITION)", "sync_read.txRxPacket()"),
+        ("ReadPlan(POSITION).execute()", "read_plan.execute()"),
+    ]
+    for name, stmt in cases:
+        before = bench(f"SDK  {name}", stmt, sdk)
+        after = bench(f"fast {name}", stmt, fast)
+        print(f"{'':45s} x{before / after:.2f}")
+
+    # READ PRESENT_POSITION (ID 1) の命令パケットへの応答の生成時間
+    request = bytearray([0xFF, 0xFF, 0xFD, 0, 1, 7, 0, 2, 132, 0, 4, 0, 0, 0])
+    request[-2:] = crc16(request[:-2]).to_bytes(2, "little")
+    fast["request"] = bytes(request)
+    bench(
+        "SimulatedPort response per servo",
+        "port.writePort(request); port.clearPort()",
+        fast,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+サーボごとの READ・Sync Read・Fast Sync Read の比較.
+
+`SimulatedPort` 上で計測するので, ホスト側の処理時間にシリアル通信の
+待ち時間は含まない. 代わりに1回の読み取りで受信したバイト数と,
+4Mbps で受信する場合の時間を表示する.
+実機ではこれに加えて, ステータスパケットごとにサーボの応答遅延がかかる.
+
+```bash
+python benchmarks/sync_read.py
+```
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from robopy import ControlTable, RobotDriver
+from robopy.control_table import FAST_SYNC_READ_MIN_FIRMWARE
+from robopy.protocol import FastPacketHandler
+from robopy.sim import SimulatedPort, SimulatedServo
+
+NUM_SERVOS = [6, 12]
+BAUDRATE = 4_000_000
+NUMBER = 1000
+
+
+def bench(num_servos: int, name: str, firmware: int, stmt: str) -> None:
+    """
+    `stmt` の1回あたりの時間と受信したバイト数を表示する.
+
+    Parameters
+    ----------
+    num_servos : int
+        サーボの数.
+    name : str
+        表示する名前.
+    firmware : int
+        サーボの `VERSION_OF_FIRMWARE`.
+    stmt : str
+        計測する文. `robot` と `position` を参照できる.
+
+    """
+    servo_ids = list(range(1, num_servos + 1))
+    port = SimulatedPort([
+        SimulatedServo(i, firmware=firmware) for i in servo_ids
+    ])
+    robot = RobotDriver(
+        "sim",
+        BAUDRATE,
+        servo_ids,
+        port_handler=port,
+        packet_handler=FastPacketHandler(),
+    )
+    namespace = {"robot": robot, "position": ControlTable.PRESENT_POSITION}
+    # 最初の呼び出しで Fast Sync Read に対応しているかを判定する
+    timeit.timeit(stmt, globals=namespace, number=1)
+    rx_bytes = port.rx_bytes
+    tx_bytes = port.tx_bytes
+    seconds = min(
+        timeit.repeat(stmt, globals=namespace, number=NUMBER, repeat=3),
+    )
+    num_calls = NUMBER * 3
+    rx_per_read = (port.rx_bytes - rx_bytes) / num_calls
+    tx_per_read = (port.tx_bytes - tx_bytes) / num_calls
+    wire = (rx_per_read + tx_per_read) * 10 / BAUDRATE
+    print(
+        f"{num_servos:3d} servos  {name:16s}"
+        f" host {seconds / NUMBER * 1e6:7.1f} us"
+        f"  tx {tx_per_read:5.0f} B  rx {rx_per_read:5.0f} B"
+        f"  wire {wire * 1e6:6.1f} us",
+    )
+
+
+def main() -> None:
+    """`PRESENT_POSITION` の読み取りを比較する."""
+    old = FAST_SYNC_READ_MIN_FIRMWARE - 1
+    new = FAST_SYNC_READ_MIN_FIRMWARE
+    for num_servos in NUM_SERVOS:
+        bench(num_servos, "READ per servo", new, "robot.read(position)")
+        bench(
+            num_servos,
+            "Sync Read",
+            old,
+            "robot.read(position, fast_sync_read=True)",
+        )
+        bench(
+            num_servos,
+            "Fast Sync Read",
+            new,
+            "robot.read(position, fast_sync_read=True)",
+        )
+
+
+if __name__ == "__main__":
+    main()
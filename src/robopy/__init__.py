@@ -1,16 +1,25 @@
 """`from robopy import xxx` のためのショートカット."""
 
 from robopy.camera import CameraDriver
-from robopy.control_table import ControlTable, OperatingMode, cast_value
+from robopy.control_table import (
+    ControlTable,
+    HardwareError,
+    OperatingMode,
+    cast_value,
+)
 from robopy.dynamixel import DynamixelCommError, DynamixelDriver
 from robopy.robot import RobotDriver
+from robopy.units import to_physical, to_raw
 
 __all__ = [
     "CameraDriver",
     "ControlTable",
     "DynamixelCommError",
     "DynamixelDriver",
+    "HardwareError",
     "OperatingMode",
     "RobotDriver",
     "cast_value",
+    "to_physical",
+    "to_raw",
 ]
@@ -1,10 +1,34 @@
 """Webカメラの制御を行うモジュール."""
 
+from __future__ import annotations
+
+from typing import Protocol
+
 import cv2
 import numpy as np
 import numpy.typing as npt
 
 
+class FrameSource(Protocol):
+    """
+    `get_frame` で画像を返すもの.
+
+    `CameraDriver` 以外にも, 画像を受け取る処理はこの型を受け付ける.
+    """
+
+    def get_frame(self) -> npt.ArrayLike:
+        """
+        現在の画像を返す.
+
+        Returns
+        -------
+        npt.ArrayLike
+            画像.
+
+        """
+        ...
+
+
 class CameraDriver(cv2.VideoCapture):
     """
     OpenCVを用いた, Webカメラの制御を行うクラス.
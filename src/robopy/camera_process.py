@@ -0,0 +1,577 @@
+"""
+Webカメラの取得を別プロセスで行う.
+
+MJPEG のデコードは CPU 負荷が高く, 同じスレッドでサーボの通信を行うと
+制御周期が乱れる. `CameraProcess` はワーカープロセスで
+`cv2.VideoCapture` を動かし, デコードした画像を共有メモリ上の
+`FrameRing` に直接書き込む. 読み込み側はコピー無しで最新の画像を参照できる.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Callable, Sequence, Union
+
+import numpy as np
+
+from robopy.camera import CameraDriver
+from robopy.shm import (
+    SeqlockArray,
+    attach_shared_memory,
+    unlink_shared_memory,
+)
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.sharedctypes import Synchronized
+    from multiprocessing.synchronize import Event
+
+    import numpy.typing as npt
+
+    from robopy.virtual_camera import VirtualCamera
+
+__all__ = ["CameraProcess", "FrameRing"]
+
+Capture = Union[CameraDriver, "VirtualCamera"]
+
+META_NBYTES = 32
+"""`FrameRing` の先頭に置く形状情報(スロット数, 高さ, 幅, チャネル数)."""
+
+
+class FrameRing:
+    """
+    共有メモリ上の画像のリングバッファ.
+
+    あらかじめ確保した `num_slots` 個の `(height, width, channels)` の
+    スロットに順番に画像を書き込む. 各スロットと最新の画像番号は
+    `SeqlockArray` で保護されているので, 書き込み側1プロセスに対して
+    複数のプロセスが `attach` して同時に読み込める.
+
+    Note
+    ----
+    `latest` が返すのは共有メモリのビューなので,
+    `num_slots - 1` 枚分の画像が書き込まれると上書きされる.
+    長く保持する場合はコピーするか, 使用後に `is_intact` で確認すること.
+
+    Example
+    -------
+    ```python
+    from robopy.camera_process import FrameRing
+
+    ring = FrameRing.attach(name)  # `CameraProcess.ring_name`
+    frame, timestamp, sequence = ring.latest()
+    ```
+
+    Parameters
+    ----------
+    shm : shared_memory.SharedMemory
+        リングバッファを配置する共有メモリ.
+
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory) -> None:
+        self.shm = shm
+        meta: npt.NDArray[np.int64] = np.ndarray((4,), np.int64, shm.buf)
+        num_slots, height, width, channels = (int(v) for v in meta)
+        self.num_slots = num_slots
+        self.shape = (height, width, channels)
+        del meta
+
+        head_nbytes = SeqlockArray.nbytes((1,), np.int64)
+        slot_nbytes = SeqlockArray.nbytes(self.shape, np.uint8)
+        self._head = SeqlockArray(shm.buf, (1,), np.int64, META_NBYTES)
+        self._head_buffer = np.empty(1, dtype=np.int64)
+        self._slots = [
+            SeqlockArray(
+                shm.buf,
+                self.shape,
+                np.uint8,
+                META_NBYTES + head_nbytes + i * slot_nbytes,
+            )
+            for i in range(num_slots)
+        ]
+        self._views: list[npt.NDArray[np.uint8]] = [
+            slot.data.view() for slot in self._slots
+        ]
+        for view in self._views:
+            view.flags.writeable = False
+        self._next = 0
+
+    @staticmethod
+    def nbytes(num_slots: int, shape: Sequence[int]) -> int:
+        """
+        リングバッファに必要なバイト数を返す.
+
+        Parameters
+        ----------
+        num_slots : int
+            スロット数.
+        shape : Sequence[int]
+            画像の形状 `(height, width, channels)`.
+
+        Returns
+        -------
+        int
+            バイト数.
+
+        """
+        head_nbytes = SeqlockArray.nbytes((1,), np.int64)
+        slot_nbytes = SeqlockArray.nbytes(shape, np.uint8)
+        return META_NBYTES + head_nbytes + num_slots * slot_nbytes
+
+    @classmethod
+    def create(cls, num_slots: int, shape: Sequence[int]) -> FrameRing:
+        """
+        共有メモリを新規に確保してリングバッファを作る.
+
+        Parameters
+        ----------
+        num_slots : int
+            スロット数. 2以上.
+        shape : Sequence[int]
+            画像の形状 `(height, width, channels)`.
+
+        Returns
+        -------
+        FrameRing
+            空のリングバッファ.
+
+        Raises
+        ------
+        ValueError
+            `num_slots` が2未満, もしくは `shape` が3次元でない場合.
+
+        """
+        if num_slots < 2:  # noqa: PLR2004
+            msg = f"num_slots must be >= 2, got {num_slots}"
+            raise ValueError(msg)
+        if len(shape) != 3:  # noqa: PLR2004
+            msg = f"shape must be (height, width, channels), got {shape}"
+            raise ValueError(msg)
+
+        size = cls.nbytes(num_slots, shape)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        meta: npt.NDArray[np.int64] = np.ndarray((4,), np.int64, shm.buf)
+        meta[:] = (num_slots, *shape)
+        del meta
+
+        ring = cls(shm)
+        ring._head.write(-1, timestamp=0.0)  # noqa: SLF001
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> FrameRing:
+        """
+        既存のリングバッファに接続する.
+
+        Parameters
+        ----------
+        name : str
+            共有メモリの名前. `FrameRing.name` で取得できる.
+
+        Returns
+        -------
+        FrameRing
+            リングバッファ.
+
+        """
+        return cls(attach_shared_memory(name))
+
+    @property
+    def name(self) -> str:
+        """
+        共有メモリの名前.
+
+        Returns
+        -------
+        str
+            `attach` に渡す名前.
+
+        """
+        return self.shm.name
+
+    def begin(self) -> npt.NDArray[np.uint8]:
+        """
+        次のスロットへの書き込みを開始する.
+
+        返り値のビューに直接画像を書き込み, `commit` を呼ぶ.
+        `cv2.VideoCapture.read` の出力先に渡せばコピー無しで書き込める.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8]
+            書き込み先のスロット.
+
+        """
+        slot = self._slots[self._next % self.num_slots]
+        slot.begin_write()
+        data: npt.NDArray[np.uint8] = slot.data
+        return data
+
+    def commit(self, timestamp: float) -> int:
+        """
+        `begin` で開始したスロットへの書き込みを完了し, 最新の画像とする.
+
+        Parameters
+        ----------
+        timestamp : float
+            画像を取得した時刻.
+
+        Returns
+        -------
+        int
+            書き込んだ画像の通し番号.
+
+        """
+        sequence = self._next
+        self._slots[sequence % self.num_slots].end_write(timestamp)
+        self._head.write(sequence, timestamp)
+        self._next += 1
+        return sequence
+
+    def abort(self) -> None:
+        """
+        `begin` で開始したスロットへの書き込みを取り消す.
+
+        スロットの画像は書き換えていないものとして, 元の状態に戻す.
+        """
+        self._slots[self._next % self.num_slots].abort_write()
+
+    def put(self, frame: npt.ArrayLike, timestamp: float) -> int:
+        """
+        画像をコピーして書き込む.
+
+        Parameters
+        ----------
+        frame : npt.ArrayLike
+            画像. `shape` と同じ形状である必要がある.
+        timestamp : float
+            画像を取得した時刻.
+
+        Returns
+        -------
+        int
+            書き込んだ画像の通し番号.
+
+        """
+        np.copyto(self.begin(), frame)
+        return self.commit(timestamp)
+
+    def is_intact(self, sequence: int) -> bool:
+        """
+        通し番号 `sequence` の画像がまだ上書きされていないかを返す.
+
+        Parameters
+        ----------
+        sequence : int
+            `latest` で取得した通し番号.
+
+        Returns
+        -------
+        bool
+            上書き(書き込み中も含む)されていなければ `True`.
+
+        """
+        slot = self._slots[sequence % self.num_slots]
+        return slot.version == 2 * (sequence // self.num_slots + 1)
+
+    def latest(self) -> tuple[npt.NDArray[np.uint8], float, int]:
+        """
+        最新の画像をコピー無しで返す.
+
+        Returns
+        -------
+        tuple[npt.NDArray[np.uint8], float, int]
+            frame : npt.NDArray[np.uint8]
+                共有メモリ上の画像の読み取り専用ビュー.
+            timestamp : float
+                画像を取得した時刻.
+            sequence : int
+                画像の通し番号.
+
+        Raises
+        ------
+        RuntimeError
+            まだ1枚も書き込まれていない場合.
+
+        """
+        while True:
+            self._head.read(self._head_buffer)
+            sequence = int(self._head_buffer[0])
+            if sequence < 0:
+                msg = "FrameRing has no frame yet."
+                raise RuntimeError(msg)
+            index = sequence % self.num_slots
+            timestamp = self._slots[index].timestamp
+            if self.is_intact(sequence):
+                return self._views[index], timestamp, sequence
+
+    def close(self, *, unlink: bool = False) -> None:
+        """
+        共有メモリを閉じる.
+
+        `latest` で取得したビューを全て破棄してから呼ぶこと.
+
+        Parameters
+        ----------
+        unlink : bool
+            共有メモリ自体を破棄するかどうか.
+
+        """
+        self._head.close()
+        for slot in self._slots:
+            slot.close()
+        del self._views, self._head_buffer
+        self.shm.close()
+        if unlink:
+            unlink_shared_memory(self.shm)
+
+
+class CameraProcess:
+    """
+    `CameraDriver` をワーカープロセスで動かし, `FrameRing` で共有する.
+
+    ワーカーは画像を取得するたびに `FrameRing` の次のスロットへ
+    直接デコードする. `get_frame` は最新のスロットのビューを返すだけなので,
+    メインプロセスではデコードのコストがかからない.
+    他のプロセス(録画・表示・推論など)も `ring_name` で同じ画像を参照できる.
+    画像の取得に失敗した場合は `capture_error_count` に加算し,
+    `1 / fps` 秒待ってから取得し直す.
+
+    Example
+    -------
+    ```python
+    from robopy.camera_process import CameraProcess, FrameRing
+
+    camera = CameraProcess(camera_id=0)
+    frame, timestamp, sequence = camera.get_stamped_frame()
+
+    # 別のプロセスから
+    ring = FrameRing.attach(camera.ring_name)
+    frame, timestamp, sequence = ring.latest()
+    ```
+
+    Parameters
+    ----------
+    camera_id : int
+        カメラのID.
+    width : int
+        画像の幅.
+    height : int
+        画像の高さ.
+    fps : int
+        カメラのFPS.
+    num_slots : int
+        リングバッファのスロット数.
+    source : Callable[[], CameraDriver | VirtualCamera] | None
+        ワーカー内でカメラの代わりに呼び出す, 画像の取得元を作る関数.
+        `robopy.virtual_camera` の取得元でカメラ無しに動かす場合など.
+        プロセスに渡せるように `functools.partial` などを使う.
+
+    Raises
+    ------
+    RuntimeError
+        ワーカー内でのカメラの初期化に失敗した場合や,
+        画像の大きさが `(height, width, 3)` でない場合.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        camera_id: int,
+        width: int = 320,
+        height: int = 240,
+        fps: int = 60,
+        num_slots: int = 4,
+        *,
+        source: Callable[[], Capture] | None = None,
+    ) -> None:
+        self.camera_id = camera_id
+        self.ring = FrameRing.create(num_slots, (height, width, 3))
+        ctx = mp.get_context()
+        self._stop = ctx.Event()
+        self._capture_error_count: Synchronized[int] = ctx.Value("q", 0)
+        conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_run_capture,
+            kwargs={
+                "camera_id": camera_id,
+                "width": width,
+                "height": height,
+                "fps": fps,
+                "ring_name": self.ring.name,
+                "conn": child_conn,
+                "stop": self._stop,
+                "capture_error_count": self._capture_error_count,
+                "source": source,
+            },
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        try:
+            response = conn.recv()
+        except EOFError:
+            response = RuntimeError(f"Worker for camera {camera_id} exited.")
+        conn.close()
+        if isinstance(response, Exception):
+            self.close()
+            raise response
+
+    @property
+    def capture_error_count(self) -> int:
+        """
+        ワーカーで画像の取得に失敗した回数.
+
+        Returns
+        -------
+        int
+            取得に失敗した回数.
+
+        """
+        return int(self._capture_error_count.value)
+
+    @property
+    def ring_name(self) -> str:
+        """
+        `FrameRing` の共有メモリの名前.
+
+        Returns
+        -------
+        str
+            `FrameRing.attach` に渡す名前.
+
+        """
+        return self.ring.name
+
+    def get_stamped_frame(self) -> tuple[npt.NDArray[np.uint8], float, int]:
+        """
+        最新の画像を取得時刻・通し番号付きでコピー無しで返す.
+
+        Returns
+        -------
+        tuple[npt.NDArray[np.uint8], float, int]
+            frame : npt.NDArray[np.uint8]
+                共有メモリ上の画像の読み取り専用ビュー.
+            timestamp : float
+                画像を取得した時刻(`time.monotonic`).
+            sequence : int
+                画像の通し番号.
+
+        Raises
+        ------
+        RuntimeError
+            ワーカーが終了している場合.
+
+        """
+        if not self.process.is_alive():
+            msg = f"camera: {self.camera_id}のワーカーが終了しています."
+            raise RuntimeError(msg)
+        return self.ring.latest()
+
+    def get_frame(self) -> npt.NDArray[np.uint8]:
+        """
+        最新の画像をコピー無しで返す.
+
+        `CameraDriver.get_frame` と同じように使える.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8]
+            共有メモリ上の画像の読み取り専用ビュー.
+
+        """
+        frame, _, _ = self.get_stamped_frame()
+        return frame
+
+    def close(self, timeout: float = 1.0) -> None:
+        """
+        ワーカーを停止し, 共有メモリを破棄する.
+
+        Parameters
+        ----------
+        timeout : float
+            ワーカーの終了を待つ時間 [s]. 過ぎた場合は強制終了する.
+
+        """
+        self._stop.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close(unlink=True)
+
+
+def _run_capture(  # noqa: PLR0913
+    *,
+    camera_id: int,
+    width: int,
+    height: int,
+    fps: int,
+    ring_name: str,
+    conn: Connection,
+    stop: Event,
+    capture_error_count: Synchronized[int],
+    source: Callable[[], Capture] | None,
+) -> None:
+    """`CameraProcess` のワーカープロセスの本体."""
+    ring = FrameRing.attach(ring_name)
+    try:
+        if source is None:
+            camera: Capture = CameraDriver(camera_id, width, height, fps)
+        else:
+            camera = source()
+        frame = camera.get_frame()
+    except RuntimeError as e:
+        ring.close()
+        conn.send(e)
+        return
+    if np.shape(frame) != ring.shape:
+        ring.close()
+        msg = f"camera: {camera_id}の画像の形状が{np.shape(frame)}です."
+        conn.send(RuntimeError(msg))
+        return
+
+    ring.put(frame, time.monotonic())
+    conn.send(None)
+    conn.close()
+
+    try:
+        while not stop.is_set():
+            if not _capture(camera, ring):
+                capture_error_count.value += 1
+                stop.wait(1 / fps)
+    finally:
+        ring.close()
+        camera.release()
+
+
+def _capture(camera: Capture, ring: FrameRing) -> bool:
+    """
+    `ring` の次のスロットに画像を1枚デコードする.
+
+    Parameters
+    ----------
+    camera : CameraDriver | VirtualCamera
+        画像を取得するカメラ.
+    ring : FrameRing
+        書き込み先.
+
+    Returns
+    -------
+    bool
+        画像の取得に成功したかどうか.
+
+    """
+    slot = ring.begin()
+    ret, decoded = camera.read(slot)
+    if not ret or decoded is None:
+        ring.abort()
+        return False
+    if not np.shares_memory(decoded, slot):
+        np.copyto(slot, decoded)
+    ring.commit(time.monotonic())
+    return True
@@ -0,0 +1,457 @@
+"""
+サーボの `REALTIME_TICK` とホストの時刻の対応付け.
+
+サーボの値にホスト側で付けた時刻は, シリアル通信の往復時間だけ遅れ, 揺らぐ.
+`TickClock` は各サーボの 1 ms 周期の `REALTIME_TICK` と
+`time.monotonic` の関係(オフセットとドリフト)を推定し,
+値を実際に取得した時刻をホストの時刻で返す.
+`TimestampIndex` はサーボやカメラの時刻列から
+指定した時刻に最も近いサンプルや補間値を二分探索で求める.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Sequence
+
+import dynamixel_sdk
+import numpy as np
+
+from robopy.control_table import ControlTable, cast_value
+from robopy.dynamixel import DynamixelCommError
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from robopy.robot import RobotDriver
+
+__all__ = ["TICK_PERIOD", "TickClock", "TimestampIndex", "unwrap_ticks"]
+
+TICK_PERIOD = 32768
+"""`REALTIME_TICK` が一周する値. 0~32767 [ms] の15ビットのカウンタ."""
+
+
+def unwrap_ticks(
+    ticks: npt.ArrayLike,
+    period: int = TICK_PERIOD,
+) -> npt.NDArray[np.int64]:
+    """
+    一周して0に戻るカウンタを単調増加の値に戻す.
+
+    連続する2つのサンプルの間隔が `period` 未満であることを仮定する.
+    `REALTIME_TICK` の場合は約32秒.
+
+    Example
+    -------
+    ```python
+    unwrap_ticks([32766, 32767, 0, 1])  # [32766, 32767, 32768, 32769]
+    ```
+
+    Parameters
+    ----------
+    ticks : npt.ArrayLike
+        時刻順のカウンタの値. 2次元以上の場合は最初の軸を時間とする.
+    period : int
+        カウンタが一周する値.
+
+    Returns
+    -------
+    npt.NDArray[np.int64]
+        最初の値を基準に単調増加にした値.
+
+    """
+    raw = np.asarray(ticks, dtype=np.int64)
+    unwrapped = np.empty_like(raw)
+    if len(raw) == 0:
+        return unwrapped
+    unwrapped[0] = raw[0]
+    steps = np.diff(raw, axis=0) % period
+    np.cumsum(steps, axis=0, out=unwrapped[1:])
+    unwrapped[1:] += raw[0]
+    return unwrapped
+
+
+class TickClock:
+    """
+    各サーボの `REALTIME_TICK` からホストの時刻を推定する.
+
+    `update` にサーボのティックと, その読み取りの前後のホストの時刻を渡す.
+    サーボごとに次の関係を当てはめる.
+
+    `host_time = offset + (1 + drift) * tick * 1e-3`
+
+    - `drift` はこれまでの全サンプルから最小二乗法で求める.
+      累積和だけを保持するので, 長時間でも計算量は変わらない.
+    - `offset` は直近 `window` 個のサンプルから求める.
+      取得時刻は要求の送信(`sent`)より後で, 応答の受信(`received`)より前なので,
+      両方の境界のうち最も厳しいものの中点とする.
+      `sent` が無い場合は `received` 側の境界とするため,
+      推定値は応答の転送時間の分だけ遅れる.
+
+    Note
+    ----
+    - `REALTIME_TICK` は 1 ms 単位なので, 推定の分解能も 1 ms 程度.
+    - 約32秒以上 `update` しないとティックの一周を検出できない.
+
+    Example
+    -------
+    ```python
+    from robopy import ControlTable, RobotDriver
+    from robopy.clock import TickClock
+
+    robot = RobotDriver(...)
+    clock = TickClock(num_servos=len(robot.servos))
+    while True:
+        position, acquired_at = clock.read(
+            robot, ControlTable.PRESENT_POSITION
+        )
+    ```
+
+    Parameters
+    ----------
+    num_servos : int
+        サーボの数.
+    window : int
+        `offset` の推定に使う直近のサンプル数.
+
+    """
+
+    def __init__(self, num_servos: int, window: int = 256) -> None:
+        self.num_servos = num_servos
+        self.window = window
+        self.offset = np.zeros(num_servos)
+        self.drift = np.zeros(num_servos)
+        self.num_samples = 0
+        # 桁落ちを防ぐため, 最初のサンプルからの相対値で累積する
+        self._origin = np.zeros((2, num_servos))
+        self._sums = np.zeros((5, num_servos))
+        self._ticks = np.zeros((window, num_servos))
+        self._received = np.zeros((window, num_servos))
+        self._sent = np.full((window, num_servos), -np.inf)
+        self._last_raw = np.zeros(num_servos, dtype=np.int64)
+        self._last_unwrapped = np.zeros(num_servos, dtype=np.int64)
+
+    def unwrap(self, ticks: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """
+        直前の `update` からの続きとしてティックを単調増加の値に戻す.
+
+        Parameters
+        ----------
+        ticks : npt.ArrayLike
+            各サーボの `REALTIME_TICK` の値.
+
+        Returns
+        -------
+        npt.NDArray[np.int64]
+            各サーボの単調増加のティック.
+
+        """
+        raw = np.asarray(ticks, dtype=np.int64)
+        if self.num_samples == 0:
+            return raw.copy()
+        step = (raw - self._last_raw) % TICK_PERIOD
+        return self._last_unwrapped + step
+
+    def update(
+        self,
+        ticks: npt.ArrayLike,
+        received: npt.ArrayLike,
+        sent: npt.ArrayLike | None = None,
+    ) -> npt.NDArray[np.float64]:
+        """
+        サンプルを追加して当てはめ直し, 取得時刻を推定する.
+
+        Parameters
+        ----------
+        ticks : npt.ArrayLike
+            各サーボの `REALTIME_TICK` の値.
+        received : npt.ArrayLike
+            各サーボの応答を受信したホストの時刻(`time.monotonic`).
+            全サーボで共通の場合はスカラーで良い.
+        sent : npt.ArrayLike | None
+            各サーボへ要求を送信したホストの時刻(`time.monotonic`).
+
+        Returns
+        -------
+        npt.NDArray[np.float64]
+            各サーボの値の取得時刻の推定値.
+
+        """
+        unwrapped = self.unwrap(ticks)
+        self._last_raw[:] = ticks
+        self._last_unwrapped[:] = unwrapped
+        seconds = unwrapped * 1e-3
+        received = np.broadcast_to(received, (self.num_servos,))
+        host = received if sent is None else (np.add(sent, received)) / 2
+
+        if self.num_samples == 0:
+            self._origin[:] = seconds, host
+        t = seconds - self._origin[0]
+        h = host - self._origin[1]
+        self._sums += (np.ones_like(t), t, h, t * t, t * h)
+
+        row = self.num_samples % self.window
+        self._ticks[row] = seconds
+        self._received[row] = received
+        self._sent[row] = -np.inf if sent is None else sent
+        self.num_samples += 1
+        self._fit()
+        return self.to_host(unwrapped)
+
+    def to_host(self, ticks: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        """
+        単調増加のティックをホストの時刻に変換する.
+
+        Parameters
+        ----------
+        ticks : npt.ArrayLike
+            `unwrap` 済みのティック. 最後の軸をサーボとする.
+
+        Returns
+        -------
+        npt.NDArray[np.float64]
+            ホストの時刻(`time.monotonic`).
+
+        """
+        seconds = np.asarray(ticks, dtype=np.float64) * 1e-3
+        return self.offset + (1 + self.drift) * seconds
+
+    def read(
+        self,
+        robot: RobotDriver,
+        control_table: ControlTable,
+    ) -> tuple[list[int], npt.NDArray[np.float64]]:
+        """
+        各サーボから値と `REALTIME_TICK` を読み取り, 取得時刻を推定する.
+
+        サーボごとに `REALTIME_TICK` と `control_table` を含むアドレスの範囲を
+        1回の READ 命令で読み取るので, 値と `REALTIME_TICK` は
+        同じステータスパケットから得られる.
+
+        Parameters
+        ----------
+        robot : RobotDriver
+            読み取るロボット.
+        control_table : ControlTable
+            読み取るデータの種類.
+
+        Returns
+        -------
+        tuple[list[int], npt.NDArray[np.float64]]
+            values : list[int]
+                各サーボからの値.
+            timestamps : npt.NDArray[np.float64]
+                各サーボの値の取得時刻の推定値.
+
+        Raises
+        ------
+        DynamixelCommError
+            読み取りに失敗した場合.
+
+        """
+        tick = ControlTable.REALTIME_TICK
+        address = min(tick.address, control_table.address)
+        end = max(
+            tick.address + tick.num_bytes,
+            control_table.address + control_table.num_bytes,
+        )
+        values = []
+        ticks = np.empty(len(robot.servos), dtype=np.int64)
+        sent = np.empty(len(robot.servos))
+        received = np.empty(len(robot.servos))
+        for i, servo in enumerate(robot.servos):
+            sent[i] = time.monotonic()
+            data, dxl_comm_result, dxl_error = robot.packet_handler.readTxRx(
+                robot.port_handler,
+                servo.servo_id,
+                address,
+                end - address,
+            )
+            received[i] = time.monotonic()
+            if dxl_comm_result != dynamixel_sdk.COMM_SUCCESS:
+                msg = (
+                    f"servo_id={servo.servo_id}の{control_table}と"
+                    f"{tick}の読み取りに失敗しました."
+                )
+                raise DynamixelCommError(msg, dxl_comm_result, dxl_error)
+            ticks[i] = _field(data, address, tick)
+            values.append(_field(data, address, control_table))
+        return values, self.update(ticks, received, sent)
+
+    def _fit(self) -> None:
+        """サーボごとの `drift` と `offset` を求める."""
+        n, st, sh, stt, sth = self._sums
+        var = n * stt - st * st
+        slope: npt.NDArray[np.float64] = np.divide(
+            n * sth - st * sh,
+            var,
+            out=np.ones(self.num_servos),
+            where=var > 0,
+        )
+        self.drift = slope - 1
+
+        rows = min(self.num_samples, self.window)
+        scaled = slope * self._ticks[:rows]
+        upper = (self._received[:rows] - scaled).min(axis=0)
+        lower = (self._sent[:rows] - scaled).max(axis=0)
+        self.offset = np.where(np.isfinite(lower), (lower + upper) / 2, upper)
+
+
+def _field(data: Sequence[int], address: int, item: ControlTable) -> int:
+    """
+    READ 命令で読み取ったバイト列から1つの項目の値を取り出す.
+
+    Parameters
+    ----------
+    data : Sequence[int]
+        `address` から読み取ったバイト列.
+    address : int
+        `data` の先頭のアドレス.
+    item : ControlTable
+        取り出す項目.
+
+    Returns
+    -------
+    int
+        `item` のデータ型に合わせた値.
+
+    """
+    start = item.address - address
+    raw = int.from_bytes(bytes(data[start : start + item.num_bytes]), "little")
+    return cast_value(raw, item.dtype)
+
+
+class TimestampIndex:
+    """
+    時刻列の二分探索による検索.
+
+    長いエピソードでも, 各問い合わせは `O(log n)` で済む.
+    カメラの時刻に合わせてサーボの値を補間する場合などに使う.
+
+    Example
+    -------
+    ```python
+    from robopy.clock import TimestampIndex
+
+    servo_index = TimestampIndex(servo_timestamps)
+    # カメラの各フレームの時刻での関節角
+    positions = servo_index.interpolate(camera_timestamps, servo_positions)
+    # カメラの各フレームに最も近いサーボのサンプル
+    nearest = servo_index.nearest(camera_timestamps)
+    ```
+
+    Parameters
+    ----------
+    timestamps : npt.ArrayLike
+        1次元の時刻列. 整列されていなくても良い.
+
+    """
+
+    def __init__(self, timestamps: npt.ArrayLike) -> None:
+        stamps = np.asarray(timestamps, dtype=np.float64)
+        self.order = np.argsort(stamps, kind="stable")
+        self.timestamps = stamps[self.order]
+
+    def __len__(self) -> int:
+        """
+        サンプル数.
+
+        Returns
+        -------
+        int
+            サンプル数.
+
+        """
+        return len(self.timestamps)
+
+    def bracket(
+        self,
+        queries: npt.ArrayLike,
+    ) -> tuple[
+        npt.NDArray[np.intp],
+        npt.NDArray[np.intp],
+        npt.NDArray[np.float64],
+    ]:
+        """
+        各時刻を挟む前後のサンプルと, その間の位置を求める.
+
+        範囲外の時刻は最初もしくは最後のサンプルに丸める.
+
+        Parameters
+        ----------
+        queries : npt.ArrayLike
+            問い合わせる時刻.
+
+        Returns
+        -------
+        tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[Any]]
+            before : npt.NDArray[np.intp]
+                直前のサンプルの番号(元の時刻列での番号).
+            after : npt.NDArray[np.intp]
+                直後のサンプルの番号(元の時刻列での番号).
+            weight : npt.NDArray[np.float64]
+                `before` から `after` までの位置(0~1).
+
+        """
+        q = np.asarray(queries, dtype=np.float64)
+        after = np.searchsorted(self.timestamps, q).clip(1, len(self) - 1)
+        before = after - 1
+        t0 = self.timestamps[before]
+        span = self.timestamps[after] - t0
+        weight = np.divide(
+            q - t0,
+            span,
+            out=np.zeros(q.shape),
+            where=span > 0,
+        ).clip(0, 1)
+        return self.order[before], self.order[after], weight
+
+    def nearest(self, queries: npt.ArrayLike) -> npt.NDArray[np.intp]:
+        """
+        各時刻に最も近いサンプルの番号を求める.
+
+        Parameters
+        ----------
+        queries : npt.ArrayLike
+            問い合わせる時刻.
+
+        Returns
+        -------
+        npt.NDArray[np.intp]
+            元の時刻列での番号.
+
+        """
+        if len(self) == 1:
+            return np.zeros(np.shape(queries), dtype=np.intp)
+        before, after, weight = self.bracket(queries)
+        return np.where(weight <= 0.5, before, after)  # noqa: PLR2004
+
+    def interpolate(
+        self,
+        queries: npt.ArrayLike,
+        values: npt.ArrayLike,
+    ) -> npt.NDArray[Any]:
+        """
+        各時刻での値を前後のサンプルから線形補間する.
+
+        Parameters
+        ----------
+        queries : npt.ArrayLike
+            問い合わせる時刻 `(M,)`.
+        values : npt.ArrayLike
+            元の時刻列と同じ順番の値 `(N, ...)`.
+
+        Returns
+        -------
+        npt.NDArray[Any]
+            補間した値 `(M, ...)`.
+
+        """
+        data: npt.NDArray[Any] = np.asarray(values)
+        if len(self) == 1:
+            return np.repeat(data[:1], np.size(queries), axis=0)
+        before, after, weight = self.bracket(queries)
+        w = weight.reshape(weight.shape + (1,) * (data.ndim - 1))
+        interpolated: npt.NDArray[Any] = data[before] * (1 - w)
+        interpolated += data[after] * w
+        return interpolated
@@ -0,0 +1,425 @@
+"""
+サーボの設定をまとめて書き込み, 書き込めたことを確認する.
+
+ロボットの立ち上げでは `OPERATING_MODE`・`DRIVE_MODE`・各ゲイン・
+`*_LIMIT`・`PROFILE_*` などを全サーボに設定する.
+`DynamixelDriver.write`・`read` で1項目ずつ設定すると,
+サーボ数と項目数の積だけ往復が必要になり, `R/W(NVM)` の項目はトルクを切ってから
+書き込む必要もある.
+`ConfigProfile` は設定する項目と値を宣言的に持ち,
+現在の値を1回の Sync Read で読み取って異なる項目だけを
+アドレスの連続した項目ごとの Sync Write で書き込む.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping, Sequence, Union
+
+import dynamixel_sdk
+import numpy as np
+
+from robopy.control_table import ControlTable
+from robopy.dynamixel import DynamixelCommError
+
+if TYPE_CHECKING:
+    import os
+
+    import numpy.typing as npt
+
+    from robopy.robot import RobotDriver
+
+__all__ = ["ConfigProfile"]
+
+Setting = Union[
+    int,
+    Sequence[int],
+    "np.integer[Any]",
+    "npt.NDArray[np.integer[Any]]",
+]
+"""1項目の設定値. 全サーボに共通の整数か, サーボごとの整数の列."""
+
+TORQUE = ControlTable.TORQUE_ENABLE
+
+
+class ConfigProfile:
+    """
+    全サーボに設定する項目と値.
+
+    値は全サーボに共通の整数か, `RobotDriver.servos` の順の整数の列で指定する.
+    numpy の整数・配列でも良い.
+    `apply` は次の順に設定する.
+
+    1. 設定する全項目を1回の Sync Read で読み取り, 値の異なる項目を探す.
+    2. `R/W(NVM)` の項目を書き換えるサーボのうち,
+       トルクが入っているサーボのトルクを切る.
+    3. アドレスの連続した項目ごとに, 値の異なるサーボにだけ Sync Write する.
+    4. トルクを切ったサーボのトルクを戻す.
+       `TORQUE_ENABLE` を設定する場合はその値にする.
+    5. もう1度 Sync Read で読み取り, 全項目が設定値になったことを確認する.
+
+    Example
+    -------
+    ```python
+    from robopy import ControlTable, OperatingMode, RobotDriver
+    from robopy.config import ConfigProfile
+
+    robot = RobotDriver(...)
+    profile = ConfigProfile({
+        ControlTable.OPERATING_MODE: OperatingMode.POSITION_CONTROL_MODE.value,
+        ControlTable.POSITION_P_GAIN: [800, 800, 800, 640, 640],
+        ControlTable.PROFILE_VELOCITY: 100,
+        ControlTable.TORQUE_ENABLE: 1,
+    })
+    profile.save("robot.json")
+    changes = robot.apply_profile(ConfigProfile.load("robot.json"))
+    ```
+
+    Parameters
+    ----------
+    settings : Mapping[ControlTable, Setting]
+        設定する項目と値.
+
+    Raises
+    ------
+    ValueError
+        読み取り専用の項目を含む場合.
+
+    """
+
+    def __init__(self, settings: Mapping[ControlTable, Setting]) -> None:
+        read_only = [item.name for item in settings if item.access == "R"]
+        if read_only:
+            msg = f"{read_only}は読み取り専用です."
+            raise ValueError(msg)
+        self.settings = dict(
+            sorted(settings.items(), key=lambda kv: kv[0].address),
+        )
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> ConfigProfile:
+        """
+        `save` で保存した JSON ファイルから読み込む.
+
+        ファイルは `{"OPERATING_MODE": 3, "POSITION_P_GAIN": [800, ...]}` の
+        ように, `ControlTable` の名前と値を持つ.
+
+        Parameters
+        ----------
+        path : str | os.PathLike[str]
+            JSON ファイル.
+
+        Returns
+        -------
+        ConfigProfile
+            読み込んだ設定.
+
+        """
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls({ControlTable[name]: value for name, value in data.items()})
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """
+        JSON ファイルに保存する.
+
+        Parameters
+        ----------
+        path : str | os.PathLike[str]
+            保存先.
+
+        """
+        data = {
+            # `np.int64` などの numpy の値も `int`・`list[int]` にする
+            item.name: np.asarray(value, dtype=np.int64).tolist()
+            for item, value in self.settings.items()
+        }
+        text = json.dumps(data, indent=2)
+        Path(path).write_text(text + "\n", encoding="utf-8")
+
+    def diff(self, robot: RobotDriver) -> dict[ControlTable, list[int]]:
+        """
+        1回の Sync Read で読み取り, 設定値と異なるサーボを返す.
+
+        Parameters
+        ----------
+        robot : RobotDriver
+            確認するロボット.
+
+        Returns
+        -------
+        dict[ControlTable, list[int]]
+            設定値と異なる項目と, その項目が異なるサーボのID.
+
+        """
+        items = list(self.settings)
+        mismatch = _sync_read(robot, items) != self._targets(robot)
+        return _changes(robot, items, mismatch)
+
+    def apply(
+        self,
+        robot: RobotDriver,
+        *,
+        verify: bool = True,
+    ) -> dict[ControlTable, list[int]]:
+        """
+        設定値と異なる項目だけを書き込む.
+
+        Parameters
+        ----------
+        robot : RobotDriver
+            設定するロボット.
+        verify : bool
+            書き込んだ後にもう1度読み取り, 設定値になったことを確認するか.
+
+        Returns
+        -------
+        dict[ControlTable, list[int]]
+            書き込んだ項目と, その項目を書き込んだサーボのID.
+
+        Raises
+        ------
+        RuntimeError
+            `verify=True` で, 書き込んだ後も設定値と異なる項目がある場合.
+
+        """
+        items = list(self.settings)
+        targets = self._targets(robot)
+        # トルクの状態も同じ Sync Read で読み取る
+        reads = items if TORQUE in self.settings else [*items, TORQUE]
+        current = _sync_read(robot, reads)
+        torque = current[reads.index(TORQUE)]
+        mismatch = current[: len(items)] != targets
+
+        rows = [i for i, item in enumerate(items) if item != TORQUE]
+        nvm = [i for i in rows if items[i].access == "R/W(NVM)"]
+        unlock = mismatch[nvm].any(axis=0) & (torque != 0)
+        if unlock.any():
+            _sync_write(robot, [TORQUE], np.zeros((1, len(unlock))), unlock)
+        for run in _runs(items, rows):
+            servos = mismatch[run].any(axis=0)
+            if servos.any():
+                _sync_write(
+                    robot,
+                    [items[i] for i in run],
+                    targets[run],
+                    servos,
+                )
+
+        if TORQUE in self.settings:
+            final = targets[items.index(TORQUE)]
+        else:
+            final = torque
+        restore = final != np.where(unlock, 0, torque)
+        if restore.any():
+            _sync_write(robot, [TORQUE], final[np.newaxis], restore)
+
+        if verify:
+            remaining = self.diff(robot)
+            if remaining:
+                names = {item.name: ids for item, ids in remaining.items()}
+                msg = f"書き込んだ後も設定値と異なる項目があります: {names}"
+                raise RuntimeError(msg)
+        return _changes(robot, items, mismatch)
+
+    def _targets(self, robot: RobotDriver) -> npt.NDArray[np.int64]:
+        """
+        設定値を符号なしの値の配列にする.
+
+        Parameters
+        ----------
+        robot : RobotDriver
+            設定するロボット.
+
+        Returns
+        -------
+        npt.NDArray[np.int64]
+            `(項目数, サーボ数)` の, 負の値を2の補数にした設定値.
+
+        Raises
+        ------
+        ValueError
+            値の数がサーボの数と一致しない場合.
+
+        """
+        num_servos = len(robot.servos)
+        targets = np.empty((len(self.settings), num_servos), dtype=np.int64)
+        for row, (item, value) in zip(targets, self.settings.items()):
+            values = np.asarray(value, dtype=np.int64)
+            if values.ndim and len(values) != num_servos:
+                msg = (
+                    f"{item.name}の値の数({len(values)})が"
+                    f"サーボの数({num_servos})と一致しません."
+                )
+                raise ValueError(msg)
+            row[:] = values % (1 << (8 * item.num_bytes))
+        return targets
+
+
+def _sync_read(
+    robot: RobotDriver,
+    items: Sequence[ControlTable],
+) -> npt.NDArray[np.int64]:
+    """
+    先頭から末尾の項目のアドレスまでを1回の Sync Read で読み取る.
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        読み取るロボット.
+    items : Sequence[ControlTable]
+        読み取る項目.
+
+    Returns
+    -------
+    npt.NDArray[np.int64]
+        `(項目数, サーボ数)` の符号なしの値.
+
+    Raises
+    ------
+    DynamixelCommError
+        通信に失敗した場合.
+
+    """
+    servo_ids = [servo.servo_id for servo in robot.servos]
+    address = min(item.address for item in items)
+    length = max(item.address + item.num_bytes for item in items) - address
+    group = dynamixel_sdk.GroupSyncRead(
+        robot.port_handler,
+        robot.packet_handler,
+        address,
+        length,
+    )
+    for servo_id in servo_ids:
+        group.addParam(servo_id)
+    dxl_comm_result = group.txRxPacket()
+    if dxl_comm_result != dynamixel_sdk.COMM_SUCCESS:
+        msg = f"servo_ids={servo_ids}の設定のSync Readに失敗しました."
+        raise DynamixelCommError(msg, dxl_comm_result, 0)
+
+    raw = np.array([group.data_dict[i] for i in servo_ids], dtype=np.uint8)
+    values = np.empty((len(items), len(servo_ids)), dtype=np.int64)
+    for row, item in zip(values, items):
+        start = item.address - address
+        field = raw[:, start : start + item.num_bytes]
+        row[:] = np.ascontiguousarray(field).view(f"<u{item.num_bytes}")[:, 0]
+    return values
+
+
+def _sync_write(
+    robot: RobotDriver,
+    items: Sequence[ControlTable],
+    values: npt.ArrayLike,
+    servos: npt.NDArray[np.bool_],
+) -> None:
+    """
+    アドレスの連続した項目を1回の Sync Write で書き込む.
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        書き込むロボット.
+    items : Sequence[ControlTable]
+        アドレスの連続した項目.
+    values : npt.ArrayLike
+        `(項目数, サーボ数)` の符号なしの値.
+    servos : npt.NDArray[np.bool_]
+        書き込むサーボ. `(サーボ数,)`.
+
+    Raises
+    ------
+    DynamixelCommError
+        送信に失敗した場合.
+
+    """
+    values = np.asarray(values, dtype=np.int64)
+    # 項目ごとにリトルエンディアンのバイト列にして, サーボごとに連結する
+    data = np.concatenate(
+        [
+            row.astype(f"<u{item.num_bytes}")
+            .view(np.uint8)
+            .reshape(-1, item.num_bytes)
+            for row, item in zip(values, items)
+        ],
+        axis=1,
+    )
+    group = dynamixel_sdk.GroupSyncWrite(
+        robot.port_handler,
+        robot.packet_handler,
+        items[0].address,
+        data.shape[1],
+    )
+    servo_ids = []
+    for servo, row, selected in zip(robot.servos, data, servos):
+        if selected:
+            servo_ids.append(servo.servo_id)
+            group.addParam(servo.servo_id, row.tolist())
+    dxl_comm_result = group.txPacket()
+    if dxl_comm_result != dynamixel_sdk.COMM_SUCCESS:
+        names = ", ".join(item.name for item in items)
+        msg = f"{servo_ids=}の{names}のSync Writeに失敗しました."
+        raise DynamixelCommError(msg, dxl_comm_result, 0)
+
+
+def _runs(
+    items: Sequence[ControlTable],
+    rows: Sequence[int],
+) -> list[list[int]]:
+    """
+    アドレスの連続した項目ごとに分ける.
+
+    Parameters
+    ----------
+    items : Sequence[ControlTable]
+        アドレス順の項目.
+    rows : Sequence[int]
+        分ける項目の番号.
+
+    Returns
+    -------
+    list[list[int]]
+        アドレスの連続した項目の番号.
+
+    """
+    runs: list[list[int]] = []
+    end = -1
+    for i in rows:
+        if items[i].address != end:
+            runs.append([])
+        runs[-1].append(i)
+        end = items[i].address + items[i].num_bytes
+    return runs
+
+
+def _changes(
+    robot: RobotDriver,
+    items: Sequence[ControlTable],
+    mismatch: npt.NDArray[np.bool_],
+) -> dict[ControlTable, list[int]]:
+    """
+    値の異なる項目とサーボのIDの辞書にする.
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        対象のロボット.
+    items : Sequence[ControlTable]
+        項目.
+    mismatch : npt.NDArray[np.bool_]
+        `(項目数, サーボ数)` の, 値が異なるかどうか.
+
+    Returns
+    -------
+    dict[ControlTable, list[int]]
+        値の異なる項目と, その項目が異なるサーボのID.
+
+    """
+    return {
+        item: [
+            servo.servo_id
+            for servo, different in zip(robot.servos, row)
+            if different
+        ]
+        for item, row in zip(items, mismatch)
+        if row.any()
+    }
@@ -11,7 +11,7 @@ References
 from __future__ import annotations
 
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import Enum, IntFlag, auto
 from typing import Literal
 
 
@@ -41,6 +41,55 @@ class Dtype(Enum):
     INT32 = auto()
 
 
+class Unit(Enum):
+    """
+    `ControlItem`の値の物理単位.
+
+    各メンバは `(scale, symbol)` を持ち, `Physical = Value * scale` となる.
+    `scale` が `None` のものはモデルによって係数が異なる.
+    配列単位の変換は `robopy.units` を参照.
+
+    Attributes
+    ----------
+    NONE : tuple[float, str]
+        無次元. 変換しない.
+    DEG : tuple[float, str]
+        位置. `360 / 4096 [deg]`.
+    RPM : tuple[float, str]
+        速度. `0.229 [rpm]`.
+    RPM2 : tuple[float, str]
+        加速度. `214.577 [rpm²]`.
+    PERCENT : tuple[float, str]
+        PWMのデューティー比. `100 / 855 [%]`.
+    VOLT : tuple[float, str]
+        電圧. `0.1 [V]`.
+    MILLIAMP : tuple[None, str]
+        電流. 係数はモデル依存(`robopy.units.CURRENT_SCALING_FACTORS`).
+    DEGC : tuple[float, str]
+        温度. `1 [degC]`.
+    MSEC : tuple[float, str]
+        時間. `1 [ms]`.
+    DELAY : tuple[float, str]
+        応答遅延時間. `2 [us]`.
+
+    """
+
+    NONE = (1.0, "")
+    DEG = (360 / 4096, "deg")
+    RPM = (0.229, "rpm")
+    RPM2 = (214.577, "rpm²")
+    PERCENT = (100 / 855, "%")
+    VOLT = (0.1, "V")
+    MILLIAMP = (None, "mA")
+    DEGC = (1.0, "degC")
+    MSEC = (1.0, "ms")
+    DELAY = (2.0, "us")
+
+    def __init__(self, scale: float | None, symbol: str) -> None:
+        self.scale = scale
+        self.symbol = symbol
+
+
 @dataclass
 class ControlItem:
     """
@@ -57,6 +106,8 @@ class ControlItem:
     access : Literal['R', 'R/W', 'R/W(NVM)']
         アクセス権限.
         `NVM`(不揮発メモリ)の書き換えを行う場合はトルクを切る必要がある.
+    unit : Unit
+        値の物理単位. デフォルトは無次元(`Unit.NONE`).
 
     """
 
@@ -64,6 +115,7 @@ class ControlItem:
     num_bytes: Literal[1, 2, 4]
     dtype: Dtype
     access: Literal["R", "R/W", "R/W(NVM)"]
+    unit: Unit = Unit.NONE
 
 
 class ControlTable(Enum):
@@ -292,22 +344,22 @@ class ControlTable(Enum):
     VERSION_OF_FIRMWARE = ControlItem(6, 1, Dtype.UINT8, "R")
     ID = ControlItem(7, 1, Dtype.UINT8, "R/W(NVM)")
     BAUDRATE = ControlItem(8, 1, Dtype.UINT8, "R/W(NVM)")
-    RETURN_DELAY_TIME = ControlItem(9, 1, Dtype.UINT8, "R/W(NVM)")
+    RETURN_DELAY_TIME = ControlItem(9, 1, Dtype.UINT8, "R/W(NVM)", Unit.DELAY)
     DRIVE_MODE = ControlItem(10, 1, Dtype.UINT8, "R/W(NVM)")
-    OPERATING_MODE = ControlItem(11, 2, Dtype.UINT16, "R/W(NVM)")
+    OPERATING_MODE = ControlItem(11, 1, Dtype.UINT8, "R/W(NVM)")
     SECONDARY_ID = ControlItem(12, 1, Dtype.UINT8, "R/W(NVM)")
     PROTOCOL_VERSION = ControlItem(13, 1, Dtype.UINT8, "R")
-    HOMING_OFFSET = ControlItem(20, 4, Dtype.INT32, "R/W(NVM)")
-    MOVING_THRESHOLD = ControlItem(24, 4, Dtype.UINT32, "R/W(NVM)")
-    TEMPERATURE_LIMIT = ControlItem(31, 1, Dtype.UINT8, "R/W(NVM)")
-    MAX_VOLTAGE_LIMIT = ControlItem(32, 2, Dtype.UINT16, "R/W(NVM)")
-    MIN_VOLTAGE_LIMIT = ControlItem(34, 2, Dtype.UINT16, "R/W(NVM)")
-    CURRENT_LIMIT = ControlItem(38, 2, Dtype.UINT16, "R/W(NVM)")
-    PWM_LIMIT = ControlItem(40, 2, Dtype.UINT16, "R/W(NVM)")
-    ACCELERATION_LIMIT = ControlItem(44, 4, Dtype.UINT32, "R/W(NVM)")
-    VELOCITY_LIMIT = ControlItem(48, 4, Dtype.UINT32, "R/W(NVM)")
-    MAX_POSITION_LIMIT = ControlItem(52, 4, Dtype.INT32, "R/W(NVM)")
-    MIN_POSITION_LIMIT = ControlItem(56, 4, Dtype.INT32, "R/W(NVM)")
+    HOMING_OFFSET = ControlItem(20, 4, Dtype.INT32, "R/W(NVM)", Unit.DEG)
+    MOVING_THRESHOLD = ControlItem(24, 4, Dtype.UINT32, "R/W(NVM)", Unit.RPM)
+    TEMPERATURE_LIMIT = ControlItem(31, 1, Dtype.UINT8, "R/W(NVM)", Unit.DEGC)
+    MAX_VOLTAGE_LIMIT = ControlItem(32, 2, Dtype.UINT16, "R/W(NVM)", Unit.VOLT)
+    MIN_VOLTAGE_LIMIT = ControlItem(34, 2, Dtype.UINT16, "R/W(NVM)", Unit.VOLT)
+    CURRENT_LIMIT = ControlItem(38, 2, Dtype.UINT16, "R/W(NVM)", Unit.MILLIAMP)
+    PWM_LIMIT = ControlItem(40, 2, Dtype.UINT16, "R/W(NVM)", Unit.PERCENT)
+    ACCELERATION_LIMIT = ControlItem(44, 4, Dtype.UINT32, "R/W(NVM)", Unit.RPM2)
+    VELOCITY_LIMIT = ControlItem(48, 4, Dtype.UINT32, "R/W(NVM)", Unit.RPM)
+    MAX_POSITION_LIMIT = ControlItem(52, 4, Dtype.INT32, "R/W(NVM)", Unit.DEG)
+    MIN_POSITION_LIMIT = ControlItem(56, 4, Dtype.INT32, "R/W(NVM)", Unit.DEG)
     SHUTDOWN = ControlItem(63, 1, Dtype.UINT8, "R/W")
     LED = ControlItem(65, 1, Dtype.UINT8, "R/W")
     TORQUE_ENABLE = ControlItem(64, 1, Dtype.UINT8, "R/W")
@@ -319,28 +371,29 @@ class ControlTable(Enum):
     POSITION_P_GAIN = ControlItem(84, 2, Dtype.UINT16, "R/W")
     FEEDFORWARD_ACCELERATION_GAIN = ControlItem(88, 2, Dtype.UINT16, "R/W")
     FEEDFORWARD_VELOCITY_GAIN = ControlItem(90, 2, Dtype.UINT16, "R/W")
-    GOAL_PWM = ControlItem(100, 2, Dtype.INT16, "R/W")
-    GOAL_CURRENT = ControlItem(102, 2, Dtype.INT16, "R/W")
-    GOAL_VELOCITY = ControlItem(104, 4, Dtype.INT32, "R/W")
-    PROFILE_ACCELERATION = ControlItem(108, 4, Dtype.UINT32, "R/W")
-    PROFILE_VELOCITY = ControlItem(112, 4, Dtype.UINT32, "R/W")
-    GOAL_POSITION = ControlItem(116, 4, Dtype.INT32, "R/W")
-    REALTIME_TICK = ControlItem(120, 2, Dtype.UINT16, "R")
+    GOAL_PWM = ControlItem(100, 2, Dtype.INT16, "R/W", Unit.PERCENT)
+    GOAL_CURRENT = ControlItem(102, 2, Dtype.INT16, "R/W", Unit.MILLIAMP)
+    GOAL_VELOCITY = ControlItem(104, 4, Dtype.INT32, "R/W", Unit.RPM)
+    PROFILE_ACCELERATION = ControlItem(108, 4, Dtype.UINT32, "R/W", Unit.RPM2)
+    PROFILE_VELOCITY = ControlItem(112, 4, Dtype.UINT32, "R/W", Unit.RPM)
+    GOAL_POSITION = ControlItem(116, 4, Dtype.INT32, "R/W", Unit.DEG)
+    REALTIME_TICK = ControlItem(120, 2, Dtype.UINT16, "R", Unit.MSEC)
     MOVING_STATUS = ControlItem(122, 1, Dtype.UINT8, "R")
-    PRESENT_PWM = ControlItem(124, 2, Dtype.INT16, "R")
-    PRESENT_CURRENT = ControlItem(126, 2, Dtype.INT16, "R")
-    PRESENT_VELOCITY = ControlItem(128, 4, Dtype.INT32, "R")
-    PRESENT_POSITION = ControlItem(132, 4, Dtype.INT32, "R")
-    VELOCITY_TRAJECTORY = ControlItem(136, 4, Dtype.INT32, "R")
-    POSITION_TRAJECTORY = ControlItem(140, 4, Dtype.INT32, "R")
-    PRESENT_INPUT_VOLTAGE = ControlItem(144, 2, Dtype.UINT16, "R")
-    PRESENT_TEMPERATURE = ControlItem(146, 1, Dtype.UINT8, "R")
+    PRESENT_PWM = ControlItem(124, 2, Dtype.INT16, "R", Unit.PERCENT)
+    PRESENT_CURRENT = ControlItem(126, 2, Dtype.INT16, "R", Unit.MILLIAMP)
+    PRESENT_VELOCITY = ControlItem(128, 4, Dtype.INT32, "R", Unit.RPM)
+    PRESENT_POSITION = ControlItem(132, 4, Dtype.INT32, "R", Unit.DEG)
+    VELOCITY_TRAJECTORY = ControlItem(136, 4, Dtype.INT32, "R", Unit.RPM)
+    POSITION_TRAJECTORY = ControlItem(140, 4, Dtype.INT32, "R", Unit.DEG)
+    PRESENT_INPUT_VOLTAGE = ControlItem(144, 2, Dtype.UINT16, "R", Unit.VOLT)
+    PRESENT_TEMPERATURE = ControlItem(146, 1, Dtype.UINT8, "R", Unit.DEGC)
 
     def __init__(self, control_item: ControlItem) -> None:
         self.address = control_item.address
         self.num_bytes = control_item.num_bytes
         self.dtype = control_item.dtype
         self.access = control_item.access
+        self.unit = control_item.unit
 
 
 class OperatingMode(Enum):
@@ -372,6 +425,32 @@ class OperatingMode(Enum):
     PWM_CONTROL_MODE = 16
 
 
+class HardwareError(IntFlag):
+    """
+    `HARDWARE_ERROR_STATUS` と `SHUTDOWN` の各ビット.
+
+    Attributes
+    ----------
+    INPUT_VOLTAGE : int
+        入力電圧が `MIN/MAX_VOLTAGE_LIMIT` の範囲外.
+    OVERHEATING : int
+        内部温度が `TEMPERATURE_LIMIT` を超えた.
+    MOTOR_ENCODER : int
+        モータのエンコーダの異常.
+    ELECTRICAL_SHOCK : int
+        電気的な衝撃, もしくは入力電圧不足による回路の異常.
+    OVERLOAD : int
+        最大出力での過負荷が続いた.
+
+    """
+
+    INPUT_VOLTAGE = 1 << 0
+    OVERHEATING = 1 << 2
+    MOTOR_ENCODER = 1 << 3
+    ELECTRICAL_SHOCK = 1 << 4
+    OVERLOAD = 1 << 5
+
+
 class Baudrate(Enum):
     """
     通信する際のボーレート.
@@ -451,3 +530,62 @@ def cast_value(value: float, dtype: Dtype) -> int:
         if value >= 0x80000000:
             value -= 0x100000000
     return int(value)
+
+
+FAST_SYNC_READ_MODELS = frozenset({
+    1000,  # XH430-W350
+    1010,  # XH430-W210
+    1020,  # XM430-W350
+    1030,  # XM430-W210
+    1040,  # XH430-V350
+    1050,  # XH430-V210
+    1060,  # XL430-W250
+    1070,  # XC430-W150
+    1080,  # XC430-W240
+    1090,  # 2XL430-W250
+    1100,  # XH540-W270
+    1110,  # XH540-W150
+    1120,  # XM540-W270
+    1130,  # XM540-W150
+    1140,  # XH540-V270
+    1150,  # XH540-V150
+    1160,  # 2XC430-W250
+    1170,  # XW540-T260
+    1180,  # XW540-T140
+    1190,  # XL330-M077
+    1200,  # XL330-M288
+    1210,  # XC330-M181
+    1220,  # XC330-M288
+    1230,  # XC330-T181
+    1240,  # XC330-T288
+    1270,  # XW430-T333
+    1280,  # XW430-T200
+})
+"""Fast Sync Read に対応する X シリーズの `MODEL_NUMBER`."""
+
+FAST_SYNC_READ_MIN_FIRMWARE = 45
+"""Fast Sync Read に対応する `VERSION_OF_FIRMWARE` の最小値."""
+
+
+def supports_fast_sync_read(model_number: int, firmware: int) -> bool:
+    """
+    サーボが Fast Sync Read に対応しているかどうか.
+
+    Parameters
+    ----------
+    model_number : int
+        `MODEL_NUMBER` の値.
+    firmware : int
+        `VERSION_OF_FIRMWARE` の値.
+
+    Returns
+    -------
+    bool
+        X シリーズかつファームウェアが `FAST_SYNC_READ_MIN_FIRMWARE` 以降の場合
+        `True`.
+
+    """
+    return (
+        model_number in FAST_SYNC_READ_MODELS
+        and firmware >= FAST_SYNC_READ_MIN_FIRMWARE
+    )
@@ -7,6 +7,8 @@ References
 - [wuphilipp/gello_software](https://github.com/wuphilipp/gello_software)
 """
 
+from __future__ import annotations
+
 import dynamixel_sdk
 
 from robopy.control_table import ControlTable, cast_value
@@ -139,6 +141,7 @@ class DynamixelCommError(ConnectionError):
 
     `dxl_comm_result_code` と `dxl_error_code` は
     `dynamixel_sdk.packetHandler` のread/write系メソッドの返り値に対応する.
+    別プロセスへ送れるように, 受け取った引数をそのまま属性として保持する.
 
     Parameters
     ----------
@@ -157,6 +160,10 @@ class DynamixelCommError(ConnectionError):
         dxl_comm_result_code: int,
         dxl_error_code: int,
     ) -> None:
+        self.original_message = message
+        self.dxl_comm_result_code = dxl_comm_result_code
+        self.dxl_error_code = dxl_error_code
+
         packet_handler = dynamixel_sdk.Protocol2PacketHandler()
         dxl_comm_result = packet_handler.getTxRxResult(dxl_comm_result_code)
         dxl_error = packet_handler.getRxPacketError(dxl_error_code)
@@ -165,3 +172,22 @@ class DynamixelCommError(ConnectionError):
         message += f"{dxl_comm_result=}\n{dxl_error=}"
 
         super().__init__(message)
+
+    def __reduce__(
+        self,
+    ) -> tuple[type[DynamixelCommError], tuple[str, int, int]]:
+        """
+        `pickle` 用に, `__init__` の引数を返す.
+
+        Returns
+        -------
+        tuple[type[DynamixelCommError], tuple[str, int, int]]
+            クラスと `__init__` の引数.
+
+        """
+        args = (
+            self.original_message,
+            self.dxl_comm_result_code,
+            self.dxl_error_code,
+        )
+        return type(self), args
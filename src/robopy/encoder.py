@@ -0,0 +1,372 @@
+"""
+録画用に画像をスレッドプールで並列に圧縮する.
+
+`cv2.imencode` はエンコード中に GIL を解放するので,
+複数のスレッドで同時にエンコードすればコア数に応じてスループットが伸びる.
+撮影側のスレッドは画像をキューに入れるだけで, エンコードを待たない.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+__all__ = ["EncodedFrame", "FrameEncoder"]
+
+QUALITY_FLAGS = {
+    ".jpg": cv2.IMWRITE_JPEG_QUALITY,
+    ".jpeg": cv2.IMWRITE_JPEG_QUALITY,
+    ".png": cv2.IMWRITE_PNG_COMPRESSION,
+    ".webp": cv2.IMWRITE_WEBP_QUALITY,
+}
+"""拡張子ごとの `quality` に対応する `cv2.imwrite` のフラグ."""
+
+
+@dataclass
+class EncodedFrame:
+    """
+    エンコード済みの画像.
+
+    Attributes
+    ----------
+    index : int
+        `submit` された順番の通し番号(0始まり).
+    timestamp : float
+        `submit` に渡された取得時刻.
+    data : bytes
+        エンコードされた画像.
+    encode_time : float
+        エンコードそのものにかかった時間 [s].
+    latency : float
+        `submit` からエンコード完了までの時間 [s]. キューでの待ち時間を含む.
+
+    """
+
+    index: int
+    timestamp: float
+    data: bytes
+    encode_time: float
+    latency: float
+
+
+class FrameEncoder:
+    """
+    画像を有界なキューに入れ, スレッドプールでエンコードする.
+
+    エンコード結果は `get` またはイテレーションで `submit` と同じ順番で取り出す.
+    キューには取り出されていない画像(エンコード中・エンコード済み)が
+    最大 `max_queue` 枚まで入る.
+
+    キューが一杯の場合, 既定では `submit` は待たずに画像を捨てて `False` を返し,
+    `dropped_frames` を加算する. `block=True` の場合は空きが出るまで待つ.
+
+    Note
+    ----
+    `submit` は画像をコピーしない. `CameraProcess.get_frame` のように
+    同じバッファを使い回す取得元の場合は, コピーを渡すこと.
+
+    Example
+    -------
+    ```python
+    import threading
+    import time
+
+    from robopy import CameraDriver
+    from robopy.encoder import FrameEncoder
+
+    camera = CameraDriver(camera_id=0, width=640, height=480)
+    encoder = FrameEncoder(codec=".jpg", quality=90)
+
+    def write() -> None:
+        for encoded in encoder:
+            with open(f"frames/{encoded.index:06d}.jpg", "wb") as f:
+                f.write(encoded.data)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    for _ in range(600):
+        encoder.submit(camera.get_frame(), time.monotonic())
+    encoder.close()
+    writer.join()
+    ```
+
+    Parameters
+    ----------
+    codec : str
+        拡張子(`".jpg"`, `".png"`, `".webp"` など).
+    quality : int | None
+        JPEG・WebP の品質(0~100), PNG の圧縮レベル(0~9).
+        `None` の場合は OpenCV の既定値.
+    max_workers : int | None
+        エンコードするスレッド数. `None` の場合はコア数に応じて決まる.
+    max_queue : int
+        キューに入れられる画像の最大数.
+    block : bool
+        キューが一杯の場合に `submit` を待たせるかどうか.
+
+    Raises
+    ------
+    ValueError
+        `quality` に対応していない `codec` の場合.
+
+    """
+
+    def __init__(
+        self,
+        codec: str = ".jpg",
+        quality: int | None = None,
+        *,
+        max_workers: int | None = None,
+        max_queue: int = 64,
+        block: bool = False,
+    ) -> None:
+        self.codec = codec
+        self.params: list[int] = []
+        if quality is not None:
+            if codec.lower() not in QUALITY_FLAGS:
+                msg = f"quality is not supported for codec {codec!r}."
+                raise ValueError(msg)
+            self.params = [QUALITY_FLAGS[codec.lower()], quality]
+        self.max_queue = max_queue
+        self.block = block
+
+        self.submitted_frames = 0
+        self.dropped_frames = 0
+        self.max_queue_depth = 0
+        self._total_encode_time = 0.0
+        self._encoded_frames = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = threading.Semaphore(max_queue)
+        self._pending: deque[Future[EncodedFrame]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        キューに入っている(まだ取り出されていない)画像の数.
+
+        Returns
+        -------
+        int
+            画像の数.
+
+        """
+        return len(self._pending)
+
+    @property
+    def mean_encode_time(self) -> float:
+        """
+        これまでのエンコード時間の平均 [s].
+
+        Returns
+        -------
+        float
+            平均のエンコード時間. まだエンコードしていない場合は 0.
+
+        """
+        if self._encoded_frames == 0:
+            return 0.0
+        return self._total_encode_time / self._encoded_frames
+
+    def submit(
+        self,
+        frame: npt.ArrayLike,
+        timestamp: float | None = None,
+    ) -> bool:
+        """
+        画像をキューに入れる.
+
+        Parameters
+        ----------
+        frame : npt.ArrayLike
+            BGR の画像.
+        timestamp : float | None
+            画像の取得時刻. `None` の場合は `time.monotonic()`.
+
+        Returns
+        -------
+        bool
+            キューに入れた場合は `True`.
+            キューが一杯で画像を捨てた場合は `False`.
+
+        Raises
+        ------
+        RuntimeError
+            `close` の後に呼ばれた場合, もしくは
+            `block=True` で空きを待っている間に `close` された場合.
+
+        """
+        if self._closed:
+            msg = "FrameEncoder is closed."
+            raise RuntimeError(msg)
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if not self._slots.acquire(blocking=self.block):
+            self.dropped_frames += 1
+            return False
+
+        with self._condition:
+            # 待っている間に `close` された場合は, もうエンコードできない
+            if self._closed:
+                self._slots.release()
+                msg = "FrameEncoder was closed while waiting for a free slot."
+                raise RuntimeError(msg)
+            future = self._executor.submit(
+                self._encode,
+                self.submitted_frames,
+                timestamp,
+                frame,
+                time.perf_counter(),
+            )
+            self.submitted_frames += 1
+            self._pending.append(future)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+            self._condition.notify()
+        return True
+
+    def get(self, timeout: float | None = None) -> EncodedFrame:
+        """
+        次の画像のエンコードを待って取り出す.
+
+        Parameters
+        ----------
+        timeout : float | None
+            キューが空の場合に待つ時間 [s]. `None` の場合は無制限.
+
+        Returns
+        -------
+        EncodedFrame
+            `submit` された順番で次の画像.
+
+        Raises
+        ------
+        queue.Empty
+            `timeout` 以内に画像が来なかった場合, もしくは
+            `close` 後にキューが空になった場合.
+
+        """
+        encoded = self._take(timeout)
+        if encoded is None:
+            raise queue.Empty
+        return encoded
+
+    def __iter__(self) -> Iterator[EncodedFrame]:
+        """
+        `close` されてキューが空になるまで画像を取り出す.
+
+        Yields
+        ------
+        EncodedFrame
+            `submit` された順番の画像.
+
+        """
+        while (encoded := self._take(None)) is not None:
+            yield encoded
+
+    def close(self) -> None:
+        """
+        新しい画像の受け付けを止め, キューの画像のエンコード完了を待つ.
+
+        エンコード済みの画像は引き続き `get` で取り出せる.
+        `block=True` の `submit` で空きを待っているスレッドは
+        `RuntimeError` で戻る.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        # 空きを待っている `submit` を起こす
+        for _ in range(self.max_queue):
+            self._slots.release()
+        self._executor.shutdown(wait=True)
+
+    def _take(self, timeout: float | None) -> EncodedFrame | None:
+        """
+        先頭の画像のエンコードを待ってキューから取り出す.
+
+        エンコード中の例外はそのまま送出する.
+
+        Parameters
+        ----------
+        timeout : float | None
+            キューが空の場合に待つ時間 [s].
+
+        Returns
+        -------
+        EncodedFrame | None
+            先頭の画像. 取り出せなかった場合は `None`.
+
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._pending or self._closed,
+                timeout,
+            )
+            if not self._pending:
+                return None
+            future = self._pending.popleft()
+        try:
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def _encode(
+        self,
+        index: int,
+        timestamp: float,
+        frame: npt.ArrayLike,
+        submitted: float,
+    ) -> EncodedFrame:
+        """
+        ワーカースレッドで画像をエンコードする.
+
+        Parameters
+        ----------
+        index : int
+            画像の通し番号.
+        timestamp : float
+            画像の取得時刻.
+        frame : npt.ArrayLike
+            BGR の画像.
+        submitted : float
+            `submit` された時刻(`time.perf_counter`).
+
+        Returns
+        -------
+        EncodedFrame
+            エンコード済みの画像.
+
+        Raises
+        ------
+        RuntimeError
+            エンコードに失敗した場合.
+
+        """
+        start = time.perf_counter()
+        ret, buffer = cv2.imencode(self.codec, np.asarray(frame), self.params)
+        if not ret:
+            msg = f"Failed to encode frame {index} as {self.codec}."
+            raise RuntimeError(msg)
+        end = time.perf_counter()
+        with self._condition:
+            self._encoded_frames += 1
+            self._total_encode_time += end - start
+        return EncodedFrame(
+            index=index,
+            timestamp=timestamp,
+            data=buffer.tobytes(),
+            encode_time=end - start,
+            latency=end - submitted,
+        )
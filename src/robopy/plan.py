@@ -0,0 +1,344 @@
+"""
+読み書きの内容を事前に決めておき, 制御ループでは送受信だけを行う.
+
+`DynamixelDriver.read`・`write` は呼び出しごとに関数の辞書を作り,
+命令パケットをリストで組み立てて CRC を計算する.
+`ReadPlan`・`WritePlan` は対象の項目とサーボを最初に1度だけ受け取り,
+命令パケット・アドレス・バイト数・デコード方法と結果の配列を前もって用意する.
+`execute` は用意したバッファを使い回すだけで, 新しい配列を確保しない.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence, Union
+
+import dynamixel_sdk
+import numpy as np
+from dynamixel_sdk import INST_READ, INST_WRITE
+from dynamixel_sdk.protocol2_packet_handler import PKT_ID
+
+from robopy.control_table import ControlTable, Dtype
+from robopy.dynamixel import DynamixelCommError
+from robopy.protocol import FastPacketHandler
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from robopy.robot import RobotDriver
+
+__all__ = ["ReadPlan", "WritePlan"]
+
+Items = Union[ControlTable, Sequence[ControlTable]]
+
+NUMPY_DTYPES = {
+    Dtype.UINT8: "u1",
+    Dtype.UINT16: "<u2",
+    Dtype.UINT32: "<u4",
+    Dtype.INT16: "<i2",
+    Dtype.INT32: "<i4",
+}
+"""`Dtype` に対応する NumPy のデータ型(リトルエンディアン)."""
+
+STATUS_NBYTES = 11
+"""パラメータを除いたステータスパケットのバイト数."""
+
+PARAM_START = 9
+"""ステータスパケットの先頭からパラメータまでのバイト数."""
+
+
+class _Plan:
+    """`ReadPlan`・`WritePlan` に共通する, 対象の項目とサーボの情報."""
+
+    def __init__(
+        self,
+        robot: RobotDriver,
+        items: Items,
+        servo_ids: Sequence[int] | None,
+    ) -> None:
+        self.port_handler = robot.port_handler
+        self.packet_handler = robot.packet_handler
+        if servo_ids is None:
+            servo_ids = [servo.servo_id for servo in robot.servos]
+        self.servo_ids = list(servo_ids)
+
+        self.single = isinstance(items, ControlTable)
+        self.items = [items] if isinstance(items, ControlTable) else list(items)
+        self.address = min(item.address for item in self.items)
+        end = max(item.address + item.num_bytes for item in self.items)
+        self.length = end - self.address
+
+        # 連続したアドレスのバイト列を, 項目ごとのフィールドとして読み書きする
+        record = np.dtype({
+            "names": [item.name for item in self.items],
+            "formats": [NUMPY_DTYPES[item.dtype] for item in self.items],
+            "offsets": [item.address - self.address for item in self.items],
+            "itemsize": self.length,
+        })
+        self.raw = np.zeros((len(self.servo_ids), self.length), dtype=np.uint8)
+        self.records = self.raw.view(record).reshape(len(self.servo_ids))
+        shape: tuple[int, ...] = (len(self.servo_ids),)
+        if not self.single:
+            shape = (len(self.items), len(self.servo_ids))
+        self.values = np.zeros(shape, dtype=np.int64)
+
+    def _finish(self, packet: bytearray) -> bytes | bytearray:
+        """
+        命令パケットに CRC を付ける.
+
+        パラメータに `FF FF FD` が現れる場合のみバイトスタッフィングを行う.
+
+        Parameters
+        ----------
+        packet : bytearray
+            CRC の領域を含む命令パケット.
+
+        Returns
+        -------
+        bytes | bytearray
+            送信する命令パケット.
+
+        """
+        if b"\xff\xff\xfd" in packet[4:-2]:
+            stuffed = self.packet_handler.addStuffing(list(packet))
+            packet = bytearray(stuffed)
+            packet[:4] = b"\xff\xff\xfd\x00"
+        crc = self.packet_handler.updateCRC(0, packet, len(packet) - 2)
+        packet[-2:] = crc.to_bytes(2, "little")
+        return packet
+
+    def _transfer(
+        self,
+        index: int,
+        packet: bytes | bytearray,
+        rx_length: int,
+    ) -> list[int]:
+        """
+        命令パケットを送信し, 送信先のサーボのステータスパケットを受信する.
+
+        Parameters
+        ----------
+        index : int
+            `servo_ids` での送信先の番号.
+        packet : bytes | bytearray
+            命令パケット.
+        rx_length : int
+            ステータスパケットのバイト数.
+
+        Returns
+        -------
+        list[int]
+            ステータスパケット.
+
+        Raises
+        ------
+        DynamixelCommError
+            通信に失敗した場合.
+
+        """
+        port = self.port_handler
+        servo_id = self.servo_ids[index]
+        port.is_using = True
+        if isinstance(self.packet_handler, FastPacketHandler):
+            self.packet_handler.clear(port)
+        else:
+            port.clearPort()
+        port.writePort(packet)
+        port.setPacketTimeout(rx_length)
+        while True:
+            rx_packet, result = self.packet_handler.rxPacket(
+                port,
+                fast_option=False,
+            )
+            if result != dynamixel_sdk.COMM_SUCCESS:
+                names = ", ".join(item.name for item in self.items)
+                msg = f"{servo_id=}の{names}の通信に失敗しました."
+                raise DynamixelCommError(msg, result, 0)
+            if rx_packet[PKT_ID] == servo_id:
+                return rx_packet  # type: ignore[no-any-return]
+
+
+class ReadPlan(_Plan):
+    """
+    決まった項目を決まったサーボから読み取る.
+
+    複数の項目を指定した場合は, 先頭から末尾のアドレスまでを
+    サーボごとに1回の READ 命令で読み取る.
+    命令パケットは CRC まで含めて作成時に組み立てておく.
+
+    Note
+    ----
+    `execute` の返り値は `values` そのもので, 次の `execute` で上書きされる.
+
+    Example
+    -------
+    ```python
+    from robopy import ControlTable, RobotDriver
+    from robopy.plan import ReadPlan
+
+    robot = RobotDriver(...)
+    plan = ReadPlan(
+        robot,
+        [ControlTable.PRESENT_VELOCITY, ControlTable.PRESENT_POSITION],
+    )
+    while True:
+        velocity, position = plan.execute()
+    ```
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        読み取るロボット.
+    items : ControlTable | Sequence[ControlTable]
+        読み取る項目.
+    servo_ids : Sequence[int] | None
+        読み取るサーボのID. `None` の場合は `robot` の全サーボ.
+
+    """
+
+    def __init__(
+        self,
+        robot: RobotDriver,
+        items: Items,
+        servo_ids: Sequence[int] | None = None,
+    ) -> None:
+        super().__init__(robot, items, servo_ids)
+        self.rx_length = self.length + STATUS_NBYTES
+        # READ 命令のパラメータはアドレスと読み取るバイト数
+        params = self.address.to_bytes(2, "little")
+        params += self.length.to_bytes(2, "little")
+        self.packets = [
+            bytes(self._finish(_instruction(i, INST_READ, params)))
+            for i in self.servo_ids
+        ]
+
+    def execute(self) -> npt.NDArray[np.int64]:
+        """
+        各サーボから読み取る.
+
+        Returns
+        -------
+        npt.NDArray[np.int64]
+            1つの項目の場合は `(サーボ数,)`,
+            複数の項目の場合は `(項目数, サーボ数)` の値.
+
+        """
+        end = PARAM_START + self.length
+        for i, packet in enumerate(self.packets):
+            rx_packet = self._transfer(i, packet, self.rx_length)
+            self.raw[i] = rx_packet[PARAM_START:end]
+        if self.single:
+            self.values[:] = self.records[self.items[0].name]
+        else:
+            for values, item in zip(self.values, self.items):
+                values[:] = self.records[item.name]
+        return self.values
+
+
+class WritePlan(_Plan):
+    """
+    決まった項目を決まったサーボに書き込む.
+
+    複数の項目を指定した場合は, アドレスが隙間無く連続している必要があり,
+    サーボごとに1回の WRITE 命令でまとめて書き込む.
+    `execute` は用意した命令パケットに値と CRC を書き込んで送信する.
+
+    Example
+    -------
+    ```python
+    from robopy import ControlTable, RobotDriver
+    from robopy.plan import WritePlan
+
+    robot = RobotDriver(...)
+    plan = WritePlan(robot, ControlTable.GOAL_POSITION)
+    while True:
+        plan.execute([2048] * len(robot.servos))
+    ```
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        書き込むロボット.
+    items : ControlTable | Sequence[ControlTable]
+        書き込む項目.
+    servo_ids : Sequence[int] | None
+        書き込むサーボのID. `None` の場合は `robot` の全サーボ.
+
+    Raises
+    ------
+    ValueError
+        項目の間にアドレスの隙間や重なりがある場合.
+        隙間の項目まで意図せず上書きしないように, 書き込みは連続した項目に限る.
+
+    """
+
+    def __init__(
+        self,
+        robot: RobotDriver,
+        items: Items,
+        servo_ids: Sequence[int] | None = None,
+    ) -> None:
+        super().__init__(robot, items, servo_ids)
+        ordered = sorted(self.items, key=lambda item: item.address)
+        gaps = [
+            f"{a.name}と{b.name}"
+            for a, b in zip(ordered, ordered[1:])
+            if a.address + a.num_bytes != b.address
+        ]
+        if gaps:
+            msg = f"{', '.join(gaps)}のアドレスが連続していません."
+            raise ValueError(msg)
+        # WRITE 命令のパラメータはアドレスと書き込むバイト列
+        params = self.address.to_bytes(2, "little") + bytes(self.length)
+        self.packets = [
+            _instruction(i, INST_WRITE, params) for i in self.servo_ids
+        ]
+        self._data_views = [memoryview(p)[10:-2] for p in self.packets]
+
+    def execute(self, values: npt.ArrayLike) -> None:
+        """
+        各サーボに書き込む.
+
+        Parameters
+        ----------
+        values : npt.ArrayLike
+            1つの項目の場合は `(サーボ数,)`,
+            複数の項目の場合は `(項目数, サーボ数)` の値.
+
+        """
+        self.values[:] = values
+        if self.single:
+            self.records[self.items[0].name] = self.values
+        else:
+            for row, item in zip(self.values, self.items):
+                self.records[item.name] = row
+        for i, packet in enumerate(self.packets):
+            self._data_views[i][:] = self.raw[i]
+            self._transfer(i, self._finish(packet), STATUS_NBYTES)
+
+
+def _instruction(
+    servo_id: int,
+    instruction: int,
+    params: bytes,
+) -> bytearray:
+    """
+    CRC 以外を埋めた命令パケットを作る.
+
+    Parameters
+    ----------
+    servo_id : int
+        送信先のサーボのID.
+    instruction : int
+        命令.
+    params : bytes
+        パラメータ.
+
+    Returns
+    -------
+    bytearray
+        末尾に2バイトの CRC の領域を持つ命令パケット.
+
+    """
+    length = (len(params) + 3).to_bytes(2, "little")
+    header = bytes([0xFF, 0xFF, 0xFD, 0x00, servo_id])
+    return bytearray(header + length + bytes([instruction]) + params + b"\0\0")
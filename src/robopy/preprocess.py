@@ -0,0 +1,307 @@
+"""
+カメラ画像を方策の入力に変換する前処理.
+
+BGR→RGB・切り抜き・リサイズ・HWC→CHW・uint8→float32 の正規化を,
+あらかじめ確保したバッファへの書き込みだけで行う.
+初回(または入力の形状が変わった時)以外は画像ごとのメモリ確保が起きない.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from robopy.camera import FrameSource
+
+__all__ = ["BatchPreprocessor", "FramePreprocessor"]
+
+
+class FramePreprocessor:
+    """
+    1枚の画像を `(C, H, W)` の float32 配列に変換する.
+
+    処理の順番は次の通り. 指定しなかった処理は行わない.
+
+    1. `crop` で切り抜く(ビューを取るだけ).
+    2. `size` にリサイズする(`cv2.resize` の `dst` に書き込む).
+    3. HWC→CHW・BGR→RGB(ビューを取るだけ).
+    4. `scale` を掛けて float32 にする(`out` に書き込む).
+    5. `mean` を引き `std` で割る(`out` 上でインプレース).
+
+    Note
+    ----
+    `out` を指定しない場合は内部のバッファを返すので,
+    次の呼び出しで上書きされる. 保持する場合はコピーすること.
+
+    Example
+    -------
+    ```python
+    from robopy import CameraDriver
+    from robopy.preprocess import FramePreprocessor
+
+    camera = CameraDriver(camera_id=0, width=640, height=480)
+    preprocess = FramePreprocessor(size=(224, 224), crop=(80, 0, 480, 480))
+    while True:
+        observation = preprocess(camera.get_frame())  # (3, 224, 224)
+    ```
+
+    Parameters
+    ----------
+    size : tuple[int, int] | None
+        リサイズ後の `(width, height)`.
+    crop : tuple[int, int, int, int] | None
+        切り抜く領域 `(x, y, width, height)`. リサイズの前に行う.
+    to_rgb : bool
+        BGR を RGB に並べ替えるかどうか. 3チャネルの場合のみ有効.
+    scale : float
+        uint8 の値に掛ける係数.
+    mean : Sequence[float] | None
+        `scale` を掛けた後にチャネルごとに引く値. RGB の順.
+    std : Sequence[float] | None
+        `mean` を引いた後にチャネルごとに割る値. RGB の順.
+    interpolation : int
+        `cv2.resize` の補間方法. 縮小時の画質を優先して `cv2.INTER_AREA`.
+        速度を優先する場合は `cv2.INTER_LINEAR`.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        size: tuple[int, int] | None = None,
+        crop: tuple[int, int, int, int] | None = None,
+        *,
+        to_rgb: bool = True,
+        scale: float = 1 / 255,
+        mean: Sequence[float] | None = None,
+        std: Sequence[float] | None = None,
+        interpolation: int = cv2.INTER_AREA,
+    ) -> None:
+        self.size = size
+        self.crop = crop
+        self.to_rgb = to_rgb
+        self.scale = np.float32(scale)
+        self.interpolation = interpolation
+        self._mean = None if mean is None else _per_channel(mean)
+        self._inv_std = None if std is None else 1 / _per_channel(std)
+        self._resized: npt.NDArray[np.uint8] | None = None
+        self._out: npt.NDArray[np.float32] | None = None
+
+    def output_shape(self, frame_shape: Sequence[int]) -> tuple[int, int, int]:
+        """
+        入力画像の形状から出力の形状を計算する.
+
+        Parameters
+        ----------
+        frame_shape : Sequence[int]
+            入力画像の形状 `(H, W)` もしくは `(H, W, C)`.
+
+        Returns
+        -------
+        tuple[int, int, int]
+            出力の形状 `(C, H, W)`.
+
+        """
+        height, width = frame_shape[:2]
+        channels = frame_shape[2] if len(frame_shape) > 2 else 1  # noqa: PLR2004
+        if self.crop is not None:
+            _, _, width, height = self.crop
+        if self.size is not None:
+            width, height = self.size
+        return channels, height, width
+
+    def __call__(
+        self,
+        frame: npt.ArrayLike,
+        out: npt.NDArray[np.float32] | None = None,
+    ) -> npt.NDArray[np.float32]:
+        """
+        画像を前処理する.
+
+        Parameters
+        ----------
+        frame : npt.ArrayLike
+            uint8 の画像 `(H, W)` もしくは `(H, W, C)`.
+        out : npt.NDArray[np.float32] | None
+            書き込み先 `(C, H, W)`. `None` の場合は内部のバッファ.
+
+        Returns
+        -------
+        npt.NDArray[np.float32]
+            前処理後の画像 `(C, H, W)`.
+
+        """
+        image: npt.NDArray[np.uint8] = np.asarray(frame)
+        if image.ndim == 2:  # noqa: PLR2004
+            image = image[:, :, np.newaxis]
+        if self.crop is not None:
+            x, y, width, height = self.crop
+            image = image[y : y + height, x : x + width]
+        if self.size is not None and image.shape[1::-1] != self.size:
+            image = self._resize(image)
+
+        if out is None:
+            out = self._buffer(self.output_shape(image.shape))
+        chw = image.transpose(2, 0, 1)
+        if self.to_rgb and chw.shape[0] == 3:  # noqa: PLR2004
+            chw = chw[::-1]
+
+        np.multiply(chw, self.scale, out=out)
+        if self._mean is not None:
+            np.subtract(out, self._mean, out=out)
+        if self._inv_std is not None:
+            np.multiply(out, self._inv_std, out=out)
+        return out
+
+    def _resize(self, image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        `size` にリサイズした画像を内部のバッファに書き込む.
+
+        Parameters
+        ----------
+        image : npt.NDArray[np.uint8]
+            `(H, W, C)` の画像.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8]
+            リサイズ後の `(H, W, C)` の画像. 内部のバッファのビュー.
+
+        """
+        width, height = self.size or image.shape[1::-1]
+        channels = image.shape[2]
+        # 1チャネルの場合は cv2.resize が2次元の配列を返すので, 2次元で確保する
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        if self._resized is None or self._resized.shape != shape:
+            self._resized = np.empty(shape, dtype=np.uint8)
+        cv2.resize(
+            image,
+            (width, height),
+            dst=self._resized,
+            interpolation=self.interpolation,
+        )
+        return self._resized.reshape(height, width, channels)
+
+    def _buffer(self, shape: tuple[int, int, int]) -> npt.NDArray[np.float32]:
+        if self._out is None or self._out.shape != shape:
+            self._out = np.empty(shape, dtype=np.float32)
+        return self._out
+
+
+class BatchPreprocessor:
+    """
+    複数のカメラの画像を前処理し, 1つの `(N, C, H, W)` 配列にまとめる.
+
+    各カメラの `get_frame` の結果を `FramePreprocessor` で
+    バッチの各要素に直接書き込むので, 結合のためのコピーも起きない.
+
+    Note
+    ----
+    返り値は内部のバッファなので, 次の呼び出しで上書きされる.
+
+    Example
+    -------
+    ```python
+    from robopy import CameraDriver
+    from robopy.preprocess import BatchPreprocessor, FramePreprocessor
+
+    cameras = [CameraDriver(camera_id=0), CameraDriver(camera_id=2)]
+    batch = BatchPreprocessor(cameras, FramePreprocessor(size=(224, 224)))
+    while True:
+        observation = batch.get_batch()  # (2, 3, 224, 224)
+    ```
+
+    Parameters
+    ----------
+    sources : Sequence[FrameSource]
+        画像の取得元. `CameraDriver` など.
+    preprocessors : FramePreprocessor | Sequence[FramePreprocessor]
+        前処理. 1つの場合は全てのカメラに同じ処理を行う.
+        出力の形状は全てのカメラで揃っている必要がある.
+
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[FrameSource],
+        preprocessors: FramePreprocessor | Sequence[FramePreprocessor],
+    ) -> None:
+        if isinstance(preprocessors, FramePreprocessor):
+            preprocessors = [preprocessors] * len(sources)
+        self.sources = sources
+        self.preprocessors = preprocessors
+        self._batch: npt.NDArray[np.float32] | None = None
+
+    def get_batch(self) -> npt.NDArray[np.float32]:
+        """
+        全てのカメラから画像を取得して前処理する.
+
+        Returns
+        -------
+        npt.NDArray[np.float32]
+            `(N, C, H, W)` の画像.
+
+        """
+        return self.process([source.get_frame() for source in self.sources])
+
+    def process(
+        self,
+        frames: Sequence[npt.ArrayLike],
+    ) -> npt.NDArray[np.float32]:
+        """
+        取得済みの画像を前処理してまとめる.
+
+        Parameters
+        ----------
+        frames : Sequence[npt.ArrayLike]
+            各カメラの画像. `sources` と同じ順番.
+
+        Returns
+        -------
+        npt.NDArray[np.float32]
+            `(N, C, H, W)` の画像.
+
+        Raises
+        ------
+        ValueError
+            前処理後の形状がカメラ間で揃っていない場合.
+
+        """
+        shapes = {
+            preprocessor.output_shape(np.shape(frame))
+            for preprocessor, frame in zip(self.preprocessors, frames)
+        }
+        if len(shapes) != 1:
+            msg = f"前処理後の形状が揃っていません: {sorted(shapes)}"
+            raise ValueError(msg)
+        shape = (len(frames), *shapes.pop())
+        if self._batch is None or self._batch.shape != shape:
+            self._batch = np.empty(shape, dtype=np.float32)
+
+        for i, (preprocessor, frame) in enumerate(
+            zip(self.preprocessors, frames),
+        ):
+            preprocessor(frame, out=self._batch[i])
+        return self._batch
+
+
+def _per_channel(values: Sequence[float]) -> npt.NDArray[np.float32]:
+    """
+    チャネルごとの値を `(C, 1, 1)` にして `(C, H, W)` にブロードキャストする.
+
+    Parameters
+    ----------
+    values : Sequence[float]
+        チャネルごとの値.
+
+    Returns
+    -------
+    npt.NDArray[np.float32]
+        `(C, 1, 1)` の配列.
+
+    """
+    return np.asarray(values, dtype=np.float32).reshape(-1, 1, 1)
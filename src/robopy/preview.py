@@ -0,0 +1,364 @@
+"""
+ブラウザでカメラの映像を確認するための MJPEG サーバ.
+
+標準ライブラリの `asyncio` のみで動く.
+新しい画像は1回だけ JPEG にエンコードし, 同じバイト列を全てのクライアントへ送る.
+送信が追いつかないクライアントには古い画像を溜めずに最新の画像だけを送る.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from robopy.camera import FrameSource
+
+__all__ = ["PreviewServer"]
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = b"frame"
+RESPONSE_HEADER = (
+    b"HTTP/1.0 200 OK\r\n"
+    b"Content-Type: multipart/x-mixed-replace; boundary=" + BOUNDARY + b"\r\n"
+    b"Cache-Control: no-cache, private\r\n"
+    b"Pragma: no-cache\r\n"
+    b"\r\n"
+)
+NOT_FOUND = b"HTTP/1.0 404 Not Found\r\nContent-Length: 0\r\n\r\n"
+
+
+class PreviewServer:
+    """
+    カメラの映像を MJPEG で配信するサーバ.
+
+    バックグラウンドのスレッドでイベントループを動かし,
+    `fps` の周期で画像を取得・縮小・エンコードする.
+    クライアントが1つも接続していない間はエンコードしない.
+
+    画像の取得やエンコードに失敗した周期は `failed_frames` に数えてログに残し,
+    配信は続ける.
+
+    画像は `source.get_frame()` から取得するか, `publish` で渡す.
+    制御ループと同じ `CameraDriver` を使う場合は, 同じカメラを
+    2つのスレッドから読まないように `source` を指定せず `publish` を使う.
+
+    Example
+    -------
+    ```python
+    from robopy import CameraDriver
+    from robopy.preview import PreviewServer
+
+    camera = CameraDriver(camera_id=0)
+    server = PreviewServer(port=8000, fps=10, width=320)
+    server.start()
+    while True:
+        frame = camera.get_frame()
+        server.publish(frame)  # 参照を渡すだけ
+    ```
+
+    Parameters
+    ----------
+    source : FrameSource | None
+        画像の取得元. `None` の場合は `publish` された画像を配信する.
+    host : str
+        待ち受けるホスト名.
+    port : int
+        待ち受けるポート番号. 0 の場合は空いているポートを使う.
+    fps : float
+        配信の最大FPS. カメラのFPSとは独立.
+    width : int | None
+        配信する画像の幅. `None` の場合は元の大きさ.
+    height : int | None
+        配信する画像の高さ. `None` の場合は幅に合わせて縦横比を保つ.
+    quality : int
+        JPEG の品質(0~100).
+
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        source: FrameSource | None = None,
+        host: str = "localhost",
+        port: int = 8000,
+        fps: float = 10.0,
+        width: int | None = None,
+        height: int | None = None,
+        quality: int = 80,
+    ) -> None:
+        self.source = source
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.quality = quality
+
+        self.encoded_frames = 0
+        self.failed_frames = 0
+        self.num_clients = 0
+        self._frame: npt.ArrayLike | None = None
+        self._frame_version = 0
+        self._jpeg = b""
+        self._jpeg_version = 0
+
+        self._thread: threading.Thread | None = None
+        self._started = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+        self._condition: asyncio.Condition | None = None
+        self._client_tasks: set[asyncio.Task[None]] = set()
+
+    def publish(self, frame: npt.ArrayLike) -> None:
+        """
+        配信する画像を更新する.
+
+        参照を保持するだけなので, 制御ループから毎回呼んでも軽い.
+        実際のコピー・エンコードは配信の周期でサーバのスレッドが行う.
+
+        Parameters
+        ----------
+        frame : npt.ArrayLike
+            BGR の画像.
+
+        """
+        self._frame = frame
+        self._frame_version += 1
+
+    def start(self) -> None:
+        """
+        バックグラウンドのスレッドでサーバを起動する.
+
+        起動して `port` が確定するまで待つ.
+
+        Raises
+        ------
+        RuntimeError
+            起動に失敗した場合.
+
+        """
+        self._started.clear()
+        self._thread = threading.Thread(
+            target=asyncio.run,
+            args=(self._main(),),
+            daemon=True,
+        )
+        self._thread.start()
+        self._started.wait()
+        if self._loop is None:
+            msg = f"Failed to start preview server on {self.host}:{self.port}"
+            raise RuntimeError(msg)
+
+    def stop(self) -> None:
+        """サーバを停止し, 全てのクライアントを切断する."""
+        if self._loop is None or self._stopping is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join()
+        self._loop = None
+
+    async def _main(self) -> None:
+        try:
+            server = await asyncio.start_server(
+                self._handle,
+                self.host,
+                self.port,
+            )
+        except OSError:
+            self._started.set()
+            return
+
+        self.port = server.sockets[0].getsockname()[1]
+        self._stopping = asyncio.Event()
+        self._condition = asyncio.Condition()
+        self._loop = asyncio.get_running_loop()
+        self._started.set()
+
+        producer = asyncio.create_task(self._produce())
+        await self._stopping.wait()
+        server.close()
+        await server.wait_closed()
+        tasks = [producer, *self._client_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _produce(self) -> None:
+        """`fps` の周期で画像を1回だけエンコードし, クライアントに通知する."""
+        loop = asyncio.get_running_loop()
+        period = 1 / self.fps
+        deadline = loop.time()
+        version = 0
+        while True:
+            deadline += period
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            if self.num_clients == 0:
+                continue
+            try:
+                if self.source is not None:
+                    frame = await loop.run_in_executor(
+                        None,
+                        self.source.get_frame,
+                    )
+                elif self._frame is not None and self._frame_version != version:
+                    # `publish` された配列が書き換えられても良いようにコピーする
+                    version = self._frame_version
+                    frame = np.array(self._frame)
+                else:
+                    continue
+                jpeg = await loop.run_in_executor(None, self._encode, frame)
+            except Exception:
+                # 1枚の失敗で配信を止めないように, 記録して次の周期に進む
+                self.failed_frames += 1
+                logger.exception("Failed to produce a preview frame.")
+                continue
+            await self._broadcast(jpeg)
+
+    def _encode(self, frame: npt.ArrayLike) -> bytes:
+        """
+        画像を配信用の大きさに縮小し, JPEG にエンコードする.
+
+        Parameters
+        ----------
+        frame : npt.ArrayLike
+            BGR の画像.
+
+        Returns
+        -------
+        bytes
+            multipart の1パート(ヘッダ付きの JPEG).
+
+        Raises
+        ------
+        RuntimeError
+            エンコードに失敗した場合.
+
+        """
+        image = np.asarray(frame)
+        size = self._preview_size(*image.shape[:2])
+        if size is not None:
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        ret, buffer = cv2.imencode(".jpg", image, params)
+        if not ret:
+            msg = "Failed to encode preview frame."
+            raise RuntimeError(msg)
+        jpeg = buffer.tobytes()
+        self.encoded_frames += 1
+        return b"".join([
+            b"--" + BOUNDARY + b"\r\n",
+            b"Content-Type: image/jpeg\r\n",
+            b"Content-Length: %d\r\n\r\n" % len(jpeg),
+            jpeg,
+            b"\r\n",
+        ])
+
+    def _preview_size(self, height: int, width: int) -> tuple[int, int] | None:
+        """
+        配信する画像の `(width, height)` を返す.
+
+        Parameters
+        ----------
+        height : int
+            元の画像の高さ.
+        width : int
+            元の画像の幅.
+
+        Returns
+        -------
+        tuple[int, int] | None
+            縮小後の大きさ. 縮小しない場合は `None`.
+
+        """
+        if self.width is not None:
+            return self.width, self.height or round(height * self.width / width)
+        if self.height is not None:
+            return round(width * self.height / height), self.height
+        return None
+
+    async def _broadcast(self, jpeg: bytes) -> None:
+        if self._condition is None:
+            return
+        async with self._condition:
+            self._jpeg = jpeg
+            self._jpeg_version += 1
+            self._condition.notify_all()
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """1つのクライアントに最新の画像を送り続ける."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._client_tasks.add(task)
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            if request.split(b" ", 2)[1:2] != [b"/"]:
+                writer.write(NOT_FOUND)
+                await writer.drain()
+                return
+            # 送信バッファに古い画像を溜めないように, 空になるまで drain で待つ
+            writer.transport.set_write_buffer_limits(high=0)
+            writer.write(RESPONSE_HEADER)
+            self.num_clients += 1
+            try:
+                await self._stream(writer)
+            finally:
+                self.num_clients -= 1
+        except (
+            ConnectionError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+        ):
+            pass
+        finally:
+            if task is not None:
+                self._client_tasks.discard(task)
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        version = 0
+        while True:
+            jpeg, version = await self._next_jpeg(version)
+            writer.write(jpeg)
+            await writer.drain()
+
+    async def _next_jpeg(self, version: int) -> tuple[bytes, int]:
+        """
+        `version` より新しい画像がエンコードされるまで待つ.
+
+        Parameters
+        ----------
+        version : int
+            前回送った画像の番号.
+
+        Returns
+        -------
+        tuple[bytes, int]
+            最新の画像と, その番号.
+
+        Raises
+        ------
+        RuntimeError
+            サーバが起動していない場合.
+
+        """
+        if self._condition is None:
+            msg = "Preview server is not running."
+            raise RuntimeError(msg)
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._jpeg_version != version,
+            )
+            return self._jpeg, self._jpeg_version
@@ -0,0 +1,428 @@
+"""
+Protocol 2.0 のパケットをバイト列のまま組み立て・解析するパケットハンドラ.
+
+`dynamixel_sdk.Protocol2PacketHandler` は CRC の計算のたびに256要素のテーブルを
+作り直し, パケットを `int` のリストとして1バイトずつ処理し,
+ステータスパケットを数バイトずつ読み取る.
+`FastPacketHandler` は次の部分だけを置き換え, その他の命令(`ping`・`readTxRx`・
+`GroupSyncRead` など)は SDK の実装をそのまま使う.
+
+- CRC は1度だけ作ったテーブルで `bytes` を2バイトずつ計算する.
+- バイトスタッフィングとヘッダの探索は `bytes.replace`・`bytes.find` で
+  バッファ全体に対して行う.
+- 受信は足りないバイト数と受信済みのバイト数の大きい方を1回で読み取り,
+  次のパケットの分まで読んだ場合は次の `rxPacket` で使う.
+
+References
+----------
+- [DYNAMIXEL Protocol 2.0](https://emanual.robotis.com/docs/en/dxl/protocol2/)
+"""
+
+from __future__ import annotations
+
+import array
+import functools
+import sys
+from typing import Sequence
+
+import dynamixel_sdk
+from dynamixel_sdk import robotis_def
+from dynamixel_sdk.protocol2_packet_handler import (
+    PKT_ID,
+    PKT_INSTRUCTION,
+    PKT_LENGTH_H,
+    PKT_LENGTH_L,
+    RXPACKET_MAX_LEN,
+    TXPACKET_MAX_LEN,
+)
+
+__all__ = [
+    "CRC_TABLE",
+    "HEADER",
+    "FastPacketHandler",
+    "add_stuffing",
+    "crc16",
+    "remove_stuffing",
+]
+
+HEADER = b"\xff\xff\xfd\x00"
+"""パケットの先頭の4バイト."""
+
+STUFFING = b"\xff\xff\xfd"
+"""パケットの途中に現れた場合にバイトスタッフィングが必要なバイト列."""
+
+MIN_STATUS_LENGTH = 11
+"""パラメータの無いステータスパケットのバイト数."""
+
+
+def _crc_table() -> tuple[int, ...]:
+    """
+    CRC-16(多項式 0x8005)のテーブルを作る.
+
+    Returns
+    -------
+    tuple[int, ...]
+        上位バイトごとの256個の値.
+
+    """
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x8005 if crc & 0x8000 else crc << 1
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+CRC_TABLE = _crc_table()
+"""CRC-16 のテーブル. `Protocol2PacketHandler.updateCRC` 内の表と同じ値."""
+
+
+@functools.lru_cache(maxsize=None)
+def _word_table() -> list[int]:
+    """
+    2バイトずつ CRC を計算するためのテーブルを作る.
+
+    65536要素あるので, 最初に使う時に1度だけ作る.
+
+    Returns
+    -------
+    list[int]
+        ビッグエンディアンの2バイトの値ごとの CRC.
+
+    """
+    table = CRC_TABLE
+    words = [0] * 0x10000
+    for high in range(256):
+        crc = table[high]
+        shifted = (crc << 8) & 0xFFFF
+        for low in range(256):
+            words[high << 8 | low] = shifted ^ table[(crc >> 8) ^ low]
+    return words
+
+
+def crc16(data: bytes | bytearray | memoryview, crc: int = 0) -> int:
+    """
+    Protocol 2.0 の CRC-16 を計算する.
+
+    16ビットの CRC は2バイト分で全ビットが入れ替わるため,
+    2バイトずつ `CRC_TABLE` を2回引いた結果をまとめたテーブルで計算する.
+
+    Parameters
+    ----------
+    data : bytes | bytearray | memoryview
+        CRC を計算するバイト列.
+    crc : int
+        途中までの CRC. 先頭から計算する場合は0.
+
+    Returns
+    -------
+    int
+        CRC.
+
+    """
+    size = len(data) & ~1
+    words = array.array("H")
+    words.frombytes(data[:size])
+    if sys.byteorder == "little":
+        words.byteswap()
+    table = _word_table()
+    for word in words:
+        crc = table[crc ^ word]
+    if size < len(data):
+        crc = ((crc << 8) & 0xFFFF) ^ CRC_TABLE[(crc >> 8) ^ data[size]]
+    return crc
+
+
+def add_stuffing(packet: bytes) -> bytes:
+    """
+    命令パケットにバイトスタッフィングを行う.
+
+    命令とパラメータの中の `FF FF FD` の後に `FD` を挿入し, 長さを更新する.
+
+    Parameters
+    ----------
+    packet : bytes
+        末尾に2バイトの CRC の領域を持つパケット.
+
+    Returns
+    -------
+    bytes
+        スタッフィング後のパケット. 必要が無い場合は `packet` そのもの.
+
+    """
+    body = packet[PKT_INSTRUCTION:-2]
+    if STUFFING not in body:
+        return packet
+    body = body.replace(STUFFING, STUFFING + b"\xfd")
+    length = (len(body) + 2).to_bytes(2, "little")
+    return packet[:PKT_LENGTH_L] + length + body + packet[-2:]
+
+
+def remove_stuffing(packet: bytes) -> bytes:
+    """
+    ステータスパケットのバイトスタッフィングを取り除く.
+
+    Parameters
+    ----------
+    packet : bytes
+        受信したパケット.
+
+    Returns
+    -------
+    bytes
+        スタッフィングを取り除いたパケット. 必要が無い場合は `packet` そのもの.
+
+    """
+    body = packet[PKT_INSTRUCTION:-2]
+    if STUFFING + b"\xfd" not in body:
+        return packet
+    body = body.replace(STUFFING + b"\xfd", STUFFING)
+    length = (len(body) + 2).to_bytes(2, "little")
+    return packet[:PKT_LENGTH_L] + length + body + packet[-2:]
+
+
+class FastPacketHandler(dynamixel_sdk.Protocol2PacketHandler):  # type: ignore[misc]
+    """
+    `Protocol2PacketHandler` の符号化・復号だけを置き換えたパケットハンドラ.
+
+    `RobotDriver` の `packet_handler` や `DynamixelDriver` に
+    `Protocol2PacketHandler` の代わりに渡して使う.
+    送受信されるバイト列は SDK と同じになる.
+    ただし, SDK の `txPacket` は `addStuffing` の結果を捨てているため,
+    パラメータに `FF FF FD` を含む命令パケットはスタッフィングされずに送られる.
+    このクラスは正しくスタッフィングしたパケットを送る.
+
+    Note
+    ----
+    1回の読み取りで次のパケットまで受信した場合, 残りは次の `rxPacket` で使う.
+    `txPacket` を介さずに送信する場合は, 送信前に `clear` を呼ぶこと.
+
+    Example
+    -------
+    ```python
+    from robopy import RobotDriver
+    from robopy.protocol import FastPacketHandler
+
+    robot = RobotDriver(
+        "/dev/ttyUSB0",
+        4_000_000,
+        [1, 2, 3],
+        packet_handler=FastPacketHandler(),
+    )
+    ```
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rx_buffer = bytearray()
+
+    def clear(self, port: dynamixel_sdk.PortHandler) -> None:
+        """
+        受信済みのバイト列を破棄する.
+
+        Parameters
+        ----------
+        port : dynamixel_sdk.PortHandler
+            受信バッファを空にするポート.
+
+        """
+        self.rx_buffer.clear()
+        port.clearPort()
+
+    def updateCRC(  # noqa: N802, PLR6301
+        self,
+        crc_accum: int,
+        data_blk_ptr: Sequence[int],
+        data_blk_size: int,
+    ) -> int:
+        """
+        `data_blk_ptr` の先頭 `data_blk_size` バイトの CRC を計算する.
+
+        Parameters
+        ----------
+        crc_accum : int
+            途中までの CRC.
+        data_blk_ptr : Sequence[int]
+            パケット.
+        data_blk_size : int
+            CRC を計算するバイト数.
+
+        Returns
+        -------
+        int
+            CRC.
+
+        """
+        data = data_blk_ptr[:data_blk_size]
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        return crc16(data, crc_accum)
+
+    def addStuffing(self, packet: list[int]) -> list[int]:  # noqa: N802, PLR6301
+        """
+        命令パケットにバイトスタッフィングを行う.
+
+        Parameters
+        ----------
+        packet : list[int]
+            末尾に2バイトの CRC の領域を持つパケット.
+
+        Returns
+        -------
+        list[int]
+            スタッフィング後のパケット. 必要が無い場合は `packet` そのもの.
+
+        """
+        length = packet[PKT_LENGTH_L] | packet[PKT_LENGTH_H] << 8
+        data = bytes(packet[: length + PKT_INSTRUCTION])
+        stuffed = add_stuffing(data)
+        return packet if stuffed is data else list(stuffed)
+
+    def removeStuffing(self, packet: list[int]) -> list[int]:  # noqa: N802, PLR6301
+        """
+        ステータスパケットのバイトスタッフィングを取り除く.
+
+        Parameters
+        ----------
+        packet : list[int]
+            受信したパケット.
+
+        Returns
+        -------
+        list[int]
+            スタッフィングを取り除いたパケット.
+
+        """
+        length = packet[PKT_LENGTH_L] | packet[PKT_LENGTH_H] << 8
+        data = bytes(packet[: length + PKT_INSTRUCTION])
+        unstuffed = remove_stuffing(data)
+        return packet if unstuffed is data else list(unstuffed)
+
+    def txPacket(  # noqa: N802
+        self,
+        port: dynamixel_sdk.PortHandler,
+        txpacket: Sequence[int],
+    ) -> int:
+        """
+        命令パケットにヘッダ・スタッフィング・CRC を付けて送信する.
+
+        Parameters
+        ----------
+        port : dynamixel_sdk.PortHandler
+            送信するポート.
+        txpacket : Sequence[int]
+            ID・長さ・命令・パラメータを埋めたパケット.
+
+        Returns
+        -------
+        int
+            通信結果.
+
+        """
+        if port.is_using:
+            return int(robotis_def.COMM_PORT_BUSY)
+        port.is_using = True
+
+        length = txpacket[PKT_LENGTH_L] | txpacket[PKT_LENGTH_H] << 8
+        packet = add_stuffing(bytes(txpacket[: length + PKT_INSTRUCTION]))
+        if len(packet) > TXPACKET_MAX_LEN:
+            port.is_using = False
+            return int(robotis_def.COMM_TX_ERROR)
+        packet = bytearray(packet)
+        packet[: len(HEADER)] = HEADER
+        packet[-2:] = crc16(memoryview(packet)[:-2]).to_bytes(2, "little")
+
+        self.clear(port)
+        if port.writePort(packet) != len(packet):
+            port.is_using = False
+            return int(robotis_def.COMM_TX_FAIL)
+        return int(robotis_def.COMM_SUCCESS)
+
+    def rxPacket(  # noqa: N802
+        self,
+        port: dynamixel_sdk.PortHandler,
+        fast_option: bool,  # noqa: FBT001
+    ) -> tuple[list[int], int]:
+        """
+        ステータスパケットを1つ受信する.
+
+        Parameters
+        ----------
+        port : dynamixel_sdk.PortHandler
+            受信するポート.
+        fast_option : bool
+            Fast Sync Read・Fast Bulk Read の応答の場合は `True`.
+            ID にブロードキャストを許し, スタッフィングを取り除かない.
+
+        Returns
+        -------
+        tuple[list[int], int]
+            rxpacket : list[int]
+                受信したパケット.
+            result : int
+                通信結果.
+
+        """
+        buffer = self.rx_buffer
+        max_id = robotis_def.MAX_ID
+        if fast_option:
+            max_id = robotis_def.BROADCAST_ID
+        wait_length = _align(buffer, max_id)
+        while len(buffer) < wait_length:
+            size = max(wait_length - len(buffer), port.getBytesAvailable())
+            buffer += port.readPort(size)
+            wait_length = _align(buffer, max_id)
+            if len(buffer) < wait_length and port.isPacketTimeout():
+                port.is_using = False
+                result = robotis_def.COMM_RX_CORRUPT
+                if not buffer:
+                    result = robotis_def.COMM_RX_TIMEOUT
+                return list(buffer), int(result)
+
+        port.is_using = False
+        packet = bytes(buffer[:wait_length])
+        del buffer[:wait_length]
+        if crc16(memoryview(packet)[:-2]) != packet[-2] | packet[-1] << 8:
+            return list(packet), int(robotis_def.COMM_RX_CORRUPT)
+        if not fast_option:
+            packet = remove_stuffing(packet)
+        return list(packet), int(robotis_def.COMM_SUCCESS)
+
+
+def _align(buffer: bytearray, max_id: int) -> int:
+    """
+    受信済みのバイト列の先頭を, ステータスパケットのヘッダに合わせる.
+
+    ヘッダより前のバイトと, ID・長さ・命令が不正なパケットの先頭を取り除く.
+
+    Parameters
+    ----------
+    buffer : bytearray
+        受信済みのバイト列. 先頭のバイトを削除する.
+    max_id : int
+        ID の最大値.
+
+    Returns
+    -------
+    int
+        先頭のパケットのバイト数. まだ分からない場合は最小のバイト数.
+
+    """
+    while len(buffer) >= MIN_STATUS_LENGTH:
+        start = buffer.find(HEADER)
+        if start != 0:
+            # ヘッダの途中かもしれない末尾の3バイトは残す
+            del buffer[: start if start > 0 else len(buffer) - 3]
+            continue
+        length = buffer[PKT_LENGTH_L] | buffer[PKT_LENGTH_H] << 8
+        if (
+            buffer[PKT_ID] > max_id
+            or length > RXPACKET_MAX_LEN
+            or buffer[PKT_INSTRUCTION] != robotis_def.INST_STATUS
+        ):
+            del buffer[0]
+            continue
+        return int(length + PKT_INSTRUCTION)
+    return MIN_STATUS_LENGTH
@@ -0,0 +1,256 @@
+"""
+直近の読み書きを常に記録しておき, 通信エラーの後から調べるためのリングバッファ.
+
+全ての読み書きをファイルに書き出すのは重いので,
+`FlightRecorder` は固定長の NumPy 配列を前もって確保し,
+読み書きごとに数個の要素を上書きするだけにする.
+`RobotDriver` は `DynamixelCommError` が発生した時に
+それまでの記録をファイルに保存する(`auto_dump=False` で無効にできる).
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from collections import deque
+from enum import IntEnum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import dynamixel_sdk
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+__all__ = ["FlightRecorder", "Transaction"]
+
+
+class Transaction(IntEnum):
+    """
+    `FlightRecorder` に記録する読み書きの種類.
+
+    Attributes
+    ----------
+    READ : int
+        `RobotDriver.read`.
+    WRITE : int
+        `RobotDriver.write`.
+    BULK_READ : int
+        `RobotDriver.bulk_read`.
+    BULK_WRITE : int
+        `RobotDriver.bulk_write`.
+
+    """
+
+    READ = 0
+    WRITE = 1
+    BULK_READ = 2
+    BULK_WRITE = 3
+
+
+class FlightRecorder:
+    """
+    直近 `capacity` 回の読み書きを保持するリングバッファ.
+
+    読み書きごとに, 時刻・種類・アドレス・各サーボの値・所要時間・通信結果を
+    記録する. 制御周期が 100Hz で1周期に読み書きを2回行う場合,
+    既定の `capacity=2048` で約10秒分になる.
+    値の無いサーボ(読み取りの失敗や, サーボ数より短い書き込み)は `nan` とする.
+
+    通信エラーの時には既定で保存する(`auto_dump=False` で無効にできる).
+    エラーが続いても制御ループを遅くしないように,
+    前回の保存から `min_dump_interval` 秒以内は保存せず `skipped_dumps` に数え,
+    自動で保存したファイルは新しい `max_files` 個だけを残す.
+
+    Example
+    -------
+    ```python
+    import numpy as np
+
+    from robopy import RobotDriver
+    from robopy.recorder import FlightRecorder
+
+    robot = RobotDriver(
+        ...,
+        flight_recorder=FlightRecorder(num_servos=5, directory="logs"),
+    )
+    ...  # DynamixelCommError の発生時には logs/ に保存される
+    path = robot.flight_recorder.dump()  # 任意の時点でも保存できる
+    record = np.load(path)
+    print(record["timestamps"], record["values"], record["results"])
+    ```
+
+    Parameters
+    ----------
+    num_servos : int
+        サーボの数.
+    capacity : int
+        保持する読み書きの回数.
+    directory : str | os.PathLike[str] | None
+        `dump` でファイル名を省略した場合の保存先.
+        `None` の場合は一時ディレクトリ.
+    auto_dump : bool
+        `DynamixelCommError` の発生時に `dump_on_error` で保存するかどうか.
+    min_dump_interval : float
+        `dump_on_error` で保存する最短の間隔 [s].
+    max_files : int
+        `dump_on_error` で保存したファイルを残す数. 古いものから削除する.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        num_servos: int,
+        capacity: int = 2048,
+        *,
+        directory: str | os.PathLike[str] | None = None,
+        auto_dump: bool = True,
+        min_dump_interval: float = 10.0,
+        max_files: int = 10,
+    ) -> None:
+        self.num_servos = num_servos
+        self.capacity = capacity
+        if directory is None:
+            directory = tempfile.gettempdir()
+        self.directory = Path(directory)
+        self.auto_dump = auto_dump
+        self.min_dump_interval = min_dump_interval
+        self.max_files = max_files
+
+        self.timestamps = np.full(capacity, np.nan)
+        self.transactions = np.zeros(capacity, dtype=np.int8)
+        self.addresses = np.zeros(capacity, dtype=np.int16)
+        self.values = np.full((capacity, num_servos), np.nan)
+        self.latencies = np.zeros(capacity)
+        self.results = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self.last_path: Path | None = None
+        self.last_dump_time = -np.inf
+        self.skipped_dumps = 0
+        self._auto_dumped: deque[Path] = deque()
+
+    def record(
+        self,
+        transaction: Transaction,
+        address: int,
+        values: npt.ArrayLike,
+        start: float,
+        result: int = dynamixel_sdk.COMM_SUCCESS,
+    ) -> None:
+        """
+        1回の読み書きを記録する. 最も古い記録を上書きする.
+
+        Parameters
+        ----------
+        transaction : Transaction
+            読み書きの種類.
+        address : int
+            読み書きした項目のアドレス. 複数の項目の場合は -1.
+        values : npt.ArrayLike
+            各サーボの値. サーボ数より短い場合, 残りのサーボは `nan` とする.
+        start : float
+            読み書きを開始した時刻(`time.monotonic`).
+        result : int
+            通信結果のコード.
+
+        """
+        end = time.monotonic()
+        index = self.count % self.capacity
+        self.timestamps[index] = start
+        self.transactions[index] = transaction
+        self.addresses[index] = address
+        data = np.asarray(values, dtype=np.float64).ravel()
+        size = min(len(data), self.num_servos)
+        self.values[index, :size] = data[:size]
+        self.values[index, size:] = np.nan
+        self.latencies[index] = end - start
+        self.results[index] = result
+        self.count += 1
+
+    def snapshot(self) -> dict[str, npt.NDArray[np.generic]]:
+        """
+        記録を古い順に並べ替えたコピーを返す.
+
+        Returns
+        -------
+        dict[str, npt.NDArray[np.generic]]
+            `timestamps`・`transactions`・`addresses`・`values`・
+            `latencies`・`results` の配列.
+
+        """
+        size = min(self.count, self.capacity)
+        order = np.arange(self.count - size, self.count) % self.capacity
+        return {
+            "timestamps": self.timestamps[order],
+            "transactions": self.transactions[order],
+            "addresses": self.addresses[order],
+            "values": self.values[order],
+            "latencies": self.latencies[order],
+            "results": self.results[order],
+        }
+
+    def dump(self, path: str | os.PathLike[str] | None = None) -> Path:
+        """
+        記録を `.npz` ファイルに保存する.
+
+        一時ファイルに書き出してから置き換えるので,
+        保存先には書き込み途中のファイルが現れない.
+
+        Parameters
+        ----------
+        path : str | os.PathLike[str] | None
+            保存先. `None` の場合は `directory` に時刻とプロセスIDから
+            名前を付けて保存する.
+
+        Returns
+        -------
+        Path
+            保存したファイル.
+
+        """
+        snapshot = self.snapshot()
+        if path is None:
+            name = time.strftime("flight-recorder-%Y%m%d-%H%M%S")
+            path = self.directory / f"{name}-{os.getpid()}-{self.count}.npz"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.tmp")
+        with temporary.open("wb") as file:
+            np.savez(file, **snapshot)
+        temporary.replace(path)
+        self.last_path = path
+        return path
+
+    def dump_on_error(self) -> Path | None:
+        """
+        通信エラーの発生時に, `auto_dump=True` であれば `dump` する.
+
+        前回の保存から `min_dump_interval` 秒以内の場合は保存せず,
+        `skipped_dumps` に数える.
+        保存したファイルが `max_files` 個を超えた場合は古いものから削除する.
+        保存に失敗しても, 元の通信エラーを隠さないように例外を送出しない.
+
+        Returns
+        -------
+        Path | None
+            保存したファイル. 保存しなかった場合は `None`.
+
+        """
+        if not self.auto_dump:
+            return None
+        now = time.monotonic()
+        if now - self.last_dump_time < self.min_dump_interval:
+            self.skipped_dumps += 1
+            return None
+        self.last_dump_time = now
+        try:
+            path = self.dump()
+            if path not in self._auto_dumped:
+                self._auto_dumped.append(path)
+            while len(self._auto_dumped) > self.max_files:
+                self._auto_dumped.popleft().unlink(missing_ok=True)
+        except OSError:
+            return None
+        return path
@@ -9,14 +9,26 @@ References
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import math
+import time
+from typing import TYPE_CHECKING, Mapping
 
 import dynamixel_sdk
 
-from robopy.dynamixel import DynamixelDriver
+from robopy.control_table import (
+    ControlTable,
+    cast_value,
+    supports_fast_sync_read,
+)
+from robopy.dynamixel import DynamixelCommError, DynamixelDriver
+from robopy.recorder import FlightRecorder, Transaction
+from robopy.units import to_physical, to_raw
 
 if TYPE_CHECKING:
-    from robopy.control_table import ControlTable
+    import numpy as np
+    import numpy.typing as npt
+
+    from robopy.config import ConfigProfile
 
 __all__ = ["RobotDriver"]
 
@@ -34,6 +46,16 @@ class RobotDriver:
         ボーレート. サーボに設定された値と揃える必要がある.
     servo_ids : list[int]
         サーボのID. packetHandlerの通信の確認に使用する.
+    port_handler : dynamixel_sdk.PortHandler | None
+        `port_name` の代わりに使うポートハンドラ.
+        `robopy.sim.SimulatedPort` でハードウェア無しに動かす場合など.
+    packet_handler : dynamixel_sdk.Protocol2PacketHandler | None
+        使用するパケットハンドラ. `None` の場合は SDK のもの.
+        `robopy.protocol.FastPacketHandler` で符号化・復号を高速化できる.
+    flight_recorder : FlightRecorder | None
+        読み書きを記録するリングバッファ. `None` の場合は既定の設定で作る.
+        `auto_dump=True` (既定)の場合, `DynamixelCommError` の発生時には
+        記録をファイルに保存する.
 
     Raises
     ------
@@ -46,14 +68,22 @@ class RobotDriver:
 
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         port_name: str,
         baudrate: int,
         servo_ids: list[int],
+        *,
+        port_handler: dynamixel_sdk.PortHandler | None = None,
+        packet_handler: dynamixel_sdk.Protocol2PacketHandler | None = None,
+        flight_recorder: FlightRecorder | None = None,
     ) -> None:
-        self.port_handler = dynamixel_sdk.PortHandler(port_name=port_name)
-        self.packet_handler = dynamixel_sdk.Protocol2PacketHandler()
+        if port_handler is None:
+            port_handler = dynamixel_sdk.PortHandler(port_name=port_name)
+        self.port_handler = port_handler
+        if packet_handler is None:
+            packet_handler = dynamixel_sdk.Protocol2PacketHandler()
+        self.packet_handler = packet_handler
 
         if not self.port_handler.openPort():
             msg = f"Failed to open port {port_name}"
@@ -63,14 +93,16 @@ class RobotDriver:
             msg = f"Failed to set baudrate to {baudrate}"
             raise RuntimeError(msg)
 
+        self.model_numbers: list[int] = []
         for servo_id in servo_ids:
-            _, comm_result, _ = self.packet_handler.ping(
+            model_number, comm_result, _ = self.packet_handler.ping(
                 port=self.port_handler,
                 dxl_id=servo_id,
             )
             if comm_result != dynamixel_sdk.COMM_SUCCESS:
                 msg = f"Failed to ping servo {servo_id}"
                 raise RuntimeError(msg)
+            self.model_numbers.append(model_number)
 
         self.servos = [
             DynamixelDriver(
@@ -80,6 +112,10 @@ class RobotDriver:
             )
             for servo_id in servo_ids
         ]
+        self.fast_sync_read_support: list[bool] | None = None
+        if flight_recorder is None:
+            flight_recorder = FlightRecorder(num_servos=len(servo_ids))
+        self.flight_recorder = flight_recorder
 
     def write(self, control_table: ControlTable, values: list[int]) -> None:
         """
@@ -105,14 +141,46 @@ class RobotDriver:
         values : list[int]
             書き込む値.
 
+        Raises
+        ------
+        DynamixelCommError
+            通信に失敗した場合. `flight_recorder.auto_dump` が有効であれば,
+            それまでの記録を保存する.
+
         """
-        for servo, value in zip(self.servos, values):
-            servo.write(control_table, value)
+        start = time.monotonic()
+        address = control_table.address
+        try:
+            for servo, value in zip(self.servos, values):
+                servo.write(control_table, value)
+        except DynamixelCommError as error:
+            result = error.dxl_comm_result_code
+            self._record_error(
+                Transaction.WRITE,
+                address,
+                values,
+                start,
+                result,
+            )
+            raise
+        self.flight_recorder.record(Transaction.WRITE, address, values, start)
 
-    def read(self, control_table: ControlTable) -> list[int]:
+    def read(
+        self,
+        control_table: ControlTable,
+        *,
+        fast_sync_read: bool = False,
+    ) -> list[int]:
         """
         各サーボから値を読み取る.
 
+        `fast_sync_read=True` の場合は, Fast Sync Read に対応するサーボを
+        1つにまとめたステータスパケットで読み取り,
+        対応していないサーボは通常の Sync Read で読み取る.
+        対応しているかどうかは最初の呼び出し時に各サーボの
+        `VERSION_OF_FIRMWARE` を読み取り, `MODEL_NUMBER` と合わせて判定する.
+        結果は `fast_sync_read_support` に保持する.
+
         Example
         -------
         ```python
@@ -120,7 +188,10 @@ class RobotDriver:
 
         robot = RobotDriver(...)
         while True:
-            position = robot.read(ControlTable.PRESENT_POSITION)
+            position = robot.read(
+                ControlTable.PRESENT_POSITION,
+                fast_sync_read=True,
+            )
             print(f"Current position: {position}")
         ```
 
@@ -128,11 +199,415 @@ class RobotDriver:
         ----------
         control_table : ControlTable
             読み取るデータの種類.
+        fast_sync_read : bool
+            Sync Read・Fast Sync Read で全サーボをまとめて読み取るかどうか.
+            `False` の場合はサーボごとに READ 命令を送る.
 
         Returns
         -------
         list[int]
             各サーボからの値.
 
+        Raises
+        ------
+        DynamixelCommError
+            通信に失敗した場合. `flight_recorder.auto_dump` が有効であれば,
+            それまでの記録を保存する.
+
+        """
+        start = time.monotonic()
+        address = control_table.address
+        try:
+            values = self._read(control_table, fast_sync_read=fast_sync_read)
+        except DynamixelCommError as error:
+            result = error.dxl_comm_result_code
+            self._record_error(Transaction.READ, address, (), start, result)
+            raise
+        self.flight_recorder.record(Transaction.READ, address, values, start)
+        return values
+
+    def _read(
+        self,
+        control_table: ControlTable,
+        *,
+        fast_sync_read: bool,
+    ) -> list[int]:
+        """
+        `read` の本体.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            読み取るデータの種類.
+        fast_sync_read : bool
+            Sync Read・Fast Sync Read で全サーボをまとめて読み取るかどうか.
+
+        Returns
+        -------
+        list[int]
+            各サーボからの値.
+
+        """
+        if not fast_sync_read:
+            return [servo.read(control_table) for servo in self.servos]
+
+        if self.fast_sync_read_support is None:
+            self.fast_sync_read_support = [
+                supports_fast_sync_read(
+                    model_number,
+                    servo.read(ControlTable.VERSION_OF_FIRMWARE),
+                )
+                for servo, model_number in zip(self.servos, self.model_numbers)
+            ]
+        fast_ids: list[int] = []
+        ids: list[int] = []
+        for servo, fast in zip(self.servos, self.fast_sync_read_support):
+            (fast_ids if fast else ids).append(servo.servo_id)
+
+        values = {
+            **self._sync_read(control_table, fast_ids, fast=True),
+            **self._sync_read(control_table, ids, fast=False),
+        }
+        return [
+            cast_value(values[servo.servo_id], dtype=control_table.dtype)
+            for servo in self.servos
+        ]
+
+    def _sync_read(
+        self,
+        control_table: ControlTable,
+        servo_ids: list[int],
+        *,
+        fast: bool,
+    ) -> dict[int, int]:
+        """
+        1回の Sync Read もしくは Fast Sync Read 命令で読み取る.
+
+        Fast Sync Read の応答は1つのパケットなので, CRC の確認は1回で済む.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            読み取るデータの種類.
+        servo_ids : list[int]
+            読み取るサーボのID. 空の場合は何もしない.
+        fast : bool
+            Fast Sync Read を使うかどうか.
+
+        Returns
+        -------
+        dict[int, int]
+            サーボのIDと, 符号を付ける前の値.
+
+        Raises
+        ------
+        DynamixelCommError
+            通信に失敗した場合.
+
+        """
+        if not servo_ids:
+            return {}
+        group = dynamixel_sdk.GroupSyncRead(
+            self.port_handler,
+            self.packet_handler,
+            control_table.address,
+            control_table.num_bytes,
+        )
+        for servo_id in servo_ids:
+            group.addParam(servo_id)
+        dxl_comm_result = group.fastSyncRead() if fast else group.txRxPacket()
+        if dxl_comm_result != dynamixel_sdk.COMM_SUCCESS:
+            name = "Fast Sync Read" if fast else "Sync Read"
+            msg = (
+                f"servo_ids={servo_ids}の{control_table}の{name}に失敗しました."
+            )
+            raise DynamixelCommError(msg, dxl_comm_result, 0)
+        return {
+            servo_id: group.getData(
+                servo_id,
+                control_table.address,
+                control_table.num_bytes,
+            )
+            for servo_id in servo_ids
+        }
+
+    def bulk_read(
+        self,
+        control_tables: Mapping[int, ControlTable],
+    ) -> dict[int, int]:
+        """
+        サーボごとに異なる項目を, 1回の Bulk Read 命令で読み取る.
+
+        各サーボの値はそれぞれの項目の `dtype` に従って符号を付ける.
+
+        Example
+        -------
+        ```python
+        from robopy import RobotDriver, ControlTable
+
+        robot = RobotDriver(servo_ids=[1, 2, 3])
+        items = {
+            1: ControlTable.PRESENT_POSITION,
+            2: ControlTable.PRESENT_POSITION,
+            3: ControlTable.PRESENT_CURRENT,  # グリッパー
+        }
+        while True:
+            values = robot.bulk_read(items)
+            print(f"Gripper current: {values[3]}")
+        ```
+
+        Parameters
+        ----------
+        control_tables : Mapping[int, ControlTable]
+            サーボのIDと, そのサーボから読み取る項目.
+
+        Returns
+        -------
+        dict[int, int]
+            サーボのIDと, そのサーボから読み取った値.
+
+        Raises
+        ------
+        DynamixelCommError
+            いずれかのサーボとの通信に失敗した場合.
+
+        """
+        start = time.monotonic()
+        group = dynamixel_sdk.GroupBulkRead(
+            self.port_handler,
+            self.packet_handler,
+        )
+        for servo_id, control_table in control_tables.items():
+            group.addParam(
+                servo_id,
+                control_table.address,
+                control_table.num_bytes,
+            )
+        dxl_comm_result = group.txRxPacket()
+        if dxl_comm_result != dynamixel_sdk.COMM_SUCCESS:
+            msg = f"servo_ids={list(control_tables)}のBulk Readに失敗しました."
+            self._record_error(
+                Transaction.BULK_READ,
+                -1,
+                (),
+                start,
+                dxl_comm_result,
+            )
+            raise DynamixelCommError(msg, dxl_comm_result, 0)
+
+        values = {
+            servo_id: cast_value(
+                group.getData(
+                    servo_id,
+                    control_table.address,
+                    control_table.num_bytes,
+                ),
+                dtype=control_table.dtype,
+            )
+            for servo_id, control_table in control_tables.items()
+        }
+        self.flight_recorder.record(
+            Transaction.BULK_READ,
+            -1,
+            [values.get(servo.servo_id, math.nan) for servo in self.servos],
+            start,
+        )
+        return values
+
+    def bulk_write(
+        self,
+        control_tables: Mapping[int, ControlTable],
+        values: Mapping[int, int],
+    ) -> None:
+        """
+        サーボごとに異なる項目に, 1回の Bulk Write 命令で書き込む.
+
+        Bulk Write にはステータスパケットが返らないため,
+        書き込みに成功したかどうかは確認できない.
+
+        Example
+        -------
+        ```python
+        from robopy import RobotDriver, ControlTable
+
+        robot = RobotDriver(servo_ids=[1, 2, 3])
+        items = {
+            1: ControlTable.GOAL_POSITION,
+            2: ControlTable.GOAL_POSITION,
+            3: ControlTable.GOAL_CURRENT,  # グリッパー
+        }
+        robot.bulk_write(items, {1: 2048, 2: 1024, 3: -200})
+        ```
+
+        Parameters
+        ----------
+        control_tables : Mapping[int, ControlTable]
+            サーボのIDと, そのサーボに書き込む項目.
+        values : Mapping[int, int]
+            サーボのIDと, そのサーボに書き込む値.
+
+        Raises
+        ------
+        DynamixelCommError
+            送信に失敗した場合.
+
+        """
+        start = time.monotonic()
+        recorded = [
+            values.get(servo.servo_id, math.nan) for servo in self.servos
+        ]
+        group = dynamixel_sdk.GroupBulkWrite(
+            self.port_handler,
+            self.packet_handler,
+        )
+        for servo_id, control_table in control_tables.items():
+            num_bytes = control_table.num_bytes
+            value = values[servo_id] % (1 << (8 * num_bytes))
+            group.addParam(
+                servo_id,
+                control_table.address,
+                num_bytes,
+                list(value.to_bytes(num_bytes, "little")),
+            )
+        dxl_comm_result = group.txPacket()
+        if dxl_comm_result != dynamixel_sdk.COMM_SUCCESS:
+            msg = f"servo_ids={list(control_tables)}のBulk Writeに失敗しました."
+            self._record_error(
+                Transaction.BULK_WRITE,
+                -1,
+                recorded,
+                start,
+                dxl_comm_result,
+            )
+            raise DynamixelCommError(msg, dxl_comm_result, 0)
+        self.flight_recorder.record(Transaction.BULK_WRITE, -1, recorded, start)
+
+    def apply_profile(
+        self,
+        profile: ConfigProfile,
+        *,
+        verify: bool = True,
+    ) -> dict[ControlTable, list[int]]:
+        """
+        `ConfigProfile` の設定を全サーボに書き込む.
+
+        現在の値を1回の Sync Read で読み取り, 設定値と異なる項目だけを
+        アドレスの連続した項目ごとの Sync Write で書き込む.
+        `R/W(NVM)` の項目を書き換える間はトルクを切る.
+        詳しくは `ConfigProfile.apply` を参照.
+
+        Example
+        -------
+        ```python
+        from robopy import ControlTable, RobotDriver
+        from robopy.config import ConfigProfile
+
+        robot = RobotDriver(...)
+        changes = robot.apply_profile(ConfigProfile.load("robot.json"))
+        print(f"Updated: {changes}")
+        ```
+
+        Parameters
+        ----------
+        profile : ConfigProfile
+            設定する項目と値.
+        verify : bool
+            書き込んだ後にもう1度読み取り, 設定値になったことを確認するか.
+
+        Returns
+        -------
+        dict[ControlTable, list[int]]
+            書き込んだ項目と, その項目を書き込んだサーボのID.
+
+        """
+        return profile.apply(self, verify=verify)
+
+    def _record_error(
+        self,
+        transaction: Transaction,
+        address: int,
+        values: npt.ArrayLike,
+        start: float,
+        result: int,
+    ) -> None:
+        """
+        失敗した読み書きを記録し, `flight_recorder.dump_on_error` を呼ぶ.
+
+        Parameters
+        ----------
+        transaction : Transaction
+            読み書きの種類.
+        address : int
+            読み書きした項目のアドレス. 複数の項目の場合は -1.
+        values : npt.ArrayLike
+            各サーボの値. 読み取りの場合は空.
+        start : float
+            読み書きを開始した時刻(`time.monotonic`).
+        result : int
+            通信結果のコード.
+
+        """
+        self.flight_recorder.record(transaction, address, values, start, result)
+        self.flight_recorder.dump_on_error()
+
+    def write_physical(
+        self,
+        control_table: ControlTable,
+        values: npt.ArrayLike,
+    ) -> None:
+        """
+        物理量で各サーボに値を書き込む.
+
+        `robopy.units.to_raw` で一括変換してから `write` する.
+
+        Example
+        -------
+        ```python
+        from robopy import RobotDriver, ControlTable
+
+        robot = RobotDriver(...)
+        robot.write_physical(ControlTable.GOAL_POSITION, [180.0] * 5)
+        ```
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            書き込むデータの種類.
+        values : npt.ArrayLike
+            `control_table.unit.symbol` 単位の値.
+
+        """
+        raw = to_raw(control_table, values, self.model_numbers)
+        self.write(control_table, raw.tolist())
+
+    def read_physical(
+        self,
+        control_table: ControlTable,
+    ) -> npt.NDArray[np.float64]:
+        """
+        各サーボから値を読み取り, 物理量で返す.
+
+        `robopy.units.to_physical` で一括変換する.
+
+        Example
+        -------
+        ```python
+        from robopy import RobotDriver, ControlTable
+
+        robot = RobotDriver(...)
+        degrees = robot.read_physical(ControlTable.PRESENT_POSITION)
+        ```
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            読み取るデータの種類.
+
+        Returns
+        -------
+        npt.NDArray[np.float64]
+            `control_table.unit.symbol` 単位の値.
+
         """
-        return [servo.read(control_table) for servo in self.servos]
+        values = self.read(control_table)
+        return to_physical(control_table, values, self.model_numbers)
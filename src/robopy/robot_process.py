@@ -0,0 +1,404 @@
+"""
+`RobotDriver` をシリアルポートごとの別プロセスで動かす.
+
+複数のロボットやカメラを1プロセスで扱うと, パケットの生成・解析や
+画像のデコード, 推論が GIL を奪い合って制御周期が揺らぐ.
+`RobotProcess` はワーカープロセス内で `RobotDriver` を周期的に動かし,
+最新の状態と目標値を `SeqlockArray` で共有する.
+メインプロセス側の読み込みは共有メモリからのコピーのみで済む.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Sequence
+
+import numpy as np
+
+from robopy.control_table import ControlTable
+from robopy.dynamixel import DynamixelCommError
+from robopy.robot import RobotDriver
+from robopy.shm import SeqlockArray
+from robopy.units import to_physical, to_raw
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.sharedctypes import Synchronized
+    from multiprocessing.synchronize import Event
+
+    import dynamixel_sdk
+    import numpy.typing as npt
+
+__all__ = ["RobotProcess"]
+
+
+class RobotProcess:
+    """
+    `RobotDriver` をワーカープロセスで動かすプロキシ.
+
+    ワーカーは `period` 秒ごとに次を繰り返す.
+
+    1. `goal_item` の目標値が更新されていれば書き込む.
+    2. `state_items` を読み取り, 共有メモリに公開する.
+    3. 残りの時間でメインプロセスからの要求(その他の read/write)を処理する.
+
+    `RobotDriver` と同じ `read`・`write` を持つので, そのまま置き換えられる.
+
+    Note
+    ----
+    - `state_items` の `read` は直近の周期で読み取った値を返す.
+      取得時刻は `read_state` で確認できる.
+    - `goal_item` の `write` は共有メモリに書くだけで, 実際の送信は次の周期.
+    - それ以外の `read`・`write` はワーカーへの要求となり, 完了まで待つ.
+    - 周期中の通信エラーは `comm_error_count` に加算され, ループは継続する.
+
+    Example
+    -------
+    ```python
+    from robopy import ControlTable
+    from robopy.robot_process import RobotProcess
+
+    leader = RobotProcess("/dev/ttyUSB0", 1_000_000, [1, 2, 3, 4, 5])
+    follower = RobotProcess("/dev/ttyUSB1", 1_000_000, [1, 2, 3, 4, 5])
+    follower.write(ControlTable.TORQUE_ENABLE, [1] * 5)
+    while True:
+        position = leader.read(ControlTable.PRESENT_POSITION)
+        follower.write(ControlTable.GOAL_POSITION, position)
+    ```
+
+    Parameters
+    ----------
+    port_name : str
+        シリアルポートの名前.
+    baudrate : int
+        ボーレート.
+    servo_ids : list[int]
+        サーボのID.
+    state_items : Sequence[ControlTable]
+        ワーカーが毎周期読み取り, 共有メモリに公開する項目.
+    goal_item : ControlTable
+        共有メモリ経由で書き込む目標値の項目.
+    period : float
+        ワーカーの周期 [s]. 0 の場合は可能な限り速く回す.
+    port_handler : dynamixel_sdk.PortHandler | None
+        ワーカーの `RobotDriver` に渡すポートハンドラ.
+        `SimulatedPort` などを使う場合に指定する.
+
+    Raises
+    ------
+    RuntimeError
+        ワーカー内での `RobotDriver` の初期化に失敗した場合.
+
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        port_name: str,
+        baudrate: int,
+        servo_ids: list[int],
+        state_items: Sequence[ControlTable] = (ControlTable.PRESENT_POSITION,),
+        goal_item: ControlTable = ControlTable.GOAL_POSITION,
+        period: float = 0.0,
+        *,
+        port_handler: dynamixel_sdk.PortHandler | None = None,
+    ) -> None:
+        shape = (len(servo_ids),)
+        self.servo_ids = servo_ids
+        self.goal_item = goal_item
+        self.states = {
+            item: SeqlockArray.create(shape, np.int64) for item in state_items
+        }
+        self.goal = SeqlockArray.create(shape, np.int64)
+
+        ctx = mp.get_context()
+        self._stop = ctx.Event()
+        self._comm_error_count: Synchronized[int] = ctx.Value("q", 0)
+        self._conn, child_conn = ctx.Pipe()
+        self._lock = threading.Lock()
+        self.process = ctx.Process(
+            target=_run_worker,
+            kwargs={
+                "port_name": port_name,
+                "baudrate": baudrate,
+                "servo_ids": servo_ids,
+                "state_names": {k: v.name for k, v in self.states.items()},
+                "goal_item": goal_item,
+                "goal_name": self.goal.name,
+                "period": period,
+                "port_handler": port_handler,
+                "conn": child_conn,
+                "stop": self._stop,
+                "comm_error_count": self._comm_error_count,
+            },
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        try:
+            response = self._conn.recv()
+        except EOFError:
+            response = RuntimeError(f"Worker for {port_name} exited.")
+        if isinstance(response, Exception):
+            self.close()
+            raise response
+        self.model_numbers: list[int] = response
+
+    @property
+    def comm_error_count(self) -> int:
+        """
+        ワーカーの周期処理で発生した通信エラーの回数.
+
+        Returns
+        -------
+        int
+            通信エラーの回数.
+
+        """
+        return int(self._comm_error_count.value)
+
+    def read_state(
+        self,
+        control_table: ControlTable,
+    ) -> tuple[npt.NDArray[np.int64], float, int]:
+        """
+        共有メモリから最新の状態を取得時刻・シーケンス番号付きで読み取る.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            `state_items` に含まれる項目.
+
+        Returns
+        -------
+        tuple[npt.NDArray[np.int64], float, int]
+            values : npt.NDArray[np.int64]
+                各サーボの値.
+            timestamp : float
+                ワーカーが読み取った時刻(`time.monotonic`).
+            sequence : int
+                ワーカーの周期の通し番号.
+
+        """
+        values, timestamp, sequence = self.states[control_table].read()
+        return values.astype(np.int64, copy=False), timestamp, sequence
+
+    def write(self, control_table: ControlTable, values: list[int]) -> None:
+        """
+        各サーボに値を書き込む.
+
+        `goal_item` は共有メモリに書き込み, 次の周期でワーカーが送信する.
+        それ以外はワーカーに要求して完了を待つ.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            書き込むデータの種類.
+        values : list[int]
+            書き込む値.
+
+        """
+        if control_table == self.goal_item:
+            self.goal.write(values, time.monotonic())
+            return
+        self._request("write", control_table, values)
+
+    def read(self, control_table: ControlTable) -> list[int]:
+        """
+        各サーボから値を読み取る.
+
+        `state_items` は共有メモリの最新値を返す.
+        それ以外はワーカーに要求して完了を待つ.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            読み取るデータの種類.
+
+        Returns
+        -------
+        list[int]
+            各サーボからの値.
+
+        """
+        if control_table in self.states:
+            values, _, _ = self.read_state(control_table)
+            return [int(v) for v in values]
+        response: list[int] = self._request("read", control_table)
+        return response
+
+    def write_physical(
+        self,
+        control_table: ControlTable,
+        values: npt.ArrayLike,
+    ) -> None:
+        """
+        物理量で各サーボに値を書き込む.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            書き込むデータの種類.
+        values : npt.ArrayLike
+            `control_table.unit.symbol` 単位の値.
+
+        """
+        raw = to_raw(control_table, values, self.model_numbers)
+        self.write(control_table, raw.tolist())
+
+    def read_physical(
+        self,
+        control_table: ControlTable,
+    ) -> npt.NDArray[np.float64]:
+        """
+        各サーボから値を読み取り, 物理量で返す.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            読み取るデータの種類.
+
+        Returns
+        -------
+        npt.NDArray[np.float64]
+            `control_table.unit.symbol` 単位の値.
+
+        """
+        values = self.read(control_table)
+        return to_physical(control_table, values, self.model_numbers)
+
+    def close(self, timeout: float = 1.0) -> None:
+        """
+        ワーカーを停止し, 共有メモリを破棄する.
+
+        Parameters
+        ----------
+        timeout : float
+            ワーカーの終了を待つ時間 [s]. 過ぎた場合は強制終了する.
+
+        """
+        self._stop.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
+        for state in self.states.values():
+            state.close(unlink=True)
+        self.goal.close(unlink=True)
+
+    def _request(self, method: str, *args: Any) -> Any:  # noqa: ANN401
+        with self._lock:
+            self._conn.send((method, args))
+            response = self._conn.recv()
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _run_worker(  # noqa: PLR0913
+    *,
+    port_name: str,
+    baudrate: int,
+    servo_ids: list[int],
+    state_names: dict[ControlTable, str],
+    goal_item: ControlTable,
+    goal_name: str,
+    period: float,
+    port_handler: dynamixel_sdk.PortHandler | None,
+    conn: Connection,
+    stop: Event,
+    comm_error_count: Synchronized[int],
+) -> None:
+    """`RobotProcess` のワーカープロセスの本体."""
+    try:
+        robot = RobotDriver(
+            port_name,
+            baudrate,
+            servo_ids,
+            port_handler=port_handler,
+        )
+    except RuntimeError as e:
+        conn.send(e)
+        return
+
+    shape = (len(servo_ids),)
+    states = {
+        item: SeqlockArray.attach(name, shape, np.int64)
+        for item, name in state_names.items()
+    }
+    goal = SeqlockArray.attach(goal_name, shape, np.int64)
+    worker = _Worker(robot, states, goal_item, goal, comm_error_count)
+
+    try:
+        worker.step()
+        conn.send(robot.model_numbers)
+        while not stop.is_set():
+            deadline = time.monotonic() + period
+            worker.step()
+            while conn.poll(max(0.0, deadline - time.monotonic())):
+                conn.send(worker.handle(*conn.recv()))
+    except (EOFError, BrokenPipeError):
+        pass
+    finally:
+        for state in states.values():
+            state.close()
+        goal.close()
+        robot.port_handler.closePort()
+
+
+class _Worker:
+    """ワーカープロセス内で `RobotDriver` と共有メモリを仲介する."""
+
+    def __init__(
+        self,
+        robot: RobotDriver,
+        states: dict[ControlTable, SeqlockArray],
+        goal_item: ControlTable,
+        goal: SeqlockArray,
+        comm_error_count: Synchronized[int],
+    ) -> None:
+        self.robot = robot
+        self.states = states
+        self.goal_item = goal_item
+        self.goal = goal
+        self.goal_buffer = np.empty(len(robot.servos), dtype=np.int64)
+        self.applied = goal.sequence
+        self.comm_error_count = comm_error_count
+
+    def step(self) -> None:
+        """目標値が更新されていれば書き込み, 状態を読み取って公開する."""
+        try:
+            if self.goal.sequence != self.applied:
+                _, _, sequence = self.goal.read(self.goal_buffer)
+                self.robot.write(self.goal_item, self.goal_buffer.tolist())
+                # 書き込みに失敗した場合は次の周期で再送する
+                self.applied = sequence
+            for item, state in self.states.items():
+                state.write(self.robot.read(item), time.monotonic())
+        except DynamixelCommError:
+            self.comm_error_count.value += 1
+
+    def handle(self, method: str, args: tuple[Any, ...]) -> Any:  # noqa: ANN401
+        """
+        メインプロセスからの要求を `RobotDriver` で処理する.
+
+        Parameters
+        ----------
+        method : str
+            `RobotDriver` のメソッド名.
+        args : tuple[Any, ...]
+            メソッドの引数.
+
+        Returns
+        -------
+        Any
+            メソッドの返り値. 失敗した場合は例外オブジェクト.
+
+        """
+        try:
+            return getattr(self.robot, method)(*args)
+        except Exception as e:  # noqa: BLE001
+            # ワーカーは止めずに, メインプロセスで送出させる
+            return e
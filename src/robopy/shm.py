@@ -0,0 +1,407 @@
+"""
+プロセス間で配列を共有するための共有メモリ.
+
+`multiprocessing.shared_memory` 上に seqlock 付きの配列を配置し,
+書き込み側1プロセス・読み込み側複数プロセスでロック無しに最新値を共有する.
+
+References
+----------
+- [Seqlock - Wikipedia](https://en.wikipedia.org/wiki/Seqlock)
+
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+__all__ = ["SeqlockArray", "attach_shared_memory", "unlink_shared_memory"]
+
+HEADER_NBYTES = 16
+"""seqlockのヘッダ(シーケンス番号 uint64 + タイムスタンプ float64)のバイト数."""
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    既存の共有メモリに, `resource_tracker` に登録せずに接続する.
+
+    Python 3.12 以前の `SharedMemory(name=...)` は接続しただけでも登録し,
+    接続したプロセスの終了時に共有メモリが破棄されてしまう.
+    別のプロセスから接続して終了しても,
+    作成したプロセスで使い続けられるようにする.
+
+    Parameters
+    ----------
+    name : str
+        共有メモリの名前.
+
+    Returns
+    -------
+    shared_memory.SharedMemory
+        接続した共有メモリ.
+
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]  # noqa: SLF001
+    return shm
+
+
+def unlink_shared_memory(shm: shared_memory.SharedMemory) -> None:
+    """
+    作成した共有メモリを破棄する.
+
+    子プロセスは作成したプロセスと同じ `resource_tracker` を使うので,
+    子プロセスの `attach_shared_memory` で登録が外れていることがある.
+    登録し直してから破棄し, `resource_tracker` の警告を防ぐ.
+
+    Parameters
+    ----------
+    shm : shared_memory.SharedMemory
+        `create=True` で作成した共有メモリ.
+
+    """
+    if sys.version_info < (3, 13) and os.name == "posix":
+        resource_tracker.register(shm._name, "shared_memory")  # type: ignore[attr-defined]  # noqa: SLF001
+    shm.unlink()
+
+
+class SeqlockArray:
+    """
+    seqlock で保護された共有メモリ上の配列.
+
+    書き込み時はシーケンス番号を奇数にしてからデータを書き換え,
+    偶数に戻す. 読み込み側はコピーの前後でシーケンス番号が同じ偶数であれば
+    書き込み途中の値ではないと判断できる.
+
+    Note
+    ----
+    - 書き込みは1つのプロセス(スレッド)からのみ行うこと.
+    - 通常は `create` / `attach` を使う.
+      `buffer` を直接渡すのは, 1つの共有メモリを複数の配列に分割する場合.
+
+    Example
+    -------
+    ```python
+    from robopy.shm import SeqlockArray
+
+    writer = SeqlockArray.create(shape=(5,), dtype=np.int64)
+    reader = SeqlockArray.attach(writer.name, shape=(5,), dtype=np.int64)
+    writer.write([1, 2, 3, 4, 5], timestamp=time.monotonic())
+    values, timestamp, sequence = reader.read()
+    ```
+
+    Parameters
+    ----------
+    buffer : memoryview
+        配列を配置するバッファ.
+    shape : Sequence[int]
+        配列の形状.
+    dtype : npt.DTypeLike
+        配列のデータ型.
+    offset : int
+        `buffer` 内の先頭位置. 8バイト境界である必要がある.
+
+    """
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        shape: Sequence[int],
+        dtype: npt.DTypeLike,
+        offset: int = 0,
+    ) -> None:
+        self.shm: shared_memory.SharedMemory | None = None
+        self._seq: npt.NDArray[np.uint64]
+        self._stamp: npt.NDArray[np.float64]
+        self._seq = np.ndarray((1,), np.uint64, buffer, offset)
+        self._stamp = np.ndarray((1,), np.float64, buffer, offset + 8)
+        self._data: npt.NDArray[Any] = np.ndarray(
+            tuple(shape),
+            dtype,
+            buffer,
+            offset + HEADER_NBYTES,
+        )
+
+    @staticmethod
+    def nbytes(shape: Sequence[int], dtype: npt.DTypeLike) -> int:
+        """
+        ヘッダを含めた必要なバイト数を8バイト境界に切り上げて返す.
+
+        Parameters
+        ----------
+        shape : Sequence[int]
+            配列の形状.
+        dtype : npt.DTypeLike
+            配列のデータ型.
+
+        Returns
+        -------
+        int
+            バイト数.
+
+        """
+        data_nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return HEADER_NBYTES + (data_nbytes + 7) // 8 * 8
+
+    @classmethod
+    def create(
+        cls,
+        shape: Sequence[int],
+        dtype: npt.DTypeLike,
+    ) -> SeqlockArray:
+        """
+        共有メモリを新規に確保して配列を作る.
+
+        Parameters
+        ----------
+        shape : Sequence[int]
+            配列の形状.
+        dtype : npt.DTypeLike
+            配列のデータ型.
+
+        Returns
+        -------
+        SeqlockArray
+            共有メモリを所有する配列.
+
+        """
+        shm = shared_memory.SharedMemory(
+            create=True,
+            size=cls.nbytes(shape, dtype),
+        )
+        shm.buf[:HEADER_NBYTES] = bytes(HEADER_NBYTES)
+        array = cls(shm.buf, shape, dtype)
+        array.shm = shm
+        return array
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        shape: Sequence[int],
+        dtype: npt.DTypeLike,
+    ) -> SeqlockArray:
+        """
+        既存の共有メモリに接続する.
+
+        Parameters
+        ----------
+        name : str
+            共有メモリの名前. `SeqlockArray.name` で取得できる.
+        shape : Sequence[int]
+            配列の形状. `create` 時と揃える必要がある.
+        dtype : npt.DTypeLike
+            配列のデータ型. `create` 時と揃える必要がある.
+
+        Returns
+        -------
+        SeqlockArray
+            共有メモリを参照する配列.
+
+        """
+        shm = attach_shared_memory(name)
+        array = cls(shm.buf, shape, dtype)
+        array.shm = shm
+        return array
+
+    @property
+    def name(self) -> str:
+        """
+        共有メモリの名前.
+
+        Returns
+        -------
+        str
+            `attach` に渡す名前.
+
+        Raises
+        ------
+        RuntimeError
+            共有メモリを所有していない場合.
+
+        """
+        if self.shm is None:
+            msg = "SeqlockArray does not own a shared memory block."
+            raise RuntimeError(msg)
+        return self.shm.name
+
+    @property
+    def data(self) -> npt.NDArray[Any]:
+        """
+        共有メモリ上の配列そのもの.
+
+        seqlock で保護されないので, 読み込みには `read` を,
+        書き込みには `begin_write` / `end_write` を併用すること.
+
+        Returns
+        -------
+        npt.NDArray[Any]
+            共有メモリ上の配列のビュー.
+
+        """
+        return self._data
+
+    @property
+    def version(self) -> int:
+        """
+        seqlock のシーケンス番号そのもの.
+
+        Returns
+        -------
+        int
+            書き込み中は奇数, それ以外は `2 * sequence`.
+
+        """
+        return int(self._seq[0])
+
+    @property
+    def timestamp(self) -> float:
+        """
+        直近に書き込まれたタイムスタンプ.
+
+        Returns
+        -------
+        float
+            タイムスタンプ. `version` と併せて確認すること.
+
+        """
+        return float(self._stamp[0])
+
+    @property
+    def sequence(self) -> int:
+        """
+        これまでに完了した書き込みの回数.
+
+        Returns
+        -------
+        int
+            書き込み回数. 書き込み中の場合は直前の回数.
+
+        """
+        return int(self._seq[0]) // 2
+
+    def write(self, values: npt.ArrayLike, timestamp: float) -> None:
+        """
+        値とタイムスタンプを書き込む.
+
+        Parameters
+        ----------
+        values : npt.ArrayLike
+            書き込む値. 配列の形状にブロードキャストできる必要がある.
+        timestamp : float
+            値を取得した時刻.
+
+        """
+        # 変換に失敗してもシーケンス番号が奇数のまま残らないよう, 先に変換する
+        data = np.broadcast_to(
+            np.asarray(values, dtype=self._data.dtype),
+            self._data.shape,
+        )
+        self.begin_write()
+        self._data[...] = data
+        self.end_write(timestamp)
+
+    def begin_write(self) -> None:
+        """
+        書き込みを開始する.
+
+        `data` に直接書き込む場合(デコード結果を直接置く場合など)に使う.
+        書き終えたら `end_write` を呼ぶ.
+        """
+        self._seq[0] = int(self._seq[0]) | 1
+
+    def end_write(self, timestamp: float) -> None:
+        """
+        書き込みを完了する.
+
+        Parameters
+        ----------
+        timestamp : float
+            値を取得した時刻.
+
+        """
+        self._stamp[0] = timestamp
+        self._seq[0] = int(self._seq[0]) + 1
+
+    def abort_write(self) -> None:
+        """
+        `begin_write` で開始した書き込みを取り消し, シーケンス番号を戻す.
+
+        `data` を書き換える前に失敗した場合に使う.
+        """
+        self._seq[0] = int(self._seq[0]) & ~1
+
+    def read(
+        self,
+        out: npt.NDArray[Any] | None = None,
+        timeout: float = 1.0,
+    ) -> tuple[npt.NDArray[Any], float, int]:
+        """
+        書き込み途中でない値をコピーして返す.
+
+        Parameters
+        ----------
+        out : npt.NDArray[Any] | None
+            コピー先. `None` の場合は新しく確保する.
+        timeout : float
+            書き込みの完了を待つ時間 [s].
+
+        Returns
+        -------
+        tuple[npt.NDArray[Any], float, int]
+            values : npt.NDArray[Any]
+                値のコピー.
+            timestamp : float
+                値を書き込んだ時のタイムスタンプ.
+            sequence : int
+                書き込み回数.
+
+        Raises
+        ------
+        TimeoutError
+            `timeout` 秒経っても書き込みが完了しない場合.
+            書き込み側が `begin_write` の後に停止した場合など.
+
+        """
+        if out is None:
+            out = np.empty_like(self._data)
+        deadline = None
+        while True:
+            before = int(self._seq[0])
+            if not before & 1:
+                np.copyto(out, self._data)
+                timestamp = float(self._stamp[0])
+                if int(self._seq[0]) == before:
+                    return out, timestamp, before // 2
+            # 最初の1回は時刻を取らずに済ませる
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                msg = f"{timeout}秒以内に書き込みが完了しませんでした."
+                raise TimeoutError(msg)
+
+    def close(self, *, unlink: bool = False) -> None:
+        """
+        共有メモリを閉じる.
+
+        Parameters
+        ----------
+        unlink : bool
+            共有メモリ自体を破棄するかどうか. 作成したプロセスで1度だけ行う.
+
+        """
+        del self._seq, self._stamp, self._data
+        if self.shm is None:
+            return
+        self.shm.close()
+        if unlink:
+            unlink_shared_memory(self.shm)
@@ -0,0 +1,484 @@
+"""
+実機の代わりに Protocol 2.0 のパケットに応答する, シミュレーション用のバス.
+
+`SimulatedPort` は `dynamixel_sdk.PortHandler` の代わりに使え,
+書き込まれた命令パケットを解釈し, 各 `SimulatedServo` のコントロールテーブルを
+読み書きしてステータスパケットを返す.
+CRC とバイトスタッフィングには `robopy.protocol` の関数を使う
+(SDK と同じ結果になることはテストで確認している).
+送受信されるバイト列は実機と同じになる.
+ベンチマークや, ハードウェア無しでのテストに使う.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Sequence
+
+import dynamixel_sdk
+from dynamixel_sdk import robotis_def
+from dynamixel_sdk.protocol2_packet_handler import (
+    PKT_ID,
+    PKT_INSTRUCTION,
+    PKT_LENGTH_H,
+    PKT_LENGTH_L,
+)
+
+from robopy.control_table import ControlTable, supports_fast_sync_read
+from robopy.protocol import HEADER, add_stuffing, crc16, remove_stuffing
+
+__all__ = ["SimulatedPort", "SimulatedServo"]
+
+ACCESS_ERROR = 7
+"""書き込めない領域に書き込んだ場合のステータスパケットのエラー."""
+
+
+class SimulatedServo:
+    """
+    シミュレーション用のサーボ.
+
+    コントロールテーブルのバイト列 `memory` を持ち,
+    `REALTIME_TICK` は読み取り時にホストの時刻から更新する.
+
+    Parameters
+    ----------
+    servo_id : int
+        サーボのID.
+    model_number : int
+        `MODEL_NUMBER` の値. 既定は XM430-W350.
+    firmware : int
+        `VERSION_OF_FIRMWARE` の値.
+
+    """
+
+    def __init__(
+        self,
+        servo_id: int,
+        model_number: int = 1020,
+        firmware: int = 52,
+    ) -> None:
+        self.servo_id = servo_id
+        self.memory = bytearray(256)
+        self.set(ControlTable.MODEL_NUMBER, model_number)
+        self.set(ControlTable.VERSION_OF_FIRMWARE, firmware)
+        self.set(ControlTable.ID, servo_id)
+
+    @property
+    def model_number(self) -> int:
+        """`MODEL_NUMBER` の値."""
+        return self.get(ControlTable.MODEL_NUMBER)
+
+    @property
+    def firmware(self) -> int:
+        """`VERSION_OF_FIRMWARE` の値."""
+        return self.get(ControlTable.VERSION_OF_FIRMWARE)
+
+    def get(self, control_table: ControlTable) -> int:
+        """
+        コントロールテーブルの値を返す.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            取得する項目.
+
+        Returns
+        -------
+        int
+            値. 符号付きの項目は符号付きで返す.
+
+        """
+        start = control_table.address
+        data = self.memory[start : start + control_table.num_bytes]
+        signed = control_table.dtype.name.startswith("INT")
+        return int.from_bytes(data, "little", signed=signed)
+
+    def set(self, control_table: ControlTable, value: int) -> None:
+        """
+        コントロールテーブルに値を設定する.
+
+        Parameters
+        ----------
+        control_table : ControlTable
+            設定する項目.
+        value : int
+            値. 負の値は2の補数で格納する.
+
+        """
+        num_bytes = control_table.num_bytes
+        start = control_table.address
+        data = (value % (1 << (8 * num_bytes))).to_bytes(num_bytes, "little")
+        self.memory[start : start + num_bytes] = data
+
+    def read(self, address: int, length: int) -> bytes:
+        """
+        コントロールテーブルのバイト列を読み取る.
+
+        Parameters
+        ----------
+        address : int
+            先頭のアドレス.
+        length : int
+            バイト数.
+
+        Returns
+        -------
+        bytes
+            読み取ったバイト列.
+
+        """
+        tick = int(time.monotonic() * 1000) % 32768
+        self.set(ControlTable.REALTIME_TICK, tick)
+        return bytes(self.memory[address : address + length])
+
+    def write(self, address: int, data: bytes) -> bool:
+        """
+        コントロールテーブルにバイト列を書き込む.
+
+        実機と同じく, トルクが入っている間は `TORQUE_ENABLE` より前の
+        `R/W(NVM)` の領域には書き込めない.
+
+        Parameters
+        ----------
+        address : int
+            先頭のアドレス.
+        data : bytes
+            書き込むバイト列.
+
+        Returns
+        -------
+        bool
+            書き込めたかどうか.
+
+        """
+        torque = ControlTable.TORQUE_ENABLE
+        if address < torque.address and self.memory[torque.address]:
+            return False
+        self.memory[address : address + len(data)] = data
+        return True
+
+
+class SimulatedPort(dynamixel_sdk.PortHandler):  # type: ignore[misc]
+    """
+    `SimulatedServo` が接続されたシリアルポートの代わり.
+
+    `writePort` で受け取った命令パケットに即座に応答し,
+    応答のバイト列を `readPort` で返す.
+    応答が無い場合は `isPacketTimeout` がすぐに `True` になる.
+
+    Example
+    -------
+    ```python
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort, SimulatedServo
+
+    port = SimulatedPort([SimulatedServo(i) for i in [1, 2, 3]])
+    robot = RobotDriver("sim", 1_000_000, [1, 2, 3], port_handler=port)
+    ```
+
+    Parameters
+    ----------
+    servos : Sequence[SimulatedServo]
+        バスに接続されたサーボ.
+    port_name : str
+        ポートの名前.
+
+    """
+
+    def __init__(
+        self,
+        servos: Sequence[SimulatedServo],
+        port_name: str = "sim",
+    ) -> None:
+        super().__init__(port_name)
+        self.servos = {servo.servo_id: servo for servo in servos}
+        self.rx_buffer = bytearray()
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+        self.num_packets = 0
+
+    def openPort(self) -> bool:  # noqa: N802
+        """
+        ポートを開く.
+
+        Returns
+        -------
+        bool
+            常に `True`.
+
+        """
+        self.is_open = True
+        return True
+
+    def closePort(self) -> None:  # noqa: N802
+        """ポートを閉じる."""
+        self.is_open = False
+
+    def setBaudRate(self, baudrate: int) -> bool:  # noqa: N802
+        """
+        ボーレートを設定する.
+
+        Parameters
+        ----------
+        baudrate : int
+            ボーレート.
+
+        Returns
+        -------
+        bool
+            対応しているボーレートかどうか.
+
+        """
+        if self.getCFlagBaud(baudrate) <= 0:
+            return False
+        self.baudrate = baudrate
+        self.tx_time_per_byte = (1000.0 / baudrate) * 10.0
+        return True
+
+    def clearPort(self) -> None:  # noqa: N802
+        """受信バッファを空にする."""
+        self.rx_buffer.clear()
+
+    def getBytesAvailable(self) -> int:  # noqa: N802
+        """
+        受信済みのバイト数を返す.
+
+        Returns
+        -------
+        int
+            受信済みのバイト数.
+
+        """
+        return len(self.rx_buffer)
+
+    def readPort(self, length: int) -> bytes:  # noqa: N802
+        """
+        受信済みのバイト列を最大 `length` バイト取り出す.
+
+        Parameters
+        ----------
+        length : int
+            最大のバイト数.
+
+        Returns
+        -------
+        bytes
+            受信したバイト列.
+
+        """
+        data = bytes(self.rx_buffer[:length])
+        del self.rx_buffer[:length]
+        return data
+
+    def writePort(self, packet: Sequence[int]) -> int:  # noqa: N802
+        """
+        命令パケットを送信し, サーボの応答を受信バッファに追加する.
+
+        Parameters
+        ----------
+        packet : Sequence[int]
+            命令パケット. 複数のパケットを連結しても良い.
+
+        Returns
+        -------
+        int
+            送信したバイト数.
+
+        """
+        data = bytes(packet)
+        self.tx_bytes += len(data)
+        while data:
+            data = self._handle(data)
+        return len(packet)
+
+    def isPacketTimeout(self) -> bool:  # noqa: N802
+        """
+        応答の待ち時間を過ぎたかどうか.
+
+        応答は `writePort` の時点で揃っているので, 受信バッファが空なら
+        それ以上待っても何も来ない.
+
+        Returns
+        -------
+        bool
+            受信バッファが空の場合は `True`.
+
+        """
+        return not self.rx_buffer
+
+    def _handle(self, data: bytes) -> bytes:
+        """
+        先頭の命令パケットを1つ処理する.
+
+        Parameters
+        ----------
+        data : bytes
+            受信したバイト列.
+
+        Returns
+        -------
+        bytes
+            処理しなかった残りのバイト列.
+
+        """
+        start = data.find(HEADER)
+        if start < 0 or len(data) < start + 10:
+            return b""
+        packet = data[start:]
+        length = packet[PKT_LENGTH_L] | packet[PKT_LENGTH_H] << 8
+        total = length + PKT_INSTRUCTION
+        crc = packet[total - 2] | packet[total - 1] << 8
+        if crc16(packet[: total - 2]) != crc:
+            return packet[total:]
+
+        self.num_packets += 1
+        unstuffed = remove_stuffing(packet[:total])
+        servo_id = unstuffed[PKT_ID]
+        instruction = unstuffed[PKT_INSTRUCTION]
+        params = unstuffed[PKT_INSTRUCTION + 1 : -2]
+        handler = {
+            robotis_def.INST_PING: self._ping,
+            robotis_def.INST_READ: self._read,
+            robotis_def.INST_WRITE: self._write,
+            robotis_def.INST_SYNC_READ: self._sync_read,
+            robotis_def.INST_FAST_SYNC_READ: self._fast_sync_read,
+            robotis_def.INST_SYNC_WRITE: self._sync_write,
+            robotis_def.INST_BULK_READ: self._bulk_read,
+            robotis_def.INST_BULK_WRITE: self._bulk_write,
+        }.get(instruction)
+        if handler is not None:
+            handler(servo_id, params)
+        return packet[total:]
+
+    def _reply(
+        self,
+        servo_id: int,
+        params: bytes = b"",
+        error: int = 0,
+    ) -> None:
+        """
+        ステータスパケットを受信バッファに追加する.
+
+        Parameters
+        ----------
+        servo_id : int
+            応答するサーボのID.
+        params : bytes
+            パラメータ.
+        error : int
+            エラーの値.
+
+        """
+        length = (len(params) + 4).to_bytes(2, "little")
+        status = bytes([robotis_def.INST_STATUS, error])
+        packet = bytearray(
+            add_stuffing(
+                HEADER + bytes([servo_id]) + length + status + params + b"\0\0",
+            ),
+        )
+        total = len(packet)
+        packet[-2:] = crc16(memoryview(packet)[:-2]).to_bytes(2, "little")
+        self.rx_buffer += packet
+        self.rx_bytes += total
+
+    def _targets(self, servo_id: int) -> list[SimulatedServo]:
+        if servo_id == robotis_def.BROADCAST_ID:
+            return list(self.servos.values())
+        servo = self.servos.get(servo_id)
+        return [] if servo is None else [servo]
+
+    def _ping(self, servo_id: int, params: bytes) -> None:  # noqa: ARG002
+        for servo in self._targets(servo_id):
+            model = servo.model_number.to_bytes(2, "little")
+            self._reply(servo.servo_id, model + bytes([servo.firmware]))
+
+    def _read(self, servo_id: int, params: bytes) -> None:
+        address, length = _words(params, 2)
+        servo = self.servos.get(servo_id)
+        if servo is not None:
+            self._reply(servo_id, servo.read(address, length))
+
+    def _write(self, servo_id: int, params: bytes) -> None:
+        (address,) = _words(params, 1)
+        servo = self.servos.get(servo_id)
+        if servo is not None:
+            written = servo.write(address, params[2:])
+            self._reply(servo_id, error=0 if written else ACCESS_ERROR)
+
+    def _sync_read(self, _: int, params: bytes) -> None:
+        address, length = _words(params, 2)
+        for servo_id in params[4:]:
+            servo = self.servos.get(servo_id)
+            if servo is not None:
+                self._reply(servo_id, servo.read(address, length))
+
+    def _fast_sync_read(self, _: int, params: bytes) -> None:
+        """
+        対応するサーボの応答を1つのステータスパケットにまとめて返す.
+
+        各サーボの区切りの CRC はパケットの先頭からその位置までの CRC で,
+        最後のサーボの CRC がパケット全体の CRC になる.
+        長さは指定された全サーボ分とするので, 応答しないサーボや
+        非対応のサーボがあると, 途中で途切れたパケットになる.
+        応答の途中のスタッフィングは行わない.
+        """
+        address, length = _words(params, 2)
+        servo_ids = params[4:]
+        packet = bytearray(HEADER)
+        packet.append(robotis_def.BROADCAST_ID)
+        packet += (1 + len(servo_ids) * (length + 4)).to_bytes(2, "little")
+        packet.append(robotis_def.INST_STATUS)
+        for servo_id in servo_ids:
+            servo = self.servos.get(servo_id)
+            if servo is None or not supports_fast_sync_read(
+                servo.model_number,
+                servo.firmware,
+            ):
+                break
+            packet += bytes([0, servo_id]) + servo.read(address, length)
+            packet += crc16(packet).to_bytes(2, "little")
+        self.rx_buffer += packet
+        self.rx_bytes += len(packet)
+
+    def _sync_write(self, _: int, params: bytes) -> None:
+        address, length = _words(params, 2)
+        for i in range(4, len(params), length + 1):
+            servo = self.servos.get(params[i])
+            if servo is not None:
+                servo.write(address, params[i + 1 : i + 1 + length])
+
+    def _bulk_read(self, _: int, params: bytes) -> None:
+        for i in range(0, len(params), 5):
+            servo = self.servos.get(params[i])
+            address, length = _words(params[i + 1 : i + 5], 2)
+            if servo is not None:
+                self._reply(servo.servo_id, servo.read(address, length))
+
+    def _bulk_write(self, _: int, params: bytes) -> None:
+        i = 0
+        while i < len(params):
+            servo = self.servos.get(params[i])
+            address, length = _words(params[i + 1 : i + 5], 2)
+            if servo is not None:
+                servo.write(address, params[i + 5 : i + 5 + length])
+            i += 5 + length
+
+
+def _words(params: bytes, count: int) -> list[int]:
+    """
+    先頭から `count` 個の2バイトの値を取り出す.
+
+    Parameters
+    ----------
+    params : bytes
+        パラメータ.
+    count : int
+        取り出す個数.
+
+    Returns
+    -------
+    list[int]
+        リトルエンディアンの2バイトの値.
+
+    """
+    return [params[2 * i] | params[2 * i + 1] << 8 for i in range(count)]
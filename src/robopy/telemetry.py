@@ -0,0 +1,245 @@
+"""
+温度・電圧・エラー状態など, ゆっくり変化する項目の監視.
+
+毎周期すべてのサーボの温度や電圧を読むとバスの負荷が数倍になり,
+別スレッドから読むと `PortHandler` を取り合う.
+`TelemetryPoller` は制御ループと同じスレッドから呼び出し,
+周期ごとの余った時間に1項目だけを読み取る.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Mapping, Sequence
+
+import numpy as np
+
+from robopy.control_table import ControlTable, HardwareError
+from robopy.dynamixel import DynamixelCommError
+from robopy.units import to_physical
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from robopy.robot import RobotDriver
+
+__all__ = ["DEFAULT_ITEMS", "TelemetryAlert", "TelemetryPoller"]
+
+DEFAULT_ITEMS = (
+    ControlTable.HARDWARE_ERROR_STATUS,
+    ControlTable.PRESENT_TEMPERATURE,
+    ControlTable.PRESENT_INPUT_VOLTAGE,
+)
+"""既定で監視する項目."""
+
+
+@dataclass
+class TelemetryAlert:
+    """
+    監視している値の異常.
+
+    Attributes
+    ----------
+    servo_id : int
+        異常が発生したサーボのID.
+    item : ControlTable
+        異常が発生した項目.
+    value : float
+        読み取った値. `item.unit.symbol` 単位.
+    message : str
+        異常の内容.
+
+    """
+
+    servo_id: int
+    item: ControlTable
+    value: float
+    message: str
+
+
+class TelemetryPoller:
+    """
+    ゆっくり変化する項目を, 周期ごとに1つずつ順番に読み取る.
+
+    `poll` を呼ぶごとに, 次の(サーボ, 項目)を1つだけ読み取る.
+    これまでの読み取り時間から, 残り時間(`deadline` もしくは `budget`)に
+    収まらないと見込まれる場合は何もしない.
+    全サーボ・全項目を一巡するには `len(items) * len(robot.servos)` 回かかる.
+
+    次の場合に `callbacks` を `TelemetryAlert` を引数として呼ぶ.
+    同じ異常が続く間は最初の1回のみ呼ぶ.
+
+    - `HARDWARE_ERROR_STATUS` のいずれかのビットが立った場合.
+    - `thresholds` の範囲外になった場合.
+
+    Example
+    -------
+    ```python
+    import time
+
+    from robopy import ControlTable, RobotDriver
+    from robopy.telemetry import TelemetryPoller
+
+    robot = RobotDriver(...)
+    poller = TelemetryPoller(
+        robot,
+        budget=0.002,
+        thresholds={ControlTable.PRESENT_TEMPERATURE: (None, 70.0)},
+        callbacks=[print],
+    )
+    while True:
+        deadline = time.monotonic() + 1 / 100
+        position = robot.read(ControlTable.PRESENT_POSITION)
+        robot.write(ControlTable.GOAL_POSITION, position)
+        poller.poll(deadline)  # 余った時間で1項目だけ読む
+        time.sleep(max(0.0, deadline - time.monotonic()))
+    ```
+
+    Parameters
+    ----------
+    robot : RobotDriver
+        監視するロボット. `poll` は制御ループと同じスレッドから呼ぶこと.
+    items : Sequence[ControlTable]
+        監視する項目.
+    budget : float
+        1回の `poll` で使ってよい時間 [s].
+    thresholds : Mapping[ControlTable, tuple[float | None, float | None]] | None
+        項目ごとの正常な範囲 `(下限, 上限)`. `item.unit.symbol` 単位.
+        `None` の場合はその側を確認しない.
+    callbacks : Sequence[Callable[[TelemetryAlert], object]]
+        異常を検出した時に呼ぶ関数.
+
+    """
+
+    def __init__(
+        self,
+        robot: RobotDriver,
+        items: Sequence[ControlTable] = DEFAULT_ITEMS,
+        *,
+        budget: float = 0.001,
+        thresholds: (
+            Mapping[ControlTable, tuple[float | None, float | None]] | None
+        ) = None,
+        callbacks: Sequence[Callable[[TelemetryAlert], object]] = (),
+    ) -> None:
+        self.robot = robot
+        self.items = list(items)
+        self.budget = budget
+        self.thresholds = dict(thresholds or {})
+        self.callbacks = list(callbacks)
+
+        shape = (len(self.items), len(robot.servos))
+        self.values = np.full(shape, np.nan)
+        self.timestamps = np.full(shape, np.nan)
+        self.tripped = np.zeros(shape, dtype=bool)
+        self.read_time = 0.0
+        self.comm_error_count = 0
+        self._cursor = 0
+
+    def poll(self, deadline: float | None = None) -> bool:
+        """
+        時間に余裕があれば, 次の項目を1つ読み取る.
+
+        Parameters
+        ----------
+        deadline : float | None
+            この時刻(`time.monotonic`)までに読み取りを終える.
+            `None` の場合は今から `budget` 秒後.
+
+        Returns
+        -------
+        bool
+            読み取りに成功した場合は `True`.
+
+        """
+        start = time.monotonic()
+        limit = start + self.budget
+        if deadline is not None:
+            limit = min(limit, deadline)
+        if start + self.read_time > limit:
+            # 一度だけ遅かった読み取りで止まり続けないように, 見込みを減らす
+            self.read_time *= 0.9
+            return False
+
+        num_servos = len(self.robot.servos)
+        index, servo_index = divmod(self._cursor, num_servos)
+        self._cursor = (self._cursor + 1) % (len(self.items) * num_servos)
+        item = self.items[index]
+        servo = self.robot.servos[servo_index]
+        try:
+            raw = servo.read(item)
+        except DynamixelCommError:
+            self.comm_error_count += 1
+            raw = None
+        end = time.monotonic()
+        # 1回の読み取り時間の見込みは, 遅くなった場合にすぐ追従させる.
+        # タイムアウトで失敗した場合も, 待った時間を見込みに含める
+        self.read_time = max(end - start, 0.9 * self.read_time)
+        if raw is None:
+            return False
+
+        model_number = self.robot.model_numbers[servo_index]
+        value = float(to_physical(item, [raw], [model_number])[0])
+        self.values[index, servo_index] = value
+        self.timestamps[index, servo_index] = end
+        self._check(index, servo_index, raw, value)
+        return True
+
+    def get(
+        self,
+        item: ControlTable,
+        now: float | None = None,
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """
+        最後に読み取った値と, 読み取ってからの経過時間を返す.
+
+        Parameters
+        ----------
+        item : ControlTable
+            `items` に含まれる項目.
+        now : float | None
+            経過時間の基準の時刻. `None` の場合は `time.monotonic()`.
+
+        Returns
+        -------
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]
+            values : npt.NDArray[np.float64]
+                各サーボの値. `item.unit.symbol` 単位.
+                まだ読み取っていない場合は `nan`.
+            ages : npt.NDArray[np.float64]
+                各サーボの値を読み取ってからの経過時間 [s].
+                まだ読み取っていない場合は `nan`.
+
+        """
+        if now is None:
+            now = time.monotonic()
+        index = self.items.index(item)
+        return self.values[index].copy(), now - self.timestamps[index]
+
+    def _check(
+        self,
+        index: int,
+        servo_index: int,
+        raw: int,
+        value: float,
+    ) -> None:
+        """読み取った値を確認し, 新しい異常であれば `callbacks` を呼ぶ."""
+        item = self.items[index]
+        message = ""
+        if item == ControlTable.HARDWARE_ERROR_STATUS and raw != 0:
+            message = f"Hardware error: {HardwareError(raw)!r}"
+        low, high = self.thresholds.get(item, (None, None))
+        if low is not None and value < low:
+            message = f"{item.name} {value:g} is below {low:g}"
+        if high is not None and value > high:
+            message = f"{item.name} {value:g} is above {high:g}"
+
+        was_tripped = self.tripped[index, servo_index]
+        self.tripped[index, servo_index] = bool(message)
+        if not message or was_tripped:
+            return
+        servo_id = self.robot.servos[servo_index].servo_id
+        alert = TelemetryAlert(servo_id, item, value, message)
+        for callback in self.callbacks:
+            callback(alert)
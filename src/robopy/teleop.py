@@ -0,0 +1,276 @@
+"""
+Leader-Follower で, 通信の遅れの分だけ Leader の動きを先読みする.
+
+Follower の `GOAL_POSITION` は, Leader の `read`・Follower の `write`・
+制御周期の分だけ Leader より遅れる. 速い動きではこの数十ms の遅れが
+目に見えるので, `FollowerPredictor` は Leader の速度を推定し,
+測定した遅れの分だけ外挿した位置を `GOAL_POSITION` にする.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from robopy.control_table import ControlTable
+from robopy.units import scaling_factors
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from robopy.robot import RobotDriver
+
+__all__ = ["VELOCITY_TO_POSITION", "FollowerPredictor"]
+
+VELOCITY_TO_POSITION = float(
+    scaling_factors(ControlTable.PRESENT_VELOCITY)
+    * 360
+    / 60
+    / scaling_factors(ControlTable.PRESENT_POSITION),
+)
+"""
+`PRESENT_VELOCITY` の値を `PRESENT_POSITION` の値/s に変換する係数.
+
+速度の単位(`Unit.RPM`)を `* 360 / 60` で deg/s にし,
+位置の単位(`Unit.DEG`)で割る.
+"""
+
+
+class FollowerPredictor:
+    """
+    Leader の位置から, 遅れを補償した Follower の `GOAL_POSITION` を求める.
+
+    `predict` は Leader の位置を受け取るたびに次のことを行う.
+
+    1. 直近 `window` 回の位置と時刻に最小二乗法で直線を当てはめ,
+       全関節の速度を一括で推定する.
+       `velocity` に `PRESENT_VELOCITY` を渡した場合はその値を使う.
+    2. 位置を `latency` 秒分だけ外挿する.
+    3. Follower の `MIN_POSITION_LIMIT`・`MAX_POSITION_LIMIT` の範囲に収める.
+
+    `latency` は次の和で, 前の2つは `predict`・`commit` の時刻から測定し,
+    指数移動平均で平滑化する.
+
+    - `pipeline_latency`: Leader の位置の時刻から, Follower への書き込みが
+      終わるまでの時間.
+    - `period` の半分: 書き込んだ値が次の書き込みまで保持されることによる,
+      平均の遅れ.
+    - `extra_latency`: サーボの追従の遅れなど, 測定できない分.
+
+    Example
+    -------
+    ```python
+    import time
+
+    from robopy import ControlTable, RobotDriver
+    from robopy.teleop import FollowerPredictor
+
+    leader = RobotDriver(...)
+    follower = RobotDriver(...)
+    predictor = FollowerPredictor.from_robot(follower)
+    while True:
+        start = time.monotonic()
+        position = leader.read(ControlTable.PRESENT_POSITION)
+        goal = predictor.predict(position, timestamp=start)
+        follower.write(ControlTable.GOAL_POSITION, goal.tolist())
+        predictor.commit()
+        print(f"Compensating {predictor.latency * 1e3:.1f} ms")
+    ```
+
+    Parameters
+    ----------
+    lower : npt.ArrayLike
+        各関節の `MIN_POSITION_LIMIT`.
+    upper : npt.ArrayLike
+        各関節の `MAX_POSITION_LIMIT`.
+    window : int
+        速度の推定に使うサンプル数.
+    smoothing : float
+        `pipeline_latency`・`period` の指数移動平均の係数(0~1).
+        大きいほど新しい測定値に素早く追従する.
+    latency : float | None
+        測定値の代わりに使う固定の遅れ [s].
+    extra_latency : float
+        測定した遅れに加える時間 [s].
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        lower: npt.ArrayLike,
+        upper: npt.ArrayLike,
+        *,
+        window: int = 4,
+        smoothing: float = 0.1,
+        latency: float | None = None,
+        extra_latency: float = 0.0,
+    ) -> None:
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        num_joints = len(self.lower)
+        self.window = window
+        self.smoothing = smoothing
+        self.fixed_latency = latency
+        self.extra_latency = extra_latency
+
+        self.positions = np.zeros((window, num_joints))
+        self.timestamps = np.zeros(window)
+        self.count = 0
+        self.velocity = np.zeros(num_joints)
+        self.pipeline_latency = math.nan
+        self.period = math.nan
+        self._sample_time = math.nan
+
+    @classmethod
+    def from_robot(
+        cls,
+        follower: RobotDriver,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> FollowerPredictor:
+        """
+        Follower の `MIN_POSITION_LIMIT`・`MAX_POSITION_LIMIT` を読み取って作る.
+
+        Parameters
+        ----------
+        follower : RobotDriver
+            `GOAL_POSITION` を書き込むロボット.
+        **kwargs : Any
+            `FollowerPredictor` のその他の引数.
+
+        Returns
+        -------
+        FollowerPredictor
+            `follower` の可動範囲に収める `FollowerPredictor`.
+
+        """
+        lower = follower.read(ControlTable.MIN_POSITION_LIMIT)
+        upper = follower.read(ControlTable.MAX_POSITION_LIMIT)
+        return cls(lower, upper, **kwargs)
+
+    @property
+    def latency(self) -> float:
+        """
+        補償している遅れ [s].
+
+        `latency` を指定した場合はその値. 測定値が無い間は0として扱う.
+
+        Returns
+        -------
+        float
+            位置を外挿する時間.
+
+        """
+        if self.fixed_latency is not None:
+            return self.fixed_latency
+        latency = self.extra_latency
+        if not math.isnan(self.pipeline_latency):
+            latency += self.pipeline_latency
+        if not math.isnan(self.period):
+            latency += self.period / 2
+        return latency
+
+    def predict(
+        self,
+        positions: npt.ArrayLike,
+        velocity: npt.ArrayLike | None = None,
+        *,
+        timestamp: float | None = None,
+    ) -> npt.NDArray[np.int64]:
+        """
+        Leader の位置から Follower の `GOAL_POSITION` を求める.
+
+        Parameters
+        ----------
+        positions : npt.ArrayLike
+            Leader の各関節の `PRESENT_POSITION`.
+        velocity : npt.ArrayLike | None
+            同じ読み取りで得た Leader の `PRESENT_VELOCITY`.
+            `None` の場合は直近の位置から推定する.
+        timestamp : float | None
+            位置を読み取った時刻(`time.monotonic`).
+            `None` の場合は呼び出した時刻.
+            `read` を呼ぶ直前の時刻を渡すと, 読み取りの時間も補償する.
+
+        Returns
+        -------
+        npt.NDArray[np.int64]
+            外挿して可動範囲に収めた `GOAL_POSITION`.
+
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if not math.isnan(self._sample_time):
+            self.period = self._average(
+                self.period,
+                timestamp - self._sample_time,
+            )
+        self._sample_time = timestamp
+
+        index = self.count % self.window
+        self.positions[index] = positions
+        self.timestamps[index] = timestamp
+        self.count += 1
+        if velocity is None:
+            self._fit()
+        else:
+            np.multiply(velocity, VELOCITY_TO_POSITION, out=self.velocity)
+
+        goal = self.velocity * self.latency
+        goal += self.positions[index]
+        np.clip(goal, self.lower, self.upper, out=goal)
+        raw: npt.NDArray[np.float64] = np.rint(goal)
+        return raw.astype(np.int64)
+
+    def commit(self, timestamp: float | None = None) -> None:
+        """
+        Follower への書き込みが終わった時刻を記録する.
+
+        Parameters
+        ----------
+        timestamp : float | None
+            書き込みが終わった時刻(`time.monotonic`).
+            `None` の場合は呼び出した時刻.
+
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.pipeline_latency = self._average(
+            self.pipeline_latency,
+            timestamp - self._sample_time,
+        )
+
+    def _fit(self) -> None:
+        """直近の位置と時刻の傾きを, 全関節まとめて `velocity` に求める."""
+        size = min(self.count, self.window)
+        times = self.timestamps[:size] - self.timestamps[:size].mean()
+        denominator = float(times @ times)
+        if denominator == 0.0:
+            self.velocity[:] = 0.0
+            return
+        positions = self.positions[:size]
+        self.velocity[:] = times @ (positions - positions.mean(axis=0))
+        self.velocity /= denominator
+
+    def _average(self, average: float, value: float) -> float:
+        """
+        指数移動平均を更新する.
+
+        Parameters
+        ----------
+        average : float
+            これまでの平均. 最初は `nan`.
+        value : float
+            新しい測定値.
+
+        Returns
+        -------
+        float
+            更新した平均.
+
+        """
+        if math.isnan(average):
+            return value
+        return average + self.smoothing * (value - average)
@@ -0,0 +1,170 @@
+"""
+`ControlTable` の生の値と物理量の相互変換.
+
+各 `ControlTable` の `unit` に保持された係数を用いて,
+サーボ全体の値を NumPy 配列のまま一括で変換する.
+
+References
+----------
+- [ROBOTIS E-manual](https://emanual.robotis.com/docs/en/dxl/x/xm430-w350/)
+
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from robopy.control_table import ControlTable
+
+__all__ = [
+    "CURRENT_SCALING_FACTORS",
+    "scaling_factors",
+    "to_physical",
+    "to_raw",
+]
+
+CURRENT_SCALING_FACTORS: dict[int, float] = {
+    1000: 1.34,  # XH430-W350
+    1010: 1.34,  # XH430-W210
+    1020: 2.69,  # XM430-W350
+    1030: 2.69,  # XM430-W210
+    1040: 1.34,  # XH430-V350
+    1050: 1.34,  # XH430-V210
+    1100: 2.69,  # XH540-W270
+    1110: 2.69,  # XH540-W150
+    1120: 2.69,  # XM540-W270
+    1130: 2.69,  # XM540-W150
+    1140: 2.69,  # XH540-V270
+    1150: 2.69,  # XH540-V150
+    1170: 2.69,  # XW540-T260
+    1180: 2.69,  # XW540-T140
+    1190: 1.0,  # XL330-M077
+    1200: 1.0,  # XL330-M288
+    1210: 1.0,  # XC330-M181
+    1220: 1.0,  # XC330-M288
+    1230: 1.0,  # XC330-T181
+    1240: 1.0,  # XC330-T288
+    1270: 1.34,  # XW430-T333
+    1280: 1.34,  # XW430-T200
+}
+"""`MODEL_NUMBER` ごとの電流の係数 [mA]. `Current = Value * factor`."""
+
+
+def scaling_factors(
+    control_table: ControlTable,
+    model_numbers: Sequence[int] | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    サーボごとの変換係数を返す.
+
+    電流系(`Unit.MILLIAMP`)の場合は `model_numbers` から
+    `CURRENT_SCALING_FACTORS` を引く. それ以外はモデルに依らず一定.
+
+    Parameters
+    ----------
+    control_table : ControlTable
+        変換するデータの種類.
+    model_numbers : Sequence[int] | None
+        各サーボの `MODEL_NUMBER`. 電流系の場合は必須.
+
+    Returns
+    -------
+    npt.NDArray[np.float64]
+        係数. 電流系は `(len(model_numbers),)`, それ以外はスカラー配列.
+
+    Raises
+    ------
+    ValueError
+        電流系で `model_numbers` が無い, もしくは未知のモデルの場合.
+
+    """
+    scale = control_table.unit.scale
+    if scale is not None:
+        return np.asarray(scale, dtype=np.float64)
+
+    if model_numbers is None:
+        msg = f"{control_table}の変換には各サーボのMODEL_NUMBERが必要です."
+        raise ValueError(msg)
+
+    unknown = set(model_numbers) - set(CURRENT_SCALING_FACTORS)
+    if unknown:
+        msg = f"電流の係数が不明なMODEL_NUMBERです: {sorted(unknown)}"
+        raise ValueError(msg)
+
+    return np.array(
+        [CURRENT_SCALING_FACTORS[m] for m in model_numbers],
+        dtype=np.float64,
+    )
+
+
+def to_physical(
+    control_table: ControlTable,
+    values: npt.ArrayLike,
+    model_numbers: Sequence[int] | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    生の値を物理量に変換する.
+
+    最後の次元をサーボとして係数をブロードキャストするので,
+    `(T, num_servos)` のような時系列もそのまま変換できる.
+
+    Example
+    -------
+    ```python
+    from robopy import ControlTable, to_physical
+
+    degrees = to_physical(ControlTable.PRESENT_POSITION, [0, 1024, 2048])
+    print(degrees)  # [  0.  90. 180.]
+    ```
+
+    Parameters
+    ----------
+    control_table : ControlTable
+        変換するデータの種類.
+    values : npt.ArrayLike
+        生の値.
+    model_numbers : Sequence[int] | None
+        各サーボの `MODEL_NUMBER`. 電流系の場合は必須.
+
+    Returns
+    -------
+    npt.NDArray[np.float64]
+        `control_table.unit.symbol` 単位の物理量.
+
+    """
+    factors = scaling_factors(control_table, model_numbers)
+    return np.multiply(values, factors, dtype=np.float64)
+
+
+def to_raw(
+    control_table: ControlTable,
+    values: npt.ArrayLike,
+    model_numbers: Sequence[int] | None = None,
+) -> npt.NDArray[np.int64]:
+    """
+    物理量を生の値に変換する.
+
+    `to_physical` の逆変換. 最も近い整数に丸める.
+
+    Parameters
+    ----------
+    control_table : ControlTable
+        変換するデータの種類.
+    values : npt.ArrayLike
+        `control_table.unit.symbol` 単位の物理量.
+    model_numbers : Sequence[int] | None
+        各サーボの `MODEL_NUMBER`. 電流系の場合は必須.
+
+    Returns
+    -------
+    npt.NDArray[np.int64]
+        生の値.
+
+    """
+    factors = scaling_factors(control_table, model_numbers)
+    raw: npt.NDArray[np.float64] = np.rint(np.divide(values, factors))
+    return raw.astype(np.int64)
@@ -0,0 +1,427 @@
+"""
+カメラの代わりに, 録画や合成した画像を返す画像の取得元.
+
+カメラが無い環境でも, 撮影・録画・前処理の処理をテストやベンチマークで
+動かせるようにする. どのクラスも `CameraDriver` と同じ `get_frame` と,
+`cv2.VideoCapture` と同じ `read`・`isOpened`・`release` を持つので,
+`FrameSource` を受け付ける処理や `CameraProcess(source=...)` にそのまま渡せる.
+
+`realtime=True` の場合は実機のカメラと同じく `fps` の間隔でしか画像が
+得られず, `read` は次の画像の時刻まで待つ. 呼び出しが遅れて間隔を過ぎた
+画像は捨てられ, `dropped_frames` に数える.
+`realtime=False` の場合は待たずに次の画像を返すので, 処理のスループットを
+測れる.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+__all__ = [
+    "ArrayCamera",
+    "SyntheticCamera",
+    "VideoFileCamera",
+    "VirtualCamera",
+]
+
+
+class VirtualCamera(ABC):
+    """
+    `fps` の間隔で画像を返す取得元の基底クラス.
+
+    サブクラスは `_skip` と `_retrieve` を実装する.
+
+    Attributes
+    ----------
+    fps : float
+        画像の取得間隔 [Hz].
+    realtime : bool
+        `fps` の間隔で画像を返すかどうか.
+    frame_index : int
+        最後に返した画像の番号. 捨てた画像も数える. 最初は -1.
+    timestamp : float
+        最後に画像を返した時刻(`time.monotonic`). 最初は `nan`.
+    dropped_frames : int
+        呼び出しが遅れて捨てた画像の数.
+
+    Parameters
+    ----------
+    fps : float
+        画像の取得間隔 [Hz].
+    realtime : bool
+        `fps` の間隔で画像を返すかどうか. `False` の場合は待たない.
+
+    """
+
+    fps: float
+    realtime: bool
+    frame_index: int
+    timestamp: float
+    dropped_frames: int
+
+    def __init__(self, fps: float, *, realtime: bool = True) -> None:
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_index = -1
+        self.timestamp = math.nan
+        self.dropped_frames = 0
+        self._next_time: float | None = None
+        self._opened = True
+
+    def read(
+        self,
+        image: npt.NDArray[np.uint8] | None = None,
+    ) -> tuple[bool, npt.NDArray[np.uint8] | None]:
+        """
+        次の画像を返す. `cv2.VideoCapture.read` と同じ.
+
+        Parameters
+        ----------
+        image : npt.NDArray[np.uint8] | None
+            書き込み先. 形状が合う場合はここに書き込んで返す.
+
+        Returns
+        -------
+        tuple[bool, npt.NDArray[np.uint8] | None]
+            取得に成功したかどうかと, 画像.
+
+        """
+        if not self._opened:
+            return False, None
+        skip = self._wait()
+        if skip and not self._skip(skip):
+            return False, None
+        self.dropped_frames += skip
+        frame = self._retrieve(image)
+        if frame is None:
+            return False, None
+        self.frame_index += skip + 1
+        self.timestamp = time.monotonic()
+        return True, frame
+
+    def get_frame(self) -> npt.NDArray[np.uint8]:
+        """
+        次の画像を返す. `CameraDriver.get_frame` と同じ.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8]
+            画像.
+
+        Raises
+        ------
+        RuntimeError
+            画像の取得に失敗した場合.
+
+        """
+        ret, frame = self.read()
+        if not ret or frame is None:
+            msg = f"{type(self).__name__}からのフレーム取得に失敗."
+            raise RuntimeError(msg)
+        return frame
+
+    def isOpened(self) -> bool:  # noqa: N802
+        """
+        `release` されていないかどうか.
+
+        Returns
+        -------
+        bool
+            画像を取得できる場合は `True`.
+
+        """
+        return self._opened
+
+    def release(self) -> None:
+        """以降の `read` を失敗させる."""
+        self._opened = False
+
+    def _wait(self) -> int:
+        """
+        次の画像の時刻まで待つ.
+
+        Returns
+        -------
+        int
+            時刻を過ぎたために捨てる画像の数.
+
+        """
+        if not self.realtime:
+            return 0
+        period = 1 / self.fps
+        now = time.monotonic()
+        if self._next_time is None:
+            self._next_time = now
+        if now < self._next_time:
+            time.sleep(self._next_time - now)
+            skip = 0
+        else:
+            skip = int((now - self._next_time) / period)
+        self._next_time += (skip + 1) * period
+        return skip
+
+    @abstractmethod
+    def _skip(self, count: int) -> bool:
+        """
+        `count` 枚の画像を読み飛ばす.
+
+        Parameters
+        ----------
+        count : int
+            読み飛ばす枚数.
+
+        Returns
+        -------
+        bool
+            読み飛ばせたかどうか.
+
+        """
+
+    @abstractmethod
+    def _retrieve(
+        self,
+        image: npt.NDArray[np.uint8] | None,
+    ) -> npt.NDArray[np.uint8] | None:
+        """
+        次の画像を作る.
+
+        Parameters
+        ----------
+        image : npt.NDArray[np.uint8] | None
+            書き込み先.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8] | None
+            画像. 終端に達した場合は `None`.
+
+        """
+
+
+class SyntheticCamera(VirtualCamera):
+    """
+    合成した画像を返す取得元.
+
+    横方向のグラデーションの上を, 縦の白線が1画像ごとに1画素ずつ動く.
+    背景は作成時に1度だけ作り, 画像ごとにはコピーと線の描画だけを行う.
+
+    Example
+    -------
+    ```python
+    from robopy.preprocess import FramePreprocessor
+    from robopy.virtual_camera import SyntheticCamera
+
+    camera = SyntheticCamera(width=640, height=480, fps=30)
+    preprocess = FramePreprocessor(size=(224, 224))
+    while True:
+        observation = preprocess(camera.get_frame())
+    ```
+
+    Parameters
+    ----------
+    width : int
+        画像の幅.
+    height : int
+        画像の高さ.
+    fps : float
+        画像の取得間隔 [Hz].
+    realtime : bool
+        `fps` の間隔で画像を返すかどうか. `False` の場合は待たない.
+
+    """
+
+    def __init__(
+        self,
+        width: int = 320,
+        height: int = 240,
+        fps: float = 60,
+        *,
+        realtime: bool = True,
+    ) -> None:
+        super().__init__(fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self.background = np.empty((height, width, 3), dtype=np.uint8)
+        self.background[:] = gradient[:, np.newaxis]
+        self.background[..., 2] = gradient[::-1, np.newaxis].T
+        self._position = 0
+
+    def _skip(self, count: int) -> bool:
+        self._position += count
+        return True
+
+    def _retrieve(
+        self,
+        image: npt.NDArray[np.uint8] | None,
+    ) -> npt.NDArray[np.uint8]:
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+        image[:, self._position % self.width] = 255
+        self._position += 1
+        return image
+
+
+class ArrayCamera(VirtualCamera):
+    """
+    `(N, H, W, C)` の配列に保存した画像を順番に返す取得元.
+
+    `.npy` ファイルはメモリマップで開くので, 大きな録画でも全体を読み込まない.
+
+    Example
+    -------
+    ```python
+    import numpy as np
+
+    from robopy.virtual_camera import ArrayCamera
+
+    np.save("episode.npy", frames)  # (N, H, W, 3) の uint8
+    camera = ArrayCamera("episode.npy", fps=30)
+    frame = camera.get_frame()
+    ```
+
+    Parameters
+    ----------
+    frames : npt.ArrayLike | str | os.PathLike[str]
+        `(N, H, W, C)` の画像, もしくはそれを保存した `.npy` ファイル.
+    fps : float
+        画像の取得間隔 [Hz].
+    loop : bool
+        最後の画像の次に最初の画像に戻るかどうか.
+    realtime : bool
+        `fps` の間隔で画像を返すかどうか. `False` の場合は待たない.
+
+    """
+
+    def __init__(
+        self,
+        frames: npt.ArrayLike | str | os.PathLike[str],
+        fps: float = 30,
+        *,
+        loop: bool = True,
+        realtime: bool = True,
+    ) -> None:
+        super().__init__(fps, realtime=realtime)
+        if isinstance(frames, (str, os.PathLike)):
+            frames = np.load(frames, mmap_mode="r")
+        self.frames = np.asarray(frames, dtype=np.uint8)
+        self.loop = loop
+        self._position = 0
+
+    def _skip(self, count: int) -> bool:
+        self._position += count
+        return self.loop or self._position < len(self.frames)
+
+    def _retrieve(
+        self,
+        image: npt.NDArray[np.uint8] | None,
+    ) -> npt.NDArray[np.uint8] | None:
+        if self._position >= len(self.frames):
+            if not self.loop:
+                return None
+            self._position %= len(self.frames)
+        frame = self.frames[self._position]
+        self._position += 1
+        if image is None or image.shape != frame.shape:
+            return np.array(frame)
+        np.copyto(image, frame)
+        return image
+
+
+class VideoFileCamera(VirtualCamera):
+    """
+    動画ファイルや連番画像を順番に返す取得元.
+
+    `cv2.VideoCapture` で開けるものなら何でも良い.
+    `FrameEncoder` で保存した連番画像は `"frames/%06d.jpg"` のように指定する.
+
+    Example
+    -------
+    ```python
+    from robopy.virtual_camera import VideoFileCamera
+
+    camera = VideoFileCamera("episode.mp4")
+    while True:
+        frame = camera.get_frame()
+    ```
+
+    Parameters
+    ----------
+    path : str | os.PathLike[str]
+        動画ファイル, もしくは連番画像のパターン.
+    fps : float | None
+        画像の取得間隔 [Hz]. `None` の場合は動画に記録された値(無ければ30).
+    loop : bool
+        最後の画像の次に最初の画像に戻るかどうか.
+    realtime : bool
+        `fps` の間隔で画像を返すかどうか. `False` の場合は待たない.
+
+    Raises
+    ------
+    RuntimeError
+        ファイルを開けなかった場合.
+
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        fps: float | None = None,
+        *,
+        loop: bool = True,
+        realtime: bool = True,
+    ) -> None:
+        self.path = str(path)
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            msg = f"Failed to open video {self.path}"
+            raise RuntimeError(msg)
+        if fps is None:
+            fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        super().__init__(fps, realtime=realtime)
+        self.loop = loop
+
+    def release(self) -> None:
+        """動画ファイルを閉じる."""
+        super().release()
+        self.capture.release()
+
+    def _skip(self, count: int) -> bool:
+        for _ in range(count):
+            if not self.capture.grab() and not self._rewind():
+                return False
+        return True
+
+    def _retrieve(
+        self,
+        image: npt.NDArray[np.uint8] | None,
+    ) -> npt.NDArray[np.uint8] | None:
+        ret, frame = self.capture.read(image)
+        if not ret and self._rewind():
+            ret, frame = self.capture.read(image)
+        return frame if ret else None
+
+    def _rewind(self) -> bool:
+        """
+        `loop=True` の場合に最初の画像に戻る.
+
+        Returns
+        -------
+        bool
+            戻ったかどうか.
+
+        """
+        if not self.loop:
+            return False
+        return bool(self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0))
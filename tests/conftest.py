@@ -2,10 +2,26 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import pytest
 from dynamixel_sdk.port_handler import PortHandler
 from dynamixel_sdk.protocol2_packet_handler import Protocol2PacketHandler
-from dynamixel_sdk.robotis_def import COMM_RX_FAIL, COMM_SUCCESS
+from dynamixel_sdk.robotis_def import (
+    COMM_RX_FAIL,
+    COMM_RX_TIMEOUT,
+    COMM_SUCCESS,
+)
+
+from robopy import RobotDriver
+from robopy.recorder import FlightRecorder
+from robopy.sim import SimulatedPort, SimulatedServo
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+SERVO_IDS = (11, 12, 13, 14, 15)
+"""モックのバスに接続されているサーボのID."""
 
 
 class PortHandlerMock(PortHandler):  # type: ignore[misc]
@@ -31,7 +47,15 @@ class PortHandlerMock(PortHandler):  # type: ignore[misc]
 
 
 class Protocol2PacketHandlerMock(Protocol2PacketHandler):  # type: ignore[misc]
-    """Protocol2PacketHandlerのテスト用ダミークラス."""
+    """
+    Protocol2PacketHandlerのテスト用ダミークラス.
+
+    各サーボのコントロールテーブルを `memory` に保持し,
+    read/write系のメソッドは通信を行わずに `memory` を読み書きする.
+    """
+
+    def __init__(self) -> None:
+        self.memory = {dxl_id: bytearray(256) for dxl_id in SERVO_IDS}
 
     def ping(  # noqa: PLR6301
         self,
@@ -62,11 +86,84 @@ class Protocol2PacketHandlerMock(Protocol2PacketHandler):  # type: ignore[misc]
         """
         model_number = 0
         is_valid_port = port.port_name == "/dev/ttyUSB0"
-        is_valid_servo_id = dxl_id in {11, 12, 13, 14, 15}
+        is_valid_servo_id = dxl_id in SERVO_IDS
         if is_valid_port and is_valid_servo_id:
             return model_number, COMM_SUCCESS, 0
         return model_number, COMM_RX_FAIL, 0
 
+    def readTxRx(  # noqa: N802
+        self,
+        port: PortHandler,  # noqa: ARG002
+        dxl_id: int,
+        address: int,
+        length: int,
+    ) -> tuple[list[int], int, int]:
+        """
+        `readTxRx`のモック.
+
+        Parameters
+        ----------
+        port : PortHandler
+            ポートハンドラ.
+        dxl_id : int
+            サーボID.
+        address : int
+            読み取る先頭のアドレス.
+        length : int
+            読み取るバイト数.
+
+        Returns
+        -------
+        tuple[list[int], int, int]
+            data : list[int]
+                読み取ったバイト列.
+            dxl_comm_result : int
+                通信結果.
+            dxl_error : int
+                エラーの種類.
+        """
+        if dxl_id not in self.memory:
+            return [], COMM_RX_TIMEOUT, 0
+        data = list(self.memory[dxl_id][address : address + length])
+        return data, COMM_SUCCESS, 0
+
+    def writeTxRx(  # noqa: N802
+        self,
+        port: PortHandler,  # noqa: ARG002
+        dxl_id: int,
+        address: int,
+        length: int,
+        data: list[int],
+    ) -> tuple[int, int]:
+        """
+        `writeTxRx`のモック.
+
+        Parameters
+        ----------
+        port : PortHandler
+            ポートハンドラ.
+        dxl_id : int
+            サーボID.
+        address : int
+            書き込む先頭のアドレス.
+        length : int
+            書き込むバイト数.
+        data : list[int]
+            書き込むバイト列.
+
+        Returns
+        -------
+        tuple[int, int]
+            dxl_comm_result : int
+                通信結果.
+            dxl_error : int
+                エラーの種類.
+        """
+        if dxl_id not in self.memory:
+            return COMM_RX_TIMEOUT, 0
+        self.memory[dxl_id][address : address + length] = bytes(data[:length])
+        return COMM_SUCCESS, 0
+
 
 @pytest.fixture
 def _mock_handlers(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -79,3 +176,92 @@ def _mock_handlers(monkeypatch: pytest.MonkeyPatch) -> None:
         target="dynamixel_sdk.Protocol2PacketHandler",
         name=Protocol2PacketHandlerMock,
     )
+
+
+@pytest.fixture
+def flight_recorder(tmp_path: Path) -> FlightRecorder:
+    """
+    テストごとの一時ディレクトリに保存する `FlightRecorder`.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        テストごとの一時ディレクトリ.
+
+    Returns
+    -------
+    FlightRecorder
+        `SERVO_IDS` のサーボの読み書きを記録し,
+        通信エラーの時に保存するリングバッファ.
+    """
+    return FlightRecorder(len(SERVO_IDS), directory=tmp_path)
+
+
+@pytest.fixture
+def robot(
+    _mock_handlers: None,
+    flight_recorder: FlightRecorder,
+) -> RobotDriver:
+    """
+    モックのバスに接続した `RobotDriver`.
+
+    Parameters
+    ----------
+    _mock_handlers : None
+        モックを適用する fixture.
+    flight_recorder : FlightRecorder
+        読み書きを記録するリングバッファ.
+
+    Returns
+    -------
+    RobotDriver
+        ID が `SERVO_IDS` のサーボを持つロボット.
+    """
+    return RobotDriver(
+        "/dev/ttyUSB0",
+        1_000_000,
+        list(SERVO_IDS),
+        flight_recorder=flight_recorder,
+    )
+
+
+@pytest.fixture
+def sim_port() -> SimulatedPort:
+    """
+    `SERVO_IDS` のサーボが接続されたシミュレーション用のバス.
+
+    Returns
+    -------
+    SimulatedPort
+        シミュレーション用のバス.
+    """
+    return SimulatedPort([SimulatedServo(i) for i in SERVO_IDS])
+
+
+@pytest.fixture
+def sim_robot(
+    sim_port: SimulatedPort,
+    flight_recorder: FlightRecorder,
+) -> RobotDriver:
+    """
+    `sim_port` に接続した `RobotDriver`.
+
+    Parameters
+    ----------
+    sim_port : SimulatedPort
+        シミュレーション用のバス.
+    flight_recorder : FlightRecorder
+        読み書きを記録するリングバッファ.
+
+    Returns
+    -------
+    RobotDriver
+        ID が `SERVO_IDS` のサーボを持つロボット.
+    """
+    return RobotDriver(
+        "sim",
+        1_000_000,
+        list(SERVO_IDS),
+        port_handler=sim_port,
+        flight_recorder=flight_recorder,
+    )
@@ -0,0 +1,168 @@
+"""`camera_process.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import subprocess  # noqa: S404
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from robopy.camera_process import CameraProcess, FrameRing
+from robopy.virtual_camera import SyntheticCamera
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+SHAPE = (4, 6, 3)
+
+
+class FlakyCamera(SyntheticCamera):
+    """3回目の `read` だけ失敗する取得元."""
+
+    def __init__(self) -> None:
+        super().__init__(SHAPE[1], SHAPE[0], fps=200)
+        self.num_reads = 0
+
+    def read(
+        self,
+        image: npt.NDArray[np.uint8] | None = None,
+    ) -> tuple[bool, npt.NDArray[np.uint8] | None]:
+        """
+        3回目の呼び出しだけ失敗を返す.
+
+        Parameters
+        ----------
+        image : npt.NDArray[np.uint8] | None
+            書き込み先.
+
+        Returns
+        -------
+        tuple[bool, npt.NDArray[np.uint8] | None]
+            取得に成功したかどうかと, 画像.
+        """
+        self.num_reads += 1
+        if self.num_reads == 3:  # noqa: PLR2004
+            return False, None
+        return super().read(image)
+
+
+def test__frame_ring_latest() -> None:
+    """
+    `FrameRing`のテスト.
+
+    `attach` した側から最新の画像がコピー無しで読めることを確認する.
+    """
+    writer = FrameRing.create(num_slots=3, shape=SHAPE)
+    reader = FrameRing.attach(writer.name)
+    try:
+        with pytest.raises(RuntimeError):
+            reader.latest()
+        for i in range(5):
+            writer.put(np.full(SHAPE, i, dtype=np.uint8), timestamp=i / 10)
+        frame, timestamp, sequence = reader.latest()
+        assert reader.shape == SHAPE
+        assert not frame.flags.writeable
+        assert (frame == sequence).all()
+        assert timestamp == sequence / 10
+        assert sequence == len(range(5)) - 1
+        del frame
+    finally:
+        reader.close()
+        writer.close(unlink=True)
+
+
+def test__frame_ring_attach_from_process() -> None:
+    """
+    `FrameRing`のテスト.
+
+    別のプロセスが `attach` して終了しても, リングバッファが破棄されずに
+    使い続けられることを確認する.
+    """
+    writer = FrameRing.create(num_slots=3, shape=SHAPE)
+    try:
+        writer.put(np.full(SHAPE, 7, dtype=np.uint8), timestamp=0.5)
+        code = (
+            "from robopy.camera_process import FrameRing\n"
+            f"ring = FrameRing.attach({writer.name!r})\n"
+            "frame, _, sequence = ring.latest()\n"
+            "print(int(frame[0, 0, 0]), sequence)\n"
+            "del frame\n"
+            "ring.close()\n"
+        )
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        assert result.stdout.split() == ["7", "0"]
+        reader = FrameRing.attach(writer.name)
+        reader.close()
+    finally:
+        writer.close(unlink=True)
+
+
+def test__frame_ring_is_intact() -> None:
+    """
+    `FrameRing`のテスト.
+
+    スロットが一周して上書きされると `is_intact` が偽になることを確認する.
+    """
+    ring = FrameRing.create(num_slots=2, shape=SHAPE)
+    try:
+        first = ring.put(np.zeros(SHAPE, dtype=np.uint8), timestamp=0.0)
+        assert ring.is_intact(first)
+        ring.put(np.ones(SHAPE, dtype=np.uint8), timestamp=0.1)
+        assert ring.is_intact(first)
+        ring.begin()
+        assert not ring.is_intact(first)
+        ring.commit(timestamp=0.2)
+        assert not ring.is_intact(first)
+    finally:
+        ring.close(unlink=True)
+
+
+def test__frame_ring_abort() -> None:
+    """
+    `FrameRing`のテスト.
+
+    `abort` で書き込みを取り消すと, スロットが元の状態に戻ることを確認する.
+    """
+    ring = FrameRing.create(num_slots=2, shape=SHAPE)
+    try:
+        first = ring.put(np.zeros(SHAPE, dtype=np.uint8), timestamp=0.0)
+        ring.put(np.ones(SHAPE, dtype=np.uint8), timestamp=0.1)
+        ring.begin()
+        assert not ring.is_intact(first)
+        ring.abort()
+        assert ring.is_intact(first)
+        third = ring.put(np.full(SHAPE, 2, dtype=np.uint8), timestamp=0.2)
+        assert not ring.is_intact(first)
+        _, _, sequence = ring.latest()
+        assert sequence == third
+        assert ring.is_intact(third)
+    finally:
+        ring.close(unlink=True)
+
+
+def test__camera_process_retry() -> None:
+    """
+    `CameraProcess`のテスト.
+
+    画像の取得に1度失敗しても, ワーカーが失敗を数えて取得を続けることを
+    確認する.
+    """
+    camera = CameraProcess(0, SHAPE[1], SHAPE[0], source=FlakyCamera)
+    try:
+        num_frames = 5
+        deadline = time.monotonic() + 5.0
+        while camera.get_stamped_frame()[2] < num_frames:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+        assert camera.capture_error_count == 1
+        assert camera.process.is_alive()
+    finally:
+        camera.close()
@@ -0,0 +1,113 @@
+"""`clock.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from robopy.clock import TICK_PERIOD, TickClock, TimestampIndex, unwrap_ticks
+from robopy.control_table import ControlTable
+
+if TYPE_CHECKING:
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort
+
+
+def test__unwrap_ticks() -> None:
+    """
+    `unwrap_ticks`のテスト.
+
+    カウンタが一周しても単調増加の値に戻ることを確認する.
+    """
+    ticks = [[32766, 10], [32767, 20], [0, 30], [5, 32767], [100, 3]]
+    expected = [[32766, 10], [32767, 20], [32768, 30], [32773, 32767]]
+    expected.append([32868, 32768 + 3])
+    np.testing.assert_array_equal(unwrap_ticks(ticks), expected)
+
+
+def test__tick_clock() -> None:
+    """
+    `TickClock`のテスト.
+
+    通信の遅れを含む時刻から, サーボごとのオフセットとドリフトを推定し,
+    実際の取得時刻を遅れの揺らぎより精度良く求められることを確認する.
+    """
+    rng = np.random.default_rng(0)
+    offset = np.array([100.0, 200.0])
+    drift = np.array([50e-6, -30e-6])
+    clock = TickClock(num_servos=2)
+
+    tick_start = np.array([32000, 1000])
+    for step in range(3000):
+        true_ticks = tick_start + 20 * step
+        acquired = offset + (1 + drift) * true_ticks * 1e-3
+        sent = acquired - rng.uniform(0.0005, 0.002, size=2)
+        received = acquired + rng.uniform(0.0005, 0.003, size=2)
+        estimated = clock.update(true_ticks % TICK_PERIOD, received, sent)
+
+    np.testing.assert_allclose(clock.drift, drift, atol=5e-6)
+    np.testing.assert_allclose(estimated, acquired, atol=2e-4)
+
+
+def test__tick_clock_received_only() -> None:
+    """
+    `TickClock`のテスト.
+
+    受信時刻だけの場合は, 最小の遅れの分だけ遅れた時刻になることを確認する.
+    """
+    clock = TickClock(num_servos=1)
+    for step in range(100):
+        tick = 10 * step
+        estimated = clock.update([tick], 5.0 + tick * 1e-3 + 0.001 * (step % 3))
+    np.testing.assert_allclose(clock.drift, 0, atol=1e-4)
+    np.testing.assert_allclose(estimated, 5.0 + tick * 1e-3, atol=1e-4)
+
+
+def test__timestamp_index() -> None:
+    """
+    `TimestampIndex`のテスト.
+
+    整列されていない時刻列でも, 最近傍と線形補間が総当たりと一致することを
+    確認する.
+    """
+    rng = np.random.default_rng(0)
+    timestamps = rng.uniform(0, 10, size=100)
+    values = np.stack([timestamps * 2, timestamps * 3], axis=1)
+    index = TimestampIndex(timestamps)
+    queries = np.array([-1.0, 0.5, 3.3, 7.7, 11.0])
+
+    nearest = index.nearest(queries)
+    expected = np.abs(timestamps[None, :] - queries[:, None]).argmin(axis=1)
+    np.testing.assert_array_equal(nearest, expected)
+
+    interpolated = index.interpolate(queries, values)
+    clipped = queries.clip(timestamps.min(), timestamps.max())
+    np.testing.assert_allclose(interpolated[:, 0], clipped * 2)
+    np.testing.assert_allclose(interpolated[:, 1], clipped * 3)
+
+
+def test__tick_clock_read(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+) -> None:
+    """
+    `TickClock`のテスト.
+
+    値と `REALTIME_TICK` をサーボごとに1回の READ 命令で読み取り,
+    取得時刻をホストの時刻で推定できることを確認する.
+    """
+    for servo in sim_port.servos.values():
+        servo.set(ControlTable.PRESENT_CURRENT, -servo.servo_id)
+    clock = TickClock(num_servos=len(sim_robot.servos))
+    for _ in range(5):
+        num_packets = sim_port.num_packets
+        start = time.monotonic()
+        values, timestamps = clock.read(sim_robot, ControlTable.PRESENT_CURRENT)
+        end = time.monotonic()
+        assert sim_port.num_packets - num_packets == len(sim_robot.servos)
+    assert values == [-i for i in sim_port.servos]
+    # シミュレーションの `REALTIME_TICK` は 1 ms 単位のホストの時刻
+    assert (timestamps > start - 2e-3).all()
+    assert (timestamps < end + 2e-3).all()
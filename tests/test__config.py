@@ -0,0 +1,162 @@
+"""`config.py`のユニットテスト."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from robopy import ControlTable, OperatingMode
+from robopy.config import ConfigProfile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort
+
+MODE = ControlTable.OPERATING_MODE
+HOMING = ControlTable.HOMING_OFFSET
+P_GAIN = ControlTable.POSITION_P_GAIN
+ACCELERATION = ControlTable.PROFILE_ACCELERATION
+VELOCITY = ControlTable.PROFILE_VELOCITY
+TORQUE = ControlTable.TORQUE_ENABLE
+EXTENDED = OperatingMode.EXTENDED_POSITION_CONTROL_MODE.value
+
+
+@pytest.fixture
+def profile() -> ConfigProfile:
+    """
+    テストで使う設定.
+
+    Returns
+    -------
+    ConfigProfile
+        `R/W(NVM)` とアドレスの連続した項目を含む設定.
+    """
+    return ConfigProfile({
+        VELOCITY: 100,
+        ACCELERATION: 20,
+        MODE: EXTENDED,
+        HOMING: -1024,
+        P_GAIN: [800, 800, 800, 640, 640],
+    })
+
+
+def test__config_profile_apply(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+    profile: ConfigProfile,
+) -> None:
+    """
+    `ConfigProfile.apply`のテスト.
+
+    値の異なる項目だけを書き込み, `R/W(NVM)` の項目を書き換える間だけ
+    トルクを切ることを確認する.
+    """
+    servos = list(sim_port.servos.values())
+    for servo in servos:
+        servo.set(TORQUE, 1)
+        servo.set(P_GAIN, 800)
+        servo.set(VELOCITY, 100)
+        servo.set(ACCELERATION, 20)
+    servos[1].set(MODE, EXTENDED)
+    servos[1].set(HOMING, -1024)
+
+    num_packets = sim_port.num_packets
+    changes = sim_robot.apply_profile(profile)
+    assert changes == {
+        MODE: [11, 13, 14, 15],
+        HOMING: [11, 13, 14, 15],
+        P_GAIN: [14, 15],
+    }
+    # 読み取り, トルクを切る, 3項目の書き込み, トルクを戻す, 確認の読み取り
+    assert sim_port.num_packets - num_packets == 7  # noqa: PLR2004
+    for servo in servos:
+        assert servo.get(MODE) == EXTENDED
+        assert servo.get(HOMING) == -1024  # noqa: PLR2004
+        assert servo.get(TORQUE) == 1
+    assert [servo.get(P_GAIN) for servo in servos] == [800, 800, 800, 640, 640]
+
+    num_packets = sim_port.num_packets
+    assert not sim_robot.apply_profile(profile)
+    assert sim_port.num_packets - num_packets == 2  # noqa: PLR2004
+
+
+def test__config_profile_torque(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+) -> None:
+    """
+    `ConfigProfile.apply`のテスト.
+
+    `TORQUE_ENABLE` を設定する場合は, 他の項目を書き込んだ後でその値にする.
+    """
+    profile = ConfigProfile({TORQUE: 1, MODE: EXTENDED})
+    expected = {MODE: [11, 12, 13, 14, 15], TORQUE: [11, 12, 13, 14, 15]}
+    assert profile.diff(sim_robot) == expected
+    assert profile.apply(sim_robot) == expected
+    for servo in sim_port.servos.values():
+        assert servo.get(MODE) == EXTENDED
+        assert servo.get(TORQUE) == 1
+
+
+def test__config_profile_verify(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+    profile: ConfigProfile,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    `ConfigProfile.apply`のテスト.
+
+    書き込んだ値が反映されないサーボがある場合に `RuntimeError` になる.
+    """
+    monkeypatch.setattr(sim_port.servos[13], "write", lambda *_: False)
+    with pytest.raises(RuntimeError, match="POSITION_P_GAIN"):
+        profile.apply(sim_robot)
+    assert profile.diff(sim_robot) == {
+        MODE: [13],
+        HOMING: [13],
+        P_GAIN: [13],
+        ACCELERATION: [13],
+        VELOCITY: [13],
+    }
+
+
+def test__config_profile_file(
+    sim_robot: RobotDriver,
+    profile: ConfigProfile,
+    tmp_path: Path,
+) -> None:
+    """
+    `ConfigProfile.save`・`ConfigProfile.load`のテスト.
+
+    保存した設定を読み込むと同じ設定になり, 不正な設定は `ValueError` になる.
+    """
+    path = tmp_path / "robot.json"
+    profile.save(path)
+    loaded = ConfigProfile.load(path)
+    assert loaded.settings == profile.settings
+    assert list(loaded.settings) == [
+        MODE,
+        HOMING,
+        P_GAIN,
+        ACCELERATION,
+        VELOCITY,
+    ]
+
+    # numpy の値も保存でき, `int` として読み込まれる
+    numpy_profile = ConfigProfile(
+        {MODE: np.int64(3), P_GAIN: np.array([800] * 5, dtype=np.uint16)},
+    )
+    numpy_profile.save(path)
+    loaded = ConfigProfile.load(path)
+    assert loaded.settings == {MODE: 3, P_GAIN: [800] * 5}
+    assert type(loaded.settings[MODE]) is int
+
+    with pytest.raises(ValueError, match="PRESENT_POSITION"):
+        ConfigProfile({ControlTable.PRESENT_POSITION: 0})
+    with pytest.raises(ValueError, match="POSITION_P_GAIN"):
+        ConfigProfile({P_GAIN: [800, 800]}).apply(sim_robot)
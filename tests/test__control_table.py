@@ -2,7 +2,12 @@
 
 import pytest
 
-from robopy.control_table import ControlTable, Dtype, cast_value
+from robopy.control_table import (
+    ControlTable,
+    Dtype,
+    cast_value,
+    supports_fast_sync_read,
+)
 
 
 def test__control_table() -> None:
@@ -46,3 +51,25 @@ def test__cast_value(value: int, dtype: Dtype, expected: int) -> None:
     指定されたデータ型に従って値が正規化されているかを確認する.
     """
     assert cast_value(value, dtype) == expected
+
+
+@pytest.mark.parametrize(
+    ("model_number", "firmware", "expected"),
+    [
+        (1020, 45, True),  # XM430-W350
+        (1020, 44, False),
+        (1200, 52, True),  # XL330-M288
+        (350, 52, False),  # XL-320
+    ],
+)
+def test__supports_fast_sync_read(
+    model_number: int,
+    firmware: int,
+    expected: bool,  # noqa: FBT001
+) -> None:
+    """
+    `supports_fast_sync_read`のテスト.
+
+    モデルとファームウェアのバージョンから判定できることを確認する.
+    """
+    assert supports_fast_sync_read(model_number, firmware) == expected
@@ -0,0 +1,127 @@
+"""`encoder.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from robopy.encoder import FrameEncoder
+
+
+def test__frame_encoder_order() -> None:
+    """
+    `FrameEncoder`のテスト.
+
+    複数スレッドでエンコードしても `submit` の順番と時刻が保たれることを
+    確認する.
+    """
+    encoder = FrameEncoder(codec=".png", max_workers=4)
+    frames = [np.full((24, 32, 3), i, dtype=np.uint8) for i in range(20)]
+    for i, frame in enumerate(frames):
+        assert encoder.submit(frame, timestamp=0.1 * i)
+    encoder.close()
+
+    encoded = list(encoder)
+    assert [e.index for e in encoded] == list(range(20))
+    assert [e.timestamp for e in encoded] == [0.1 * i for i in range(20)]
+    for e, frame in zip(encoded, frames):
+        buffer = np.frombuffer(e.data, np.uint8)
+        decoded = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        assert decoded is not None
+        np.testing.assert_array_equal(decoded, frame)
+        assert e.latency >= e.encode_time > 0
+    assert encoder.queue_depth == 0
+    assert encoder.max_queue_depth > 0
+    assert encoder.mean_encode_time > 0
+
+
+def test__frame_encoder_drop() -> None:
+    """
+    `FrameEncoder`のテスト.
+
+    キューが一杯の場合は待たずに画像を捨てることを確認する.
+    """
+    encoder = FrameEncoder(max_queue=2)
+    frame = np.zeros((24, 32, 3), dtype=np.uint8)
+    assert encoder.submit(frame)
+    assert encoder.submit(frame)
+    assert not encoder.submit(frame)
+    assert encoder.dropped_frames == 1
+    assert encoder.queue_depth == 2  # noqa: PLR2004
+
+    assert encoder.get().index == 0
+    assert encoder.submit(frame)
+    encoder.close()
+    assert [e.index for e in encoder] == [1, 2]
+    with pytest.raises(queue.Empty):
+        encoder.get(timeout=0)
+
+
+def test__frame_encoder_block() -> None:
+    """
+    `FrameEncoder`のテスト.
+
+    `block=True` の場合はキューに空きが出るまで `submit` が待つことを確認する.
+    """
+    encoder = FrameEncoder(max_queue=1, block=True)
+    frame = np.zeros((24, 32, 3), dtype=np.uint8)
+    assert encoder.submit(frame)
+    producer = threading.Thread(target=encoder.submit, args=(frame,))
+    producer.start()
+    producer.join(timeout=0.1)
+    assert producer.is_alive()
+
+    encoder.get()
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert encoder.get().index == 1
+    assert encoder.dropped_frames == 0
+    encoder.close()
+
+
+def test__frame_encoder_close_while_blocked() -> None:
+    """
+    `FrameEncoder`のテスト.
+
+    `block=True` の `submit` が空きを待っている間に `close` すると,
+    `submit` が `RuntimeError` で戻ることを確認する.
+    """
+    encoder = FrameEncoder(max_queue=1, block=True)
+    frame = np.zeros((24, 32, 3), dtype=np.uint8)
+    assert encoder.submit(frame)
+    errors: list[Exception] = []
+
+    def submit() -> None:
+        try:
+            encoder.submit(frame)
+        except RuntimeError as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=submit)
+    producer.start()
+    producer.join(timeout=0.1)
+    assert producer.is_alive()
+
+    encoder.close()
+    producer.join(timeout=1)
+    assert not producer.is_alive()
+    assert len(errors) == 1
+    assert "closed" in str(errors[0])
+    assert encoder.get().index == 0
+    with pytest.raises(queue.Empty):
+        encoder.get(timeout=0)
+
+
+def test__frame_encoder_quality() -> None:
+    """
+    `FrameEncoder`のテスト.
+
+    `quality` に対応していない `codec` の場合は `ValueError` となることを
+    確認する.
+    """
+    with pytest.raises(ValueError, match="quality"):
+        FrameEncoder(codec=".bmp", quality=90)
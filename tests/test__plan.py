@@ -0,0 +1,87 @@
+"""`plan.py`のユニットテスト."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from robopy import ControlTable, DynamixelCommError
+from robopy.plan import ReadPlan, WritePlan
+
+if TYPE_CHECKING:
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort
+
+POSITION = ControlTable.PRESENT_POSITION
+VELOCITY = ControlTable.PRESENT_VELOCITY
+GOAL = ControlTable.GOAL_POSITION
+
+
+def test__read_plan(sim_port: SimulatedPort, sim_robot: RobotDriver) -> None:
+    """
+    `ReadPlan`のテスト.
+
+    複数の項目を1回の READ 命令で読み取り, 符号付きで返すことを確認する.
+    """
+    for i, servo in enumerate(sim_port.servos.values()):
+        servo.set(VELOCITY, -10 * i)
+        servo.set(POSITION, 1000 + i)
+
+    plan = ReadPlan(sim_robot, [VELOCITY, POSITION])
+    num_packets = sim_port.num_packets
+    values = plan.execute()
+    assert sim_port.num_packets - num_packets == len(sim_robot.servos)
+    np.testing.assert_array_equal(values[0], [0, -10, -20, -30, -40])
+    np.testing.assert_array_equal(values[1], [1000, 1001, 1002, 1003, 1004])
+    assert plan.execute() is values
+
+    single = ReadPlan(sim_robot, POSITION, servo_ids=[12, 14])
+    np.testing.assert_array_equal(single.execute(), [1001, 1003])
+
+
+def test__write_plan(sim_port: SimulatedPort, sim_robot: RobotDriver) -> None:
+    """
+    `WritePlan`のテスト.
+
+    バイトスタッフィングが必要な値も含めて, `RobotDriver.write` と同じ値が
+    書き込まれることを確認する.
+    """
+    plan = WritePlan(sim_robot, GOAL)
+    values = [-3, 0x00FDFFFF, 2048, 0, -2048]
+    plan.execute(values)
+    assert sim_robot.read(GOAL) == values
+    assert [s.get(GOAL) for s in sim_port.servos.values()] == values
+
+
+def test__write_plan_contiguous(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+) -> None:
+    """
+    `WritePlan`のテスト.
+
+    連続した項目は1回の WRITE 命令で書き込み, 間に隙間のある項目は
+    `ValueError` となることを確認する.
+    """
+    items = [ControlTable.PROFILE_ACCELERATION, ControlTable.PROFILE_VELOCITY]
+    plan = WritePlan(sim_robot, items)
+    num_packets = sim_port.num_packets
+    plan.execute([[10] * 5, [20] * 5])
+    assert sim_port.num_packets - num_packets == len(sim_robot.servos)
+    assert sim_robot.read(ControlTable.PROFILE_VELOCITY) == [20] * 5
+
+    with pytest.raises(ValueError, match="GOAL_VELOCITYとGOAL_POSITION"):
+        WritePlan(sim_robot, [GOAL, ControlTable.GOAL_VELOCITY])
+
+
+def test__plan_comm_error(sim_robot: RobotDriver) -> None:
+    """
+    `ReadPlan`のテスト.
+
+    応答の無いサーボを含む場合に `DynamixelCommError` となることを確認する.
+    """
+    plan = ReadPlan(sim_robot, POSITION, servo_ids=[11, 99])
+    with pytest.raises(DynamixelCommError, match="servo_id=99"):
+        plan.execute()
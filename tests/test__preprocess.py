@@ -0,0 +1,126 @@
+"""`preprocess.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from robopy.preprocess import BatchPreprocessor, FramePreprocessor
+
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+
+
+@pytest.fixture
+def frame() -> npt.NDArray[np.uint8]:
+    """
+    テスト用の BGR 画像.
+
+    Returns
+    -------
+    npt.NDArray[np.uint8]
+        `(48, 64, 3)` のランダムな画像.
+    """
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+
+
+def test__frame_preprocessor(frame: npt.NDArray[np.uint8]) -> None:
+    """
+    `FramePreprocessor`のテスト.
+
+    素朴に1ステップずつ計算した結果と一致することを確認する.
+    """
+    preprocess = FramePreprocessor(
+        size=(16, 12),
+        crop=(8, 4, 40, 30),
+        mean=MEAN,
+        std=STD,
+    )
+    cropped = frame[4:34, 8:48]
+    resized = cv2.resize(cropped, (16, 12), interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    expected = (rgb.astype(np.float32) / 255 - MEAN) / STD
+
+    actual = preprocess(frame)
+    assert actual.shape == (3, 12, 16)
+    assert actual.dtype == np.float32
+    np.testing.assert_allclose(actual, expected.transpose(2, 0, 1), atol=1e-5)
+
+
+def test__frame_preprocessor_buffers(frame: npt.NDArray[np.uint8]) -> None:
+    """
+    `FramePreprocessor`のテスト.
+
+    2回目以降は同じバッファ(もしくは `out`)に書き込むことを確認する.
+    """
+    preprocess = FramePreprocessor(size=(16, 12))
+    first = preprocess(frame)
+    assert preprocess(frame) is first
+
+    out = np.empty((3, 12, 16), dtype=np.float32)
+    assert preprocess(frame, out=out) is out
+    np.testing.assert_array_equal(out, first)
+
+
+def test__frame_preprocessor_grayscale(frame: npt.NDArray[np.uint8]) -> None:
+    """
+    `FramePreprocessor`のテスト.
+
+    チャネルの次元が無い画像も `(1, H, W)` になることを確認する.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    preprocess = FramePreprocessor(size=(16, 12))
+    assert preprocess(gray).shape == (1, 12, 16)
+
+
+class _Source:
+    """`get_frame` で決まった画像を返すカメラの代わり."""
+
+    def __init__(self, frame: npt.NDArray[np.uint8]) -> None:
+        self.frame = frame
+
+    def get_frame(self) -> npt.NDArray[np.uint8]:
+        """
+        画像を返す.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8]
+            コンストラクタで渡した画像.
+        """
+        return self.frame
+
+
+def test__batch_preprocessor(frame: npt.NDArray[np.uint8]) -> None:
+    """
+    `BatchPreprocessor`のテスト.
+
+    各カメラの前処理結果が `(N, C, H, W)` にまとめられることを確認する.
+    """
+    preprocess = FramePreprocessor(size=(16, 12))
+    frames = [frame, frame[::-1]]
+    batch = BatchPreprocessor([_Source(f) for f in frames], preprocess)
+    actual = batch.get_batch()
+    assert actual.shape == (2, 3, 12, 16)
+    np.testing.assert_array_equal(actual[0], preprocess(frames[0]))
+    np.testing.assert_array_equal(actual[1], preprocess(frames[1]))
+    assert batch.get_batch() is actual
+
+
+def test__batch_preprocessor_shape_mismatch(
+    frame: npt.NDArray[np.uint8],
+) -> None:
+    """
+    `BatchPreprocessor`のテスト.
+
+    前処理後の形状が揃わない場合に `ValueError` となることを確認する.
+    """
+    batch = BatchPreprocessor(
+        [_Source(frame), _Source(frame)],
+        [FramePreprocessor(size=(16, 12)), FramePreprocessor(size=(8, 6))],
+    )
+    with pytest.raises(ValueError, match="形状"):
+        batch.get_batch()
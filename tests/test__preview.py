@@ -0,0 +1,225 @@
+"""`preview.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import socket
+import time
+from typing import TYPE_CHECKING, Iterator
+
+import cv2
+import numpy as np
+import pytest
+
+from robopy.preview import PreviewServer
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+
+class FailingSource:
+    """最初の `get_frame` だけ失敗する画像の取得元."""
+
+    def __init__(self) -> None:
+        self.num_calls = 0
+
+    def get_frame(self) -> npt.NDArray[np.uint8]:
+        """
+        2回目以降は黒い画像を返す.
+
+        Returns
+        -------
+        npt.NDArray[np.uint8]
+            `(48, 64, 3)` の画像.
+
+        Raises
+        ------
+        RuntimeError
+            最初の呼び出しの場合.
+        """
+        self.num_calls += 1
+        if self.num_calls == 1:
+            msg = "camera unplugged"
+            raise RuntimeError(msg)
+        return np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def server() -> Iterator[PreviewServer]:
+    """
+    `localhost`の空いているポートで`PreviewServer`を起動する.
+
+    Yields
+    ------
+    PreviewServer
+        起動済みのサーバ. テスト後に停止する.
+    """
+    preview = PreviewServer(port=0, fps=100, width=32)
+    preview.start()
+    yield preview
+    preview.stop()
+
+
+def request(port: int, path: str) -> socket.socket:
+    """
+    `PreviewServer`に接続してGETリクエストを送る.
+
+    Parameters
+    ----------
+    port : int
+        サーバのポート番号.
+    path : str
+        リクエストするパス.
+
+    Returns
+    -------
+    socket.socket
+        接続済みのソケット.
+    """
+    client = socket.create_connection(("localhost", port), timeout=5)
+    client.sendall(f"GET {path} HTTP/1.0\r\n\r\n".encode())
+    return client
+
+
+def read_until(client: socket.socket, buffer: bytes, end: bytes) -> bytes:
+    """
+    `end`が現れるまで受信する.
+
+    Parameters
+    ----------
+    client : socket.socket
+        接続済みのソケット.
+    buffer : bytes
+        受信済みのバイト列.
+    end : bytes
+        待つバイト列.
+
+    Returns
+    -------
+    bytes
+        `end`を含む受信済みのバイト列.
+    """
+    while end not in buffer:
+        buffer += client.recv(4096)
+    return buffer
+
+
+def receive_jpeg(client: socket.socket) -> bytes:
+    """
+    HTTPヘッダと最初の1枚分のパートを受信してJPEGを返す.
+
+    Parameters
+    ----------
+    client : socket.socket
+        接続済みのソケット.
+
+    Returns
+    -------
+    bytes
+        JPEGのバイト列.
+    """
+    buffer = read_until(client, b"", b"\r\n\r\n")
+    header, buffer = buffer.split(b"\r\n\r\n", 1)
+    assert b"multipart/x-mixed-replace" in header
+    buffer = read_until(client, buffer, b"\r\n\r\n")
+    part_header, buffer = buffer.split(b"\r\n\r\n", 1)
+    length = int(part_header.split(b"Content-Length: ")[1])
+    while len(buffer) < length:
+        buffer += client.recv(4096)
+    return buffer[:length]
+
+
+def test__preview_server_broadcast(server: PreviewServer) -> None:
+    """
+    `PreviewServer`のテスト.
+
+    1枚の画像を1回だけエンコードし, 縮小した同じJPEGを
+    全てのクライアントへ送ることを確認する.
+    """
+    server.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+    clients = [request(server.port, "/") for _ in range(3)]
+    try:
+        jpegs = [receive_jpeg(client) for client in clients]
+        time.sleep(0.05)
+    finally:
+        for client in clients:
+            client.close()
+
+    assert server.encoded_frames == 1
+    assert jpegs[0] == jpegs[1] == jpegs[2]
+    image = cv2.imdecode(np.frombuffer(jpegs[0], np.uint8), cv2.IMREAD_COLOR)
+    assert image is not None
+    assert image.shape == (24, 32, 3)
+
+
+def test__preview_server_not_found(server: PreviewServer) -> None:
+    """
+    `PreviewServer`のテスト.
+
+    `/` 以外へのリクエストは404を返すことを確認する.
+    """
+    client = request(server.port, "/favicon.ico")
+    try:
+        response = read_until(client, b"", b"\r\n\r\n")
+    finally:
+        client.close()
+    assert response.startswith(b"HTTP/1.0 404")
+
+
+def test__preview_server_source_error() -> None:
+    """
+    `PreviewServer`のテスト.
+
+    取得元が例外を送出しても配信が止まらず, 失敗を数えることを確認する.
+    """
+    server = PreviewServer(FailingSource(), port=0, fps=100, width=32)
+    server.start()
+    client = request(server.port, "/")
+    try:
+        jpeg = receive_jpeg(client)
+    finally:
+        client.close()
+        server.stop()
+    assert server.failed_frames == 1
+    image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert image is not None
+    assert image.shape == (24, 32, 3)
+
+
+def test__preview_server_slow_client() -> None:
+    """
+    `PreviewServer`のテスト.
+
+    受信の遅いクライアントには途中の画像を溜めず,
+    最新の画像だけを送ることを確認する.
+    """
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(2, 480, 640, 3), dtype=np.uint8)
+    server = PreviewServer(port=0, fps=100, quality=100)
+    server.start()
+    client = socket.socket()
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    client.settimeout(0.5)
+    try:
+        client.connect(("localhost", server.port))
+        client.sendall(b"GET / HTTP/1.0\r\n\r\n")
+        # 受信せずに画像を更新し続ける
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            server.publish(frames[server.encoded_frames % 2])
+            time.sleep(0.005)
+        encoded_frames = server.encoded_frames
+        received = b""
+        while True:
+            try:
+                data = client.recv(1 << 16)
+            except socket.timeout:
+                break
+            if not data:
+                break
+            received += data
+    finally:
+        client.close()
+        server.stop()
+    num_parts = received.count(b"--frame\r\n")
+    assert num_parts >= 1
+    assert num_parts < encoded_frames
@@ -0,0 +1,212 @@
+"""`protocol.py`のユニットテスト."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import dynamixel_sdk
+import numpy as np
+import pytest
+
+from robopy import ControlTable, RobotDriver
+from robopy.protocol import (
+    FastPacketHandler,
+    add_stuffing,
+    crc16,
+    remove_stuffing,
+)
+from robopy.sim import SimulatedPort, SimulatedServo
+
+SERVO_IDS = [1, 2, 3]
+POSITION = ControlTable.PRESENT_POSITION
+GOAL = ControlTable.GOAL_POSITION
+STUFFED = 0x00FDFFFF
+"""リトルエンディアンで `FF FF FD` を含む値."""
+
+
+class RecordingPort(SimulatedPort):
+    """送信したバイト列を記録する `SimulatedPort`."""
+
+    def __init__(self, servos: Sequence[SimulatedServo]) -> None:
+        super().__init__(servos)
+        self.tx_log: list[bytes] = []
+
+    def writePort(self, packet: Sequence[int]) -> int:  # noqa: N802
+        """
+        送信したバイト列を記録してから応答する.
+
+        Parameters
+        ----------
+        packet : Sequence[int]
+            命令パケット.
+
+        Returns
+        -------
+        int
+            送信したバイト数.
+        """
+        self.tx_log.append(bytes(packet))
+        return super().writePort(packet)
+
+
+def _session(
+    packet_handler: dynamixel_sdk.Protocol2PacketHandler,
+) -> tuple[list[bytes], list[object]]:
+    """
+    同じ手順で読み書きし, 送信したバイト列と読み取った値を返す.
+
+    Parameters
+    ----------
+    packet_handler : dynamixel_sdk.Protocol2PacketHandler
+        使用するパケットハンドラ.
+
+    Returns
+    -------
+    tuple[list[bytes], list[object]]
+        送信したバイト列と読み取った値.
+    """
+    servos = [SimulatedServo(i) for i in SERVO_IDS]
+    # 応答のパラメータにスタッフィングが必要な値を含める
+    servos[1].set(POSITION, STUFFED)
+    port = RecordingPort(servos)
+    robot = RobotDriver(
+        "sim",
+        1_000_000,
+        SERVO_IDS,
+        port_handler=port,
+        packet_handler=packet_handler,
+    )
+    results: list[object] = [robot.read(POSITION)]
+    robot.write(GOAL, [100, -100, 2048])
+    results.append(robot.read(GOAL))
+
+    sync_read = dynamixel_sdk.GroupSyncRead(
+        port,
+        packet_handler,
+        POSITION.address,
+        POSITION.num_bytes,
+    )
+    for servo_id in SERVO_IDS:
+        sync_read.addParam(servo_id)
+    results.extend([
+        sync_read.txRxPacket(),
+        [
+            sync_read.getData(i, POSITION.address, POSITION.num_bytes)
+            for i in SERVO_IDS
+        ],
+    ])
+
+    bulk_read = dynamixel_sdk.GroupBulkRead(port, packet_handler)
+    bulk_read.addParam(1, POSITION.address, POSITION.num_bytes)
+    bulk_read.addParam(2, GOAL.address, GOAL.num_bytes)
+    results.extend([
+        bulk_read.txRxPacket(),
+        bulk_read.getData(2, GOAL.address, GOAL.num_bytes),
+    ])
+    return port.tx_log, results
+
+
+def test__crc16() -> None:
+    """
+    `crc16`のテスト.
+
+    SDK の `updateCRC` と同じ値になることを確認する.
+    """
+    rng = np.random.default_rng(0)
+    sdk = dynamixel_sdk.Protocol2PacketHandler()
+    for size in range(64):
+        data = rng.integers(0, 256, size=size, dtype=np.uint8).tobytes()
+        expected = sdk.updateCRC(0, list(data), size)
+        assert crc16(data) == expected
+        assert crc16(memoryview(bytearray(data))) == expected
+
+
+def test__stuffing() -> None:
+    """
+    `add_stuffing`・`remove_stuffing`のテスト.
+
+    SDK の `addStuffing` と同じバイト列になり, 元に戻せることを確認する.
+    """
+    sdk = dynamixel_sdk.Protocol2PacketHandler()
+    params = b"\x74\x00\xff\xff\xfd\x00\xff\xff\xfd"
+    packet = bytes([0xFF, 0xFF, 0xFD, 0x00, 1, len(params) + 3, 0, 0x03])
+    packet += params + b"\0\0"
+
+    stuffed = add_stuffing(packet)
+    assert list(stuffed) == sdk.addStuffing(list(packet))
+    assert len(stuffed) == len(packet) + 2
+    assert remove_stuffing(stuffed) == packet
+    plain = packet[:3] + packet[3:].replace(b"\xfd", b"\xfc")
+    assert add_stuffing(plain) is plain
+
+
+def test__fast_packet_handler_matches_sdk() -> None:
+    """
+    `FastPacketHandler`のテスト.
+
+    `SimulatedPort` 上で SDK と同じ手順を実行し, 送信するバイト列と
+    読み取った値が一致することを確認する.
+    """
+    sdk_tx, sdk_results = _session(dynamixel_sdk.Protocol2PacketHandler())
+    fast_tx, fast_results = _session(FastPacketHandler())
+    assert fast_tx == sdk_tx
+    assert fast_results == sdk_results
+    assert fast_results[0] == [0, STUFFED, 0]
+
+
+def test__fast_packet_handler_stuffed_write() -> None:
+    """
+    `FastPacketHandler`のテスト.
+
+    パラメータに `FF FF FD` を含む命令パケットをスタッフィングして送信し,
+    サーボに正しい値が書き込まれることを確認する.
+    """
+    servo = SimulatedServo(1)
+    port = RecordingPort([servo])
+    packet_handler = FastPacketHandler()
+    result, _ = packet_handler.write4ByteTxRx(
+        port,
+        1,
+        GOAL.address,
+        STUFFED,
+    )
+    assert result == dynamixel_sdk.COMM_SUCCESS
+    assert servo.get(GOAL) == STUFFED
+
+    sdk = dynamixel_sdk.Protocol2PacketHandler()
+    expected = sdk.addStuffing([
+        *[0xFF, 0xFF, 0xFD, 0x00, 1, 9, 0, 0x03],
+        *GOAL.address.to_bytes(2, "little"),
+        *[0xFF, 0xFF, 0xFD, 0x00, 0, 0],
+    ])
+    crc = sdk.updateCRC(0, expected, len(expected) - 2)
+    expected[-2:] = crc.to_bytes(2, "little")
+    assert port.tx_log == [bytes(expected)]
+
+
+@pytest.mark.parametrize("noise", [b"", b"\x00\xff\xff\xfd\x01\xff"])
+def test__fast_packet_handler_rx(noise: bytes) -> None:
+    """
+    `FastPacketHandler`のテスト.
+
+    1回の読み取りで受信した複数のパケットを前後のゴミを除いて順に取り出し,
+    途中で途切れたパケットは `COMM_RX_CORRUPT` になることを確認する.
+    """
+    port = SimulatedPort([SimulatedServo(i) for i in SERVO_IDS])
+    packet_handler = FastPacketHandler()
+    for servo_id in SERVO_IDS:
+        port._reply(servo_id, bytes([servo_id]))  # noqa: SLF001
+    port.rx_buffer[:0] = noise
+    for servo_id in SERVO_IDS:
+        rx_packet, result = packet_handler.rxPacket(port, fast_option=False)
+        assert result == dynamixel_sdk.COMM_SUCCESS
+        assert rx_packet[4] == servo_id
+        assert rx_packet[9] == servo_id
+    assert not port.rx_buffer
+
+    _, result = packet_handler.rxPacket(port, fast_option=False)
+    assert result == dynamixel_sdk.COMM_RX_TIMEOUT
+    port._reply(1, b"\x01\x02")  # noqa: SLF001
+    del port.rx_buffer[-3:]
+    _, result = packet_handler.rxPacket(port, fast_option=False)
+    assert result == dynamixel_sdk.COMM_RX_CORRUPT
@@ -0,0 +1,126 @@
+"""`recorder.py`のユニットテスト."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import dynamixel_sdk
+import numpy as np
+import pytest
+
+from robopy import ControlTable, DynamixelCommError
+from robopy.recorder import FlightRecorder, Transaction
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort
+
+POSITION = ControlTable.PRESENT_POSITION
+GOAL = ControlTable.GOAL_POSITION
+
+
+def test__flight_recorder(tmp_path: Path) -> None:
+    """
+    `FlightRecorder`のテスト.
+
+    容量を超えた場合は古い記録から上書きし, 保存時には古い順に並ぶことを
+    確認する.
+    """
+    recorder = FlightRecorder(num_servos=2, capacity=4, directory=tmp_path)
+    for step in range(6):
+        recorder.record(Transaction.READ, POSITION.address, [step, -step], step)
+
+    snapshot = recorder.snapshot()
+    np.testing.assert_array_equal(snapshot["timestamps"], [2, 3, 4, 5])
+    np.testing.assert_array_equal(snapshot["values"][:, 1], [-2, -3, -4, -5])
+    assert float(snapshot["latencies"].min()) >= 0
+
+    path = recorder.dump()
+    assert path.parent == tmp_path
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+    with np.load(path) as loaded:
+        for name, array in snapshot.items():
+            np.testing.assert_array_equal(loaded[name], array)
+
+
+def test__robot_flight_recorder(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+    tmp_path: Path,
+) -> None:
+    """
+    `RobotDriver`の`flight_recorder`のテスト.
+
+    読み書きを記録し, `DynamixelCommError` の発生時に失敗した読み取りまでを
+    保存することを確認する.
+    """
+    sim_robot.write(GOAL, [1, 2, 3, 4, 5])
+    sim_robot.read(GOAL)
+    sim_robot.write(GOAL, [6, 7])
+    assert not list(tmp_path.iterdir())
+
+    del sim_port.servos[14]
+    with pytest.raises(DynamixelCommError):
+        sim_robot.read(POSITION)
+
+    path = sim_robot.flight_recorder.last_path
+    assert path is not None
+    assert path.parent == tmp_path
+    with np.load(path) as loaded:
+        np.testing.assert_array_equal(
+            loaded["transactions"],
+            [
+                Transaction.WRITE,
+                Transaction.READ,
+                Transaction.WRITE,
+                Transaction.READ,
+            ],
+        )
+        np.testing.assert_array_equal(
+            loaded["addresses"],
+            [GOAL.address, GOAL.address, GOAL.address, POSITION.address],
+        )
+        values = loaded["values"]
+        np.testing.assert_array_equal(values[1], [1, 2, 3, 4, 5])
+        # 短い書き込みと失敗した読み取りの値の無いサーボは nan
+        np.testing.assert_array_equal(values[2], [6, 7, np.nan, np.nan, np.nan])
+        assert np.isnan(values[3]).all()
+        assert loaded["results"][1] == dynamixel_sdk.COMM_SUCCESS
+        assert loaded["results"][3] == dynamixel_sdk.COMM_RX_TIMEOUT
+
+
+def test__flight_recorder_dump_on_error(tmp_path: Path) -> None:
+    """
+    `FlightRecorder`のテスト.
+
+    `dump_on_error` は既定で保存し, `auto_dump=False` では保存しないこと,
+    保存の間隔とファイルの数を制限することを確認する.
+    """
+    disabled = FlightRecorder(num_servos=2, directory=tmp_path, auto_dump=False)
+    disabled.record(Transaction.READ, POSITION.address, [], 0.0)
+    assert disabled.dump_on_error() is None
+    assert not list(tmp_path.iterdir())
+
+    limited = FlightRecorder(num_servos=2, directory=tmp_path)
+    limited.record(Transaction.READ, POSITION.address, [], 0.0)
+    assert limited.dump_on_error() is not None
+    limited.record(Transaction.READ, POSITION.address, [], 0.0)
+    assert limited.dump_on_error() is None
+    assert limited.skipped_dumps == 1
+    assert len(list(tmp_path.iterdir())) == 1
+
+    rotated = FlightRecorder(
+        num_servos=2,
+        directory=tmp_path / "rotated",
+        min_dump_interval=0.0,
+        max_files=2,
+    )
+    paths = []
+    for step in range(4):
+        rotated.record(Transaction.READ, POSITION.address, [step], 0.0)
+        path = rotated.dump_on_error()
+        assert path is not None
+        paths.append(path)
+    assert sorted((tmp_path / "rotated").iterdir()) == sorted(paths[2:])
@@ -0,0 +1,103 @@
+"""`robot.py`のユニットテスト."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from robopy import ControlTable, DynamixelCommError
+
+if TYPE_CHECKING:
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort
+
+POSITION = ControlTable.PRESENT_POSITION
+CURRENT = ControlTable.PRESENT_CURRENT
+
+
+def test__bulk_read(sim_port: SimulatedPort, sim_robot: RobotDriver) -> None:
+    """
+    `RobotDriver.bulk_read`のテスト.
+
+    サーボごとに異なる項目を1回の命令で読み取り,
+    それぞれの `dtype` で符号を付けることを確認する.
+    """
+    for servo in sim_port.servos.values():
+        servo.set(POSITION, 1000 + servo.servo_id)
+    sim_port.servos[15].set(CURRENT, -120)
+
+    num_packets = sim_port.num_packets
+    values = sim_robot.bulk_read({11: POSITION, 12: POSITION, 15: CURRENT})
+    assert sim_port.num_packets - num_packets == 1
+    assert values == {11: 1011, 12: 1012, 15: -120}
+
+
+def test__bulk_read_comm_error(sim_robot: RobotDriver) -> None:
+    """
+    `RobotDriver.bulk_read`のテスト.
+
+    応答しないサーボを含む場合は `DynamixelCommError` となることを確認する.
+    """
+    with pytest.raises(DynamixelCommError):
+        sim_robot.bulk_read({11: POSITION, 99: POSITION})
+
+
+def test__bulk_write(sim_port: SimulatedPort, sim_robot: RobotDriver) -> None:
+    """
+    `RobotDriver.bulk_write`のテスト.
+
+    サーボごとに異なる項目に, 負の値も含めて1回の命令で書き込めることを
+    確認する.
+    """
+    goal_position = ControlTable.GOAL_POSITION
+    goal_current = ControlTable.GOAL_CURRENT
+    items = {11: goal_position, 12: goal_position, 15: goal_current}
+
+    num_packets = sim_port.num_packets
+    sim_robot.bulk_write(items, {11: 2048, 12: -5, 15: -200})
+    assert sim_port.num_packets - num_packets == 1
+    assert sim_port.servos[11].get(goal_position) == 2048  # noqa: PLR2004
+    assert sim_port.servos[12].get(goal_position) == -5  # noqa: PLR2004
+    assert sim_port.servos[15].get(goal_current) == -200  # noqa: PLR2004
+    assert sim_robot.bulk_read(items) == {11: 2048, 12: -5, 15: -200}
+
+
+def test__read_fast_sync_read(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+) -> None:
+    """
+    `RobotDriver.read`のテスト.
+
+    Fast Sync Read に対応するサーボは1つの応答にまとめて読み取り,
+    非対応のサーボは通常の Sync Read で読み取ることを確認する.
+    """
+    sim_port.servos[13].set(ControlTable.VERSION_OF_FIRMWARE, 44)
+    for servo in sim_port.servos.values():
+        servo.set(POSITION, -servo.servo_id)
+    expected = [-11, -12, -13, -14, -15]
+    assert sim_robot.read(POSITION, fast_sync_read=True) == expected
+    assert sim_robot.fast_sync_read_support == [True, True, False, True, True]
+
+    rx_bytes = sim_port.rx_bytes
+    num_packets = sim_port.num_packets
+    assert sim_robot.read(POSITION, fast_sync_read=True) == expected
+    assert sim_port.num_packets - num_packets == 2  # noqa: PLR2004
+    # 4台分をまとめた応答(8 + 4 * 8 バイト)と, 1台分の応答(15 バイト)
+    assert sim_port.rx_bytes - rx_bytes == 8 + 4 * 8 + 15
+
+
+def test__read_fast_sync_read_comm_error(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+) -> None:
+    """
+    `RobotDriver.read`のテスト.
+
+    応答の無いサーボがある場合は `DynamixelCommError` となることを確認する.
+    """
+    sim_robot.read(POSITION, fast_sync_read=True)
+    del sim_port.servos[12]
+    with pytest.raises(DynamixelCommError, match="Fast Sync Read"):
+        sim_robot.read(POSITION, fast_sync_read=True)
@@ -0,0 +1,160 @@
+"""`robot_process.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import pickle  # noqa: S403
+import time
+from typing import Sequence
+
+import pytest
+from dynamixel_sdk.robotis_def import COMM_RX_TIMEOUT
+
+from robopy.control_table import ControlTable
+from robopy.dynamixel import DynamixelCommError
+from robopy.robot_process import RobotProcess
+from robopy.sim import SimulatedPort, SimulatedServo
+
+from .conftest import SERVO_IDS
+
+POSITIONS = [100, 200, 300, 400, 500]
+
+
+class UnpluggedPort(SimulatedPort):
+    """`LED` を点けたサーボがあると, 全サーボが応答しなくなるバス."""
+
+    def writePort(self, packet: Sequence[int]) -> int:  # noqa: N802
+        """
+        `LED` が点いていれば応答せずに捨てる.
+
+        Parameters
+        ----------
+        packet : Sequence[int]
+            命令パケット.
+
+        Returns
+        -------
+        int
+            送信したバイト数.
+        """
+        led = ControlTable.LED
+        if any(servo.get(led) for servo in self.servos.values()):
+            return len(packet)
+        return int(super().writePort(packet))
+
+
+def _servos() -> list[SimulatedServo]:
+    servos = [SimulatedServo(i) for i in SERVO_IDS]
+    for servo, position in zip(servos, POSITIONS):
+        servo.set(ControlTable.PRESENT_POSITION, position)
+    return servos
+
+
+def test__robot_process_start_stop() -> None:
+    """
+    `RobotProcess`のテスト.
+
+    ワーカーが起動して状態を共有メモリに公開し, `close` で終了することを
+    確認する.
+    """
+    process = RobotProcess(
+        "sim",
+        1_000_000,
+        list(SERVO_IDS),
+        port_handler=SimulatedPort(_servos()),
+    )
+    try:
+        assert process.process.is_alive()
+        assert process.model_numbers == [1020] * len(SERVO_IDS)
+        assert process.read(ControlTable.PRESENT_POSITION) == POSITIONS
+        _, timestamp, sequence = process.read_state(
+            ControlTable.PRESENT_POSITION,
+        )
+        assert sequence >= 1
+        assert timestamp <= time.monotonic()
+    finally:
+        process.close()
+    assert not process.process.is_alive()
+    assert process.process.exitcode == 0
+
+
+def test__robot_process_goal() -> None:
+    """
+    `RobotProcess`のテスト.
+
+    共有メモリに書いた目標値がワーカーの周期でサーボに書き込まれることを
+    確認する.
+    """
+    process = RobotProcess(
+        "sim",
+        1_000_000,
+        list(SERVO_IDS),
+        port_handler=SimulatedPort(_servos()),
+    )
+    try:
+        goal = [2048, 2049, 2050, 2051, 2052]
+        process.write(ControlTable.GOAL_POSITION, goal)
+        # GOAL_POSITION は state_items に無いのでワーカーに要求する
+        item = ControlTable.GOAL_POSITION
+        deadline = time.monotonic() + 5.0
+        while process.read(item) != goal and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert process.read(item) == goal
+        assert process.comm_error_count == 0
+    finally:
+        process.close()
+
+
+def test__robot_process_comm_error() -> None:
+    """
+    `RobotProcess`のテスト.
+
+    ワーカーで発生した `DynamixelCommError` が属性を保ったまま
+    メインプロセスで送出され, 周期処理のエラーは数えられることを確認する.
+    """
+    error = DynamixelCommError("message", COMM_RX_TIMEOUT, 0)
+    restored = pickle.loads(pickle.dumps(error))  # noqa: S301
+    assert restored.original_message == error.original_message
+    assert str(restored) == str(error)
+
+    process = RobotProcess(
+        "sim",
+        1_000_000,
+        list(SERVO_IDS),
+        port_handler=UnpluggedPort(_servos()),
+    )
+    try:
+        with pytest.raises(DynamixelCommError) as exc_info:
+            process.write(ControlTable.LED, [1] * len(SERVO_IDS))
+        assert exc_info.value.dxl_comm_result_code == COMM_RX_TIMEOUT
+        assert process.process.is_alive()
+        deadline = time.monotonic() + 5.0
+        while process.comm_error_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert process.comm_error_count > 0
+    finally:
+        process.close()
+
+
+def test__robot_process_worker_error() -> None:
+    """
+    `RobotProcess`のテスト.
+
+    通信エラー以外の例外もメインプロセスで送出され, ワーカーは動き続ける
+    ことを確認する. 共有メモリに書く目標値の長さが違う場合も同様.
+    """
+    process = RobotProcess(
+        "sim",
+        1_000_000,
+        list(SERVO_IDS),
+        port_handler=SimulatedPort(_servos()),
+    )
+    try:
+        with pytest.raises(TypeError):
+            process.write(ControlTable.LED, 1)  # type: ignore[arg-type]
+        with pytest.raises(ValueError, match="broadcast"):
+            process.write(ControlTable.GOAL_POSITION, [1, 2])
+        assert process.process.is_alive()
+        assert process.read(ControlTable.LED) == [0] * len(SERVO_IDS)
+        assert process.read(ControlTable.PRESENT_POSITION) == POSITIONS
+    finally:
+        process.close()
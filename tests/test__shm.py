@@ -0,0 +1,139 @@
+"""`shm.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import subprocess  # noqa: S404
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from robopy.shm import SeqlockArray
+
+
+def test__seqlock_array_roundtrip() -> None:
+    """
+    `SeqlockArray`のテスト.
+
+    `attach` した側から書き込んだ値・時刻・回数が読めることを確認する.
+    """
+    timestamp = 1.5
+    writer = SeqlockArray.create(shape=(3,), dtype=np.int64)
+    reader = SeqlockArray.attach(writer.name, shape=(3,), dtype=np.int64)
+    try:
+        assert reader.sequence == 0
+        writer.write([1, 2, 3], timestamp=0.5)
+        writer.write([4, 5, 6], timestamp=timestamp)
+        out = np.empty(3, dtype=np.int64)
+        values, read_timestamp, sequence = reader.read(out)
+        assert values is out
+        np.testing.assert_array_equal(values, [4, 5, 6])
+        assert read_timestamp == timestamp
+        assert sequence == writer.sequence
+    finally:
+        reader.close()
+        writer.close(unlink=True)
+
+
+def test__seqlock_array_consistency() -> None:
+    """
+    `SeqlockArray`のテスト.
+
+    書き込み中に読み込んでも, 途中の値が混ざらないことを確認する.
+    """
+    array = SeqlockArray.create(shape=(4096,), dtype=np.int64)
+    stop = threading.Event()
+
+    def write() -> None:
+        i = 0
+        while not stop.is_set():
+            i += 1
+            array.write(i, timestamp=float(i))
+            time.sleep(1e-5)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        for _ in range(1000):
+            values, timestamp, _ = array.read()
+            assert (values == values[0]).all()
+            assert timestamp == float(values[0])
+    finally:
+        stop.set()
+        thread.join()
+        array.close(unlink=True)
+
+
+def test__seqlock_array_read_timeout() -> None:
+    """
+    `SeqlockArray`のテスト.
+
+    書き込み側が `begin_write` の後に止まった場合, `read` が待ち続けずに
+    `TimeoutError` を送出することを確認する.
+    """
+    array = SeqlockArray.create(shape=(3,), dtype=np.int64)
+    try:
+        array.write([1, 2, 3], timestamp=0.0)
+        array.begin_write()
+        with pytest.raises(TimeoutError):
+            array.read(timeout=0.01)
+        array.end_write(timestamp=1.0)
+        _, timestamp, sequence = array.read(timeout=0.01)
+        assert timestamp == 1.0
+        assert sequence == 2  # noqa: PLR2004
+    finally:
+        array.close(unlink=True)
+
+
+def test__seqlock_array_write_error() -> None:
+    """
+    `SeqlockArray`のテスト.
+
+    形状の合わない値の書き込みが失敗しても, 書き込み中のまま残らず
+    以前の値が読めることを確認する.
+    """
+    array = SeqlockArray.create(shape=(3,), dtype=np.int64)
+    try:
+        array.write([1, 2, 3], timestamp=0.5)
+        with pytest.raises(ValueError, match="broadcast"):
+            array.write([1, 2], timestamp=1.0)
+        values, timestamp, sequence = array.read(timeout=0.01)
+        np.testing.assert_array_equal(values, [1, 2, 3])
+        assert timestamp == 0.5  # noqa: PLR2004
+        assert sequence == 1
+    finally:
+        array.close(unlink=True)
+
+
+def test__seqlock_array_attach_from_process() -> None:
+    """
+    `SeqlockArray`のテスト.
+
+    別のプロセスが `attach` して終了しても, 共有メモリが破棄されずに
+    使い続けられることを確認する.
+    """
+    writer = SeqlockArray.create(shape=(3,), dtype=np.int64)
+    try:
+        writer.write([1, 2, 3], timestamp=0.5)
+        code = (
+            "import numpy as np\n"
+            "from robopy.shm import SeqlockArray\n"
+            f"reader = SeqlockArray.attach({writer.name!r}, (3,), np.int64)\n"
+            "print(reader.read()[0].tolist())\n"
+            "reader.close()\n"
+        )
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        assert result.stdout.strip() == "[1, 2, 3]"
+        assert "leaked" not in result.stderr
+        reader = SeqlockArray.attach(writer.name, shape=(3,), dtype=np.int64)
+        np.testing.assert_array_equal(reader.read()[0], [1, 2, 3])
+        reader.close()
+    finally:
+        writer.close(unlink=True)
@@ -0,0 +1,124 @@
+"""`telemetry.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+from dynamixel_sdk.robotis_def import COMM_RX_TIMEOUT
+
+from robopy import ControlTable, HardwareError
+from robopy.dynamixel import DynamixelCommError
+from robopy.telemetry import TelemetryAlert, TelemetryPoller
+
+if TYPE_CHECKING:
+    import pytest
+
+    from robopy import RobotDriver
+
+TEMPERATURE = ControlTable.PRESENT_TEMPERATURE
+VOLTAGE = ControlTable.PRESENT_INPUT_VOLTAGE
+ERROR = ControlTable.HARDWARE_ERROR_STATUS
+
+
+def test__telemetry_poller_round_robin(robot: RobotDriver) -> None:
+    """
+    `TelemetryPoller`のテスト.
+
+    1回の `poll` で1項目だけ読み取り, 全サーボ・全項目を順番に一巡することを
+    確認する.
+    """
+    robot.write(TEMPERATURE, [44] * len(robot.servos))
+    robot.write(VOLTAGE, [120, 121, 122, 123, 124])
+    poller = TelemetryPoller(robot, items=[TEMPERATURE, VOLTAGE], budget=1.0)
+
+    for _ in range(len(robot.servos)):
+        assert poller.poll()
+    values, ages = poller.get(VOLTAGE)
+    assert np.isnan(values).all()
+    assert np.isnan(ages).all()
+
+    for _ in range(len(robot.servos)):
+        assert poller.poll()
+    values, ages = poller.get(VOLTAGE)
+    np.testing.assert_allclose(values, [12.0, 12.1, 12.2, 12.3, 12.4])
+    assert (ages >= 0).all()
+    np.testing.assert_allclose(poller.get(TEMPERATURE)[0], 44.0)
+
+
+def test__telemetry_poller_budget(robot: RobotDriver) -> None:
+    """
+    `TelemetryPoller`のテスト.
+
+    読み取りが残り時間に収まらない見込みの場合は何もしないことを確認する.
+    """
+    poller = TelemetryPoller(robot, budget=0.01)
+    poller.read_time = 0.02
+    assert not poller.poll()
+    poller.read_time = 0.0
+    assert not poller.poll(deadline=0.0)
+    assert poller.poll()
+
+
+def test__telemetry_poller_timeout(
+    robot: RobotDriver,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    `TelemetryPoller`のテスト.
+
+    タイムアウトで失敗した読み取りの時間も見込みに含め,
+    残り時間に収まらない間は読み取らないことを確認する.
+    """
+    timeout = 0.02
+
+    def read(item: ControlTable) -> int:
+        time.sleep(timeout)
+        msg = f"{item}の読み取りに失敗しました."
+        raise DynamixelCommError(msg, COMM_RX_TIMEOUT, 0)
+
+    monkeypatch.setattr(robot.servos[0], "read", read)
+    poller = TelemetryPoller(robot, budget=1.0)
+    assert not poller.poll()
+    assert poller.comm_error_count == 1
+    assert poller.read_time >= timeout
+    assert not poller.poll(deadline=time.monotonic() + timeout / 2)
+    assert poller.comm_error_count == 1
+
+
+def test__telemetry_poller_alerts(robot: RobotDriver) -> None:
+    """
+    `TelemetryPoller`のテスト.
+
+    エラーのビットや閾値の超過を検出した時に, 1回だけ通知することを確認する.
+    """
+    alerts: list[TelemetryAlert] = []
+    poller = TelemetryPoller(
+        robot,
+        items=[ERROR, TEMPERATURE],
+        thresholds={TEMPERATURE: (None, 70.0)},
+        callbacks=[alerts.append],
+        budget=1.0,
+    )
+    robot.servos[1].write(ERROR, HardwareError.OVERHEATING)
+    robot.servos[2].write(TEMPERATURE, 75)
+    robot.servos[3].write(TEMPERATURE, 65)
+
+    num_reads = 2 * len(robot.servos)
+    for _ in range(2 * num_reads):
+        poller.poll()
+    assert [(a.servo_id, a.item) for a in alerts] == [
+        (12, ERROR),
+        (13, TEMPERATURE),
+    ]
+    assert "OVERHEATING" in alerts[0].message
+    assert alerts[1].value == 75.0  # noqa: PLR2004
+
+    robot.servos[2].write(TEMPERATURE, 60)
+    for _ in range(num_reads):
+        poller.poll()
+    robot.servos[2].write(TEMPERATURE, 80)
+    for _ in range(num_reads):
+        poller.poll()
+    assert len(alerts) == 3  # noqa: PLR2004
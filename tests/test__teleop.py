@@ -0,0 +1,98 @@
+"""`teleop.py`のユニットテスト."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from robopy import ControlTable
+from robopy.teleop import VELOCITY_TO_POSITION, FollowerPredictor
+
+if TYPE_CHECKING:
+    from robopy import RobotDriver
+    from robopy.sim import SimulatedPort
+
+LOWER = [0, 0, 1000]
+UPPER = [4095, 4095, 3000]
+PERIOD = 0.01
+
+
+def test__follower_predictor_samples() -> None:
+    """
+    `FollowerPredictor.predict`のテスト.
+
+    直近の位置から関節ごとの速度を推定し, `latency` 秒分外挿した値を
+    可動範囲に収めることを確認する.
+    """
+    predictor = FollowerPredictor(LOWER, UPPER, latency=0.1)
+    speed = np.array([100.0, -200.0, 8000.0])
+    goal = predictor.predict([2000, 2000, 2000], timestamp=0.0)
+    np.testing.assert_array_equal(goal, [2000, 2000, 2000])
+    for step in range(1, 6):
+        t = step * PERIOD
+        goal = predictor.predict(2000 + speed * t, timestamp=t)
+    np.testing.assert_allclose(predictor.velocity, speed)
+    # 2000 + speed * (0.05 + 0.1), 3番目の関節は上限で止まる
+    np.testing.assert_array_equal(goal, [2015, 1970, 3000])
+    assert goal.dtype == np.int64
+
+
+def test__follower_predictor_velocity() -> None:
+    """
+    `FollowerPredictor.predict`のテスト.
+
+    `PRESENT_VELOCITY` を渡した場合はその速度で外挿することを確認する.
+    """
+    predictor = FollowerPredictor(LOWER, UPPER, latency=0.02)
+    goal = predictor.predict([2000, 2000, 2000], [100, -100, 0])
+    offset = round(100 * VELOCITY_TO_POSITION * 0.02)
+    assert offset == 31  # noqa: PLR2004
+    np.testing.assert_array_equal(goal, [2000 + offset, 2000 - offset, 2000])
+
+
+def test__follower_predictor_latency() -> None:
+    """
+    `FollowerPredictor.latency`のテスト.
+
+    読み取りから書き込み完了までの時間と周期の半分から遅れを測定することを
+    確認する.
+    """
+    predictor = FollowerPredictor(
+        LOWER,
+        UPPER,
+        smoothing=0.5,
+        extra_latency=0.005,
+    )
+    assert predictor.latency == pytest.approx(0.005)
+    predictor.predict([0, 0, 1000], timestamp=1.0)
+    predictor.commit(timestamp=1.02)
+    assert predictor.latency == pytest.approx(0.02 + 0.005)
+    predictor.predict([0, 0, 1000], timestamp=1.05)
+    predictor.commit(timestamp=1.09)
+    assert predictor.pipeline_latency == pytest.approx(0.03)
+    assert predictor.period == pytest.approx(0.05)
+    assert predictor.latency == pytest.approx(0.03 + 0.025 + 0.005)
+
+
+def test__follower_predictor_from_robot(
+    sim_port: SimulatedPort,
+    sim_robot: RobotDriver,
+) -> None:
+    """
+    `FollowerPredictor.from_robot`のテスト.
+
+    Follower の `MIN_POSITION_LIMIT`・`MAX_POSITION_LIMIT` を読み取ることを
+    確認する.
+    """
+    for i, servo in enumerate(sim_port.servos.values()):
+        servo.set(ControlTable.MIN_POSITION_LIMIT, 100 * i)
+        servo.set(ControlTable.MAX_POSITION_LIMIT, 4000 - i)
+    predictor = FollowerPredictor.from_robot(sim_robot, window=8)
+    np.testing.assert_array_equal(predictor.lower, [0, 100, 200, 300, 400])
+    np.testing.assert_array_equal(
+        predictor.upper,
+        [4000, 3999, 3998, 3997, 3996],
+    )
+    assert predictor.window == 8  # noqa: PLR2004
@@ -0,0 +1,74 @@
+"""`units.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from robopy.control_table import ControlTable
+from robopy.units import scaling_factors, to_physical, to_raw
+
+
+@pytest.mark.parametrize(
+    ("control_table", "raw", "expected"),
+    [
+        (ControlTable.PRESENT_POSITION, [0, 1024, 2048], [0.0, 90.0, 180.0]),
+        (ControlTable.GOAL_VELOCITY, [0, 1000, -1000], [0.0, 229.0, -229.0]),
+        (ControlTable.PRESENT_INPUT_VOLTAGE, [120, 0, 5], [12.0, 0.0, 0.5]),
+        (ControlTable.GOAL_PWM, [855, 0, -855], [100.0, 0.0, -100.0]),
+        (ControlTable.TORQUE_ENABLE, [1, 0, 1], [1.0, 0.0, 1.0]),
+    ],
+)
+def test__to_physical(
+    control_table: ControlTable,
+    raw: list[int],
+    expected: list[float],
+) -> None:
+    """
+    `to_physical`のテスト.
+
+    ドキュメントに記載の係数で変換されることを確認する.
+    """
+    np.testing.assert_allclose(to_physical(control_table, raw), expected)
+
+
+def test__to_raw_roundtrip() -> None:
+    """
+    `to_raw`のテスト.
+
+    時系列(2次元配列)でも `to_physical` と逆変換になることを確認する.
+    """
+    raw = np.arange(-3000, 3000, dtype=np.int64).reshape(-1, 4)
+    physical = to_physical(ControlTable.GOAL_POSITION, raw)
+    np.testing.assert_array_equal(
+        to_raw(ControlTable.GOAL_POSITION, physical),
+        raw,
+    )
+
+
+def test__current_scaling_factors() -> None:
+    """
+    電流系の変換のテスト.
+
+    `MODEL_NUMBER` ごとに係数が変わることを確認する.
+    """
+    model_numbers = [1020, 1000, 1200]
+    factors = scaling_factors(ControlTable.PRESENT_CURRENT, model_numbers)
+    np.testing.assert_allclose(factors, [2.69, 1.34, 1.0])
+    np.testing.assert_array_equal(
+        to_raw(ControlTable.GOAL_CURRENT, [26.9, 13.4, 10.0], model_numbers),
+        [10, 10, 10],
+    )
+
+
+@pytest.mark.parametrize("model_numbers", [None, [1020, 0]])
+def test__current_scaling_factors_error(
+    model_numbers: list[int] | None,
+) -> None:
+    """
+    電流系の変換のテスト.
+
+    モデルが不明な場合に `ValueError` になることを確認する.
+    """
+    with pytest.raises(ValueError, match="MODEL_NUMBER"):
+        scaling_factors(ControlTable.PRESENT_CURRENT, model_numbers)
@@ -0,0 +1,161 @@
+"""`virtual_camera.py`のユニットテスト."""
+
+from __future__ import annotations
+
+import functools
+import time
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+import pytest
+
+from robopy.camera_process import CameraProcess
+from robopy.virtual_camera import (
+    ArrayCamera,
+    SyntheticCamera,
+    VideoFileCamera,
+    VirtualCamera,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import numpy.typing as npt
+
+WIDTH = 6
+HEIGHT = 4
+NUM_FRAMES = 3
+
+
+@pytest.fixture
+def frames() -> npt.NDArray[np.uint8]:
+    """
+    テストで使う録画.
+
+    Returns
+    -------
+    npt.NDArray[np.uint8]
+        `i` 番目の画像の全画素が `10 * i` の `(N, H, W, 3)` の画像.
+    """
+    values = np.arange(NUM_FRAMES, dtype=np.uint8) * 10
+    return np.broadcast_to(
+        values[:, np.newaxis, np.newaxis, np.newaxis],
+        (NUM_FRAMES, HEIGHT, WIDTH, 3),
+    ).copy()
+
+
+def test__virtual_camera_abstract() -> None:
+    """
+    `VirtualCamera`のテスト.
+
+    `_skip`・`_retrieve` を実装しないクラスは作れないことを確認する.
+    """
+    with pytest.raises(TypeError, match="abstract"):
+        VirtualCamera(30)  # type: ignore[abstract]
+
+
+def test__synthetic_camera() -> None:
+    """
+    `SyntheticCamera`のテスト.
+
+    `realtime=False` では待たずに毎回異なる画像を返し,
+    `read` に渡したバッファに書き込むことを確認する.
+    """
+    camera = SyntheticCamera(WIDTH, HEIGHT, realtime=False)
+    first = camera.get_frame()
+    second = camera.get_frame()
+    assert first.shape == (HEIGHT, WIDTH, 3)
+    assert first.dtype == np.uint8
+    assert not np.array_equal(first, second)
+    assert camera.frame_index == 1
+
+    buffer = np.empty_like(first)
+    ret, frame = camera.read(buffer)
+    assert ret
+    assert frame is buffer
+
+    camera.release()
+    assert not camera.isOpened()
+    with pytest.raises(RuntimeError):
+        camera.get_frame()
+
+
+def test__virtual_camera_realtime() -> None:
+    """
+    `VirtualCamera`のテスト.
+
+    `fps` の間隔で画像を返し, 呼び出しが遅れた間の画像は捨てることを確認する.
+    """
+    fps = 100
+    camera = SyntheticCamera(WIDTH, HEIGHT, fps=fps)
+    start = time.monotonic()
+    for _ in range(5):
+        camera.get_frame()
+    assert time.monotonic() - start >= 3.5 / fps
+    assert camera.dropped_frames == 0
+
+    time.sleep(5.5 / fps)
+    camera.get_frame()
+    assert camera.dropped_frames >= 4  # noqa: PLR2004
+    assert camera.frame_index == 5 + camera.dropped_frames
+
+
+def test__array_camera(frames: npt.NDArray[np.uint8], tmp_path: Path) -> None:
+    """
+    `ArrayCamera`のテスト.
+
+    `.npy` ファイルの画像を順番に返し, `loop=False` では最後で終わることを
+    確認する.
+    """
+    path = tmp_path / "episode.npy"
+    np.save(path, frames)
+    camera = ArrayCamera(path, loop=False, realtime=False)
+    for expected in frames:
+        np.testing.assert_array_equal(camera.get_frame(), expected)
+    with pytest.raises(RuntimeError):
+        camera.get_frame()
+
+    looped = ArrayCamera(frames, realtime=False)
+    values = [looped.get_frame()[0, 0, 0] for _ in range(NUM_FRAMES + 1)]
+    assert values == [0, 10, 20, 0]
+
+
+def test__video_file_camera(
+    frames: npt.NDArray[np.uint8],
+    tmp_path: Path,
+) -> None:
+    """
+    `VideoFileCamera`のテスト.
+
+    連番画像を順番に返し, 最後の次は最初に戻ることを確認する.
+    """
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(tmp_path / f"{i:06d}.png"), frame)
+    camera = VideoFileCamera(tmp_path / "%06d.png", fps=30, realtime=False)
+    values = [camera.get_frame()[0, 0, 0] for _ in range(NUM_FRAMES + 1)]
+    assert values == [0, 10, 20, 0]
+    camera.release()
+
+    with pytest.raises(RuntimeError):
+        VideoFileCamera(tmp_path / "missing.mp4")
+
+
+def test__camera_process_source() -> None:
+    """
+    `CameraProcess`のテスト.
+
+    `source` に渡した取得元の画像を, ワーカープロセスから共有することを
+    確認する.
+    """
+    source = functools.partial(SyntheticCamera, WIDTH, HEIGHT, fps=200)
+    camera = CameraProcess(0, WIDTH, HEIGHT, source=source)
+    try:
+        _, _, first = camera.get_stamped_frame()
+        deadline = time.monotonic() + 5.0
+        while camera.get_stamped_frame()[2] == first:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+        assert camera.get_frame().shape == (HEIGHT, WIDTH, 3)
+    finally:
+        camera.close()